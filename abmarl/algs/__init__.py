@@ -0,0 +1 @@
+from abmarl.algs.generate_episode import EpisodeGenerator
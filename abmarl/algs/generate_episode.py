@@ -1,5 +1,9 @@
 # This probably shouldn't go in algs, but we'll move it later after we've figured out the
 # architecture a bit more.
+import multiprocessing as mp
+
+import numpy as np
+
 
 def generate_episode(sim, policy, horizon=200):
     """
@@ -22,3 +26,103 @@ def generate_episode(sim, policy, horizon=200):
 
     states.pop() # Pop off the terminating state
     return states, actions, rewards
+
+
+def _init_worker(sim, horizon):
+    global _worker_sim, _worker_horizon
+    _worker_sim = sim
+    _worker_horizon = horizon
+
+
+def _generate_seeded_episodes(args):
+    policy, seeds = args
+    episodes = []
+    for seed in seeds:
+        np.random.seed(seed)
+        states, actions, rewards = generate_episode(_worker_sim, policy, _worker_horizon)
+        episodes.append((np.array(states), np.array(actions), np.array(rewards, dtype=float)))
+    return episodes
+
+
+class EpisodeGenerator:
+    """
+    Generate batches of episodes, optionally across a pool of worker processes.
+
+    Each worker gets its own copy of the simulation when the pool starts. Every
+    episode is seeded independently, so a batch is reproducible no matter how the
+    episodes are split among the workers. Generating in this process restores
+    numpy's global random state afterwards.
+
+    Args:
+        sim: The simulation.
+        horizon: The time horizon for the episodes.
+        num_workers: The number of worker processes. 0 generates the episodes in
+            this process. None uses all the cores.
+
+    Use it as a context manager or call close when done so that the workers are
+    stopped.
+    """
+    def __init__(self, sim, horizon=200, num_workers=None):
+        self.sim = sim
+        self.horizon = horizon
+        self.num_workers = mp.cpu_count() if num_workers is None else num_workers
+        if num_workers == 0:
+            self.pool = None
+        else:
+            self.pool = mp.Pool(num_workers, initializer=_init_worker, initargs=(sim, horizon))
+
+    def generate(self, policy, num_episodes, seed=None):
+        """
+        Generate a batch of episodes from the policy.
+
+        Args:
+            policy: The policy. It is sent to each worker once per batch along with
+                that worker's share of the seeds, so the episodes use the policy
+                as it is at this call.
+            num_episodes: The number of episodes to generate.
+            seed: Seed for the episodes' seeds. If None, the seeds are drawn from
+                numpy's global random state.
+
+        Returns:
+            states, actions, rewards: The episodes concatenated into arrays.
+            lengths: Array with the number of steps in each episode.
+        """
+        if seed is None:
+            seeds = np.random.randint(0, 2 ** 31, num_episodes)
+        else:
+            seeds = np.random.SeedSequence(seed).generate_state(num_episodes)
+        if self.pool is None:
+            _init_worker(self.sim, self.horizon)
+            random_state = np.random.get_state()
+            try:
+                episodes = _generate_seeded_episodes((policy, seeds))
+            finally:
+                np.random.set_state(random_state)
+        else:
+            tasks = [(policy, chunk) for chunk in np.array_split(seeds, self.num_workers)]
+            episodes = [
+                episode for chunk in self.pool.map(_generate_seeded_episodes, tasks)
+                for episode in chunk
+            ]
+        lengths = np.array([len(rewards) for _, _, rewards in episodes], dtype=int)
+        return (
+            np.concatenate([states for states, _, _ in episodes]),
+            np.concatenate([actions for _, actions, _ in episodes]),
+            np.concatenate([rewards for _, _, rewards in episodes]),
+            lengths,
+        )
+
+    def close(self):
+        """
+        Stop the worker processes.
+        """
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
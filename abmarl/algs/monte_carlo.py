@@ -5,12 +5,71 @@ import numpy as np
 from abmarl.managers import SimulationManager
 from abmarl.external import GymWrapper
 from abmarl.pols import GreedyPolicy, EpsilonSoftPolicy, RandomFirstActionPolicy
-from abmarl.tools import numpy_utils as npu
 
-from .generate_episode import generate_episode
+from .generate_episode import generate_episode, EpisodeGenerator
 
 
-def exploring_starts(sim, iteration=10_000, gamma=0.9, horizon=200):
+def _discounted_returns(rewards, gamma):
+    """
+    Calculate the discounted return from each step of an episode in one backward pass.
+    """
+    returns = np.empty(len(rewards))
+    G = 0
+    for i in reversed(range(len(rewards))):
+        G = gamma * G + rewards[i]
+        returns[i] = G
+    return returns
+
+
+def _first_visit_update(q_table, visit_table, states, actions, rewards, gamma):
+    """
+    Update the Q values with the returns from the first visit of each state-action
+    pair in the episode. The Q values are running means over the first-visit returns,
+    so only the visit counts are stored.
+
+    Args:
+        q_table: The Q values, updated in place.
+        visit_table: The number of episodes that have visited each state-action
+            pair, updated in place.
+        states, actions, rewards: The episode.
+        gamma: The discount factor.
+    """
+    if len(states) == 0:
+        return
+    states = np.asarray(states, dtype=int)
+    actions = np.asarray(actions, dtype=int)
+    returns = _discounted_returns(rewards, gamma)
+    _, first_visits = np.unique(
+        np.ravel_multi_index((states, actions), q_table.shape), return_index=True
+    )
+    states, actions = states[first_visits], actions[first_visits]
+    visit_table[states, actions] += 1
+    q_table[states, actions] += \
+        (returns[first_visits] - q_table[states, actions]) / visit_table[states, actions]
+
+
+def _episodes(sim, policy, iteration, horizon, episodes_per_batch, num_workers):
+    """
+    Yield the episodes for the algorithms. If there is more than one episode per
+    batch or there are workers, then the episodes are generated in batches with
+    an EpisodeGenerator, and the policy is fixed within each batch.
+    """
+    if episodes_per_batch == 1 and num_workers == 0:
+        for _ in range(iteration):
+            yield generate_episode(sim, policy, horizon)
+        return
+    with EpisodeGenerator(sim, horizon=horizon, num_workers=num_workers) as generator:
+        for start in range(0, iteration, episodes_per_batch):
+            num_episodes = min(episodes_per_batch, iteration - start)
+            states, actions, rewards, lengths = generator.generate(policy, num_episodes)
+            bounds = np.cumsum(lengths)[:-1]
+            yield from zip(
+                np.split(states, bounds), np.split(actions, bounds), np.split(rewards, bounds)
+            )
+
+
+def exploring_starts(sim, iteration=10_000, gamma=0.9, horizon=200, episodes_per_batch=1,
+                     num_workers=0):
     """
     Estimate an optimal policy over an simulation using monte carlo policy estimation.
 
@@ -19,6 +78,10 @@ def exploring_starts(sim, iteration=10_000, gamma=0.9, horizon=200):
         iteration: The number of times to iterate the learning algorithm.
         gamma: The discount factor
         horizon: the time horizon for the trajectory.
+        episodes_per_batch: The number of episodes to generate with the same policy
+            before updating the Q values.
+        num_workers: The number of processes that generate the episodes. 0 generates
+            them in this process.
 
     Returns:
         sim: The simulation. Algorithms may wrap simulations before training in them, so this
@@ -32,28 +95,18 @@ def exploring_starts(sim, iteration=10_000, gamma=0.9, horizon=200):
     assert isinstance(sim.action_space, Discrete)
     q_table = np.random.normal(0, 1, size=(sim.observation_space.n, sim.action_space.n))
     policy = RandomFirstActionPolicy(q_table)
-    state_action_returns = {}
+    visit_table = np.zeros(q_table.shape, dtype=int)
 
-    for i in range(iteration):
-        states, actions, rewards = generate_episode(sim, policy, horizon)
-        states = np.stack(states)
-        actions = np.stack(actions)
-        G = 0
-        for i in reversed(range(len(states))):
-            state, action, reward = states[i], actions[i], rewards[i]
-            G = gamma * G + reward
-            if not (npu.array_in_array(state, states[:i]) and
-                    npu.array_in_array(action, actions[:i])):
-                if (state, action) not in state_action_returns:
-                    state_action_returns[(state, action)] = [G]
-                else:
-                    state_action_returns[(state, action)].append(G)
-                q_table[state, action] = np.mean(state_action_returns[(state, action)])
+    for states, actions, rewards in _episodes(
+        sim, policy, iteration, horizon, episodes_per_batch, num_workers
+    ):
+        _first_visit_update(q_table, visit_table, states, actions, rewards, gamma)
 
     return sim, q_table, policy
 
 
-def epsilon_soft(sim, iteration=10_000, gamma=0.9, epsilon=0.1, horizon=200):
+def epsilon_soft(sim, iteration=10_000, gamma=0.9, epsilon=0.1, horizon=200,
+                 episodes_per_batch=1, num_workers=0):
     """
     Estimate an optimal policy over a simulation using monte carlo policy estimation. The policy
     is technically non-optimal because it is epsilon-soft.
@@ -63,6 +116,11 @@ def epsilon_soft(sim, iteration=10_000, gamma=0.9, epsilon=0.1, horizon=200):
         iteration: The number of times to iterate the learning algorithm.
         gamme: The discount factor
         epsilon: The exploration probability.
+        horizon: the time horizon for the trajectory.
+        episodes_per_batch: The number of episodes to generate with the same policy
+            before updating the Q values.
+        num_workers: The number of processes that generate the episodes. 0 generates
+            them in this process.
 
     Returns:
         sim: The simulation. Algorithms may wrap simulations before training in them, so this
@@ -76,23 +134,12 @@ def epsilon_soft(sim, iteration=10_000, gamma=0.9, epsilon=0.1, horizon=200):
     assert isinstance(sim.action_space, Discrete)
     q_table = np.random.normal(0, 1, size=(sim.observation_space.n, sim.action_space.n))
     policy = EpsilonSoftPolicy(q_table, epsilon=epsilon)
-    state_action_returns = {}
+    visit_table = np.zeros(q_table.shape, dtype=int)
 
-    for i in range(iteration):
-        states, actions, rewards = generate_episode(sim, policy, horizon)
-        states = np.stack(states)
-        actions = np.stack(actions)
-        G = 0
-        for i in reversed(range(len(states))):
-            state, action, reward = states[i], actions[i], rewards[i]
-            G = gamma * G + reward
-            if not (npu.array_in_array(state, states[:i]) and
-                    npu.array_in_array(action, actions[:i])):
-                if (state, action) not in state_action_returns:
-                    state_action_returns[(state, action)] = [G]
-                else:
-                    state_action_returns[(state, action)].append(G)
-                q_table[state, action] = np.mean(state_action_returns[(state, action)])
+    for states, actions, rewards in _episodes(
+        sim, policy, iteration, horizon, episodes_per_batch, num_workers
+    ):
+        _first_visit_update(q_table, visit_table, states, actions, rewards, gamma)
 
     return sim, q_table, policy
 
@@ -120,8 +167,8 @@ def off_policy(sim, iteration=10_000, gamma=0.9, horizon=200):
     q_table = np.random.normal(0, 1, size=(sim.observation_space.n, sim.action_space.n))
     c_table = 0 * q_table
     policy = GreedyPolicy(q_table)
+    behavior_policy = EpsilonSoftPolicy(q_table)
     for i in range(iteration):
-        behavior_policy = EpsilonSoftPolicy(q_table)
         states, actions, rewards, = generate_episode(sim, behavior_policy, horizon)
         G = 0
         W = 1
@@ -1,3 +1,6 @@
 from .simulation_manager import SimulationManager
 from .turn_based_manager import TurnBasedManager
 from .all_step_manager import AllStepManager
+from .vec_all_step_manager import VecAllStepManager
+from .parallel_simulation_pool import ParallelSimulationPool
+from .async_turn_based_manager import AsyncTurnBasedManager
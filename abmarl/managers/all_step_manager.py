@@ -18,10 +18,9 @@ class AllStepManager(SimulationManager):
             if not (isinstance(agent, ActingAgent) and isinstance(agent, ObservingAgent))
         )
         self.sim.reset(**kwargs)
-        return {
-            agent.id: self.sim.get_obs(agent.id)
-            for agent in self.agents.values() if agent.id not in self.done_agents
-        }
+        return self.sim.get_obs_batch([
+            agent.id for agent in self.agents.values() if agent.id not in self.done_agents
+        ])
 
     def step(self, action_dict, **kwargs):
         """
@@ -36,22 +35,13 @@ class AllStepManager(SimulationManager):
                 "Received an action for an agent that is already done."
         self.sim.step(action_dict, **kwargs)
 
-        obs = {
-            agent.id: self.sim.get_obs(agent.id) for agent in self.agents.values()
-            if agent.id not in self.done_agents
-        }
-        rewards = {
-            agent.id: self.sim.get_reward(agent.id) for agent in self.agents.values()
-            if agent.id not in self.done_agents
-        }
-        dones = {
-            agent.id: self.sim.get_done(agent.id) for agent in self.agents.values()
-            if agent.id not in self.done_agents
-        }
-        infos = {
-            agent.id: self.sim.get_info(agent.id) for agent in self.agents.values()
-            if agent.id not in self.done_agents
-        }
+        agent_ids = [
+            agent.id for agent in self.agents.values() if agent.id not in self.done_agents
+        ]
+        obs = self.sim.get_obs_batch(agent_ids)
+        rewards = self.sim.get_reward_batch(agent_ids)
+        dones = self.sim.get_done_batch(agent_ids)
+        infos = self.sim.get_info_batch(agent_ids)
 
         for agent, done in dones.items():
             if done:
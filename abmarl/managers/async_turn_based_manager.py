@@ -0,0 +1,115 @@
+import asyncio
+import inspect
+
+from abmarl.tools.gym_utils import null_value
+
+from .turn_based_manager import TurnBasedManager
+
+
+class AsyncTurnBasedManager(TurnBasedManager):
+    """
+    The AsyncTurnBasedManager takes turns like the TurnBasedManager, but reset
+    and step are coroutines and the manager can gather the agents' decisions for
+    you. The decisions for all the pending agents are awaited concurrently, so
+    a slow agent only holds up the step until the deadline. An agent that misses
+    the deadline takes its null action instead.
+
+    policies (dict):
+        Maps agent ids to functions that take the agent's observation and return
+        its action. The functions can be coroutine functions, such as clients for
+        out-of-process services. Regular functions are run in a thread so that
+        they do not block the other agents.
+        Default None.
+
+    deadline (float):
+        The number of seconds to wait for the decisions. None waits for all of them.
+        Default None.
+
+    null_actions (dict):
+        Maps agent ids to the action they take when they have no policy or miss the
+        deadline. Agents not in this dictionary take the null value of their action
+        space: zeros, bounded within Boxes, and the first value of Discretes.
+        Default None.
+    """
+    def __init__(self, sim, policies=None, deadline=None, null_actions=None):
+        super().__init__(sim)
+        self.policies = {} if policies is None else policies
+        self.deadline = deadline
+        self.null_actions = {} if null_actions is None else null_actions
+
+    async def reset(self, **kwargs):
+        """
+        Reset the simulation and return the observation of the first agent.
+        """
+        return super().reset(**kwargs)
+
+    async def step(self, action_dict, **kwargs):
+        """
+        Step the simulation forward and return the observation, reward, done, and
+        info of the next agent, just like the TurnBasedManager.
+        """
+        return super().step(action_dict, **kwargs)
+
+    async def decide(self, obs, dones=None, **kwargs):
+        """
+        Concurrently await the decisions of the agents who received an observation
+        and are not done.
+
+        Args:
+            obs: Dictionary mapping agents to their observations.
+            dones: Dictionary mapping agents to their done status. Done agents do
+                not decide.
+
+        Returns:
+            Dictionary mapping the deciding agents to their actions. Agents without
+            a policy or whose decision missed the deadline get their null action.
+        """
+        dones = {} if dones is None else dones
+        deciding = [agent_id for agent_id in obs if not dones.get(agent_id, False)]
+        tasks = {
+            agent_id: asyncio.ensure_future(self._decide(agent_id, obs[agent_id]))
+            for agent_id in deciding if agent_id in self.policies
+        }
+        if tasks:
+            await asyncio.wait(tasks.values(), timeout=self.deadline)
+
+        action_dict = {}
+        for agent_id in deciding:
+            task = tasks.get(agent_id)
+            if task is not None and task.done() and not task.cancelled():
+                action_dict[agent_id] = task.result()
+            else:
+                if task is not None:
+                    task.cancel()
+                action_dict[agent_id] = self.null_action(agent_id)
+        return action_dict
+
+    async def step_with_policies(self, obs, dones=None, **kwargs):
+        """
+        Gather the decisions of the pending agents and step the simulation with them.
+
+        Returns:
+            The output of step.
+        """
+        action_dict = await self.decide(obs, dones, **kwargs)
+        return await self.step(action_dict, **kwargs)
+
+    def null_action(self, agent_id):
+        """
+        The action an agent takes when it has no decision.
+
+        Uses the agent's entry in null_actions if there is one. Otherwise, the
+        action is the null value of the agent's action space.
+        """
+        if agent_id in self.null_actions:
+            return self.null_actions[agent_id]
+        action_space = getattr(self.agents[agent_id], 'action_space', None)
+        assert action_space is not None, f"{agent_id} has no action space."
+        return null_value(action_space)
+
+    async def _decide(self, agent_id, agent_obs):
+        policy = self.policies[agent_id]
+        if inspect.iscoroutinefunction(policy):
+            return await policy(agent_obs)
+        else:
+            return await asyncio.get_event_loop().run_in_executor(None, policy, agent_obs)
@@ -0,0 +1,228 @@
+import multiprocessing as mp
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError: # Python < 3.8
+    resource_tracker = shared_memory = None
+
+import numpy as np
+
+from abmarl.sim.wrappers.flatten_wrapper import flatten, unflatten, flatten_space
+
+
+def _worker(conn, sim_fn, index):
+    """
+    Run a SimulationManager in a worker process. Observations are flattened into
+    the shared buffers and everything else is sent back through the pipe. Without
+    shared memory, the flattened observations are sent through the pipe too.
+    """
+    manager = sim_fn()
+    spaces = {
+        agent.id: agent.observation_space for agent in manager.agents.values()
+        if getattr(agent, 'observation_space', None) is not None
+    }
+    conn.send(spaces)
+    names = conn.recv()
+    blocks, buffers = _attach(names, spaces) if names is not None else ([], None)
+    try:
+        while True:
+            command, data = conn.recv()
+            if command == 'close':
+                break
+            try:
+                if command == 'reset':
+                    obs = manager.reset(**data)
+                    rest = ()
+                else:
+                    obs, *rest = manager.step(data[0], **data[1])
+                if buffers is None:
+                    flat_obs = {
+                        agent_id: flatten(spaces[agent_id], agent_obs)
+                        for agent_id, agent_obs in obs.items()
+                    }
+                    conn.send((True, (flat_obs, *rest)))
+                else:
+                    for agent_id, agent_obs in obs.items():
+                        buffers[agent_id][index] = flatten(spaces[agent_id], agent_obs)
+                    conn.send((True, (list(obs), *rest)))
+            except Exception as e:
+                conn.send((False, e))
+    finally:
+        for block in blocks:
+            block.close()
+        conn.close()
+
+
+def _attach(names, spaces, create=False, num_sims=None):
+    """
+    Open a shared memory block for each agent's observations. Each block holds
+    an array with a row for each simulation, laid out like the agent's flattened
+    observation space. Without shared memory, the arrays are only in this process.
+    """
+    blocks = []
+    buffers = {}
+    for agent_id, space in spaces.items():
+        flat_space = flatten_space(space)
+        if shared_memory is None:
+            buffers[agent_id] = np.zeros(
+                (num_sims, *flat_space.shape), dtype=flat_space.dtype
+            )
+            continue
+        if create:
+            shape = (num_sims, *flat_space.shape)
+            nbytes = max(int(np.prod(shape)) * np.dtype(flat_space.dtype).itemsize, 1)
+            block = shared_memory.SharedMemory(create=True, size=nbytes)
+            names[agent_id] = (block.name, shape)
+        else:
+            block = shared_memory.SharedMemory(name=names[agent_id][0])
+        blocks.append(block)
+        buffers[agent_id] = np.ndarray(
+            names[agent_id][1], dtype=flat_space.dtype, buffer=block.buf
+        )
+    return blocks, buffers
+
+
+class ParallelSimulationPool:
+    """
+    Run N SimulationManagers in worker processes and step them in parallel.
+
+    The reset and step API matches the AllStepManager, except that the inputs and
+    outputs are lists with an entry for each simulation. The observations are
+    not pickled: each worker flattens them into shared memory buffers laid out
+    according to flatten_space, one buffer per agent with a row per simulation.
+    Rewards, dones, and infos are sent through pipes. Shared memory needs Python
+    3.8. On older versions, the flattened observations are sent through the pipes
+    and copied into the buffers instead.
+
+    sim_fns (list):
+        Functions that each build a SimulationManager. These are called in the
+        worker processes, so they must be picklable if the processes are spawned.
+
+    flat_obs (bool):
+        If True, return the flattened observations as they are in the buffers.
+        Otherwise, unflatten them into the agents' observation spaces.
+        Default False.
+
+    Attributes:
+        num_sims: The number of simulations.
+        obs_buffers: Dictionary mapping each agent to its shared observation array.
+            The buffers are overwritten by every reset and step.
+    """
+    def __init__(self, sim_fns, flat_obs=False):
+        assert type(sim_fns) is list and len(sim_fns) > 0, \
+            "sim_fns must be a non-empty list of functions that build SimulationManagers."
+        self.num_sims = len(sim_fns)
+        self.flat_obs = flat_obs
+        self._conns = []
+        self._processes = []
+        # Start the resource tracker first so that the workers share it instead of
+        # each starting their own, which would report the blocks as leaked.
+        if resource_tracker is not None:
+            resource_tracker.ensure_running()
+        for index, sim_fn in enumerate(sim_fns):
+            conn, worker_conn = mp.Pipe()
+            process = mp.Process(
+                target=_worker, args=(worker_conn, sim_fn, index), daemon=True
+            )
+            process.start()
+            worker_conn.close()
+            self._conns.append(conn)
+            self._processes.append(process)
+
+        worker_spaces = [conn.recv() for conn in self._conns]
+        self.spaces = worker_spaces[0]
+        for spaces in worker_spaces[1:]:
+            assert spaces.keys() == self.spaces.keys(), \
+                "All the simulations must have the same observing agents."
+        names = {}
+        self._blocks, self.obs_buffers = _attach(
+            names, self.spaces, create=True, num_sims=self.num_sims
+        )
+        for conn in self._conns:
+            conn.send(names if shared_memory is not None else None)
+        self._closed = False
+
+    def reset(self, **kwargs):
+        """
+        Reset all the simulations.
+
+        Returns:
+            A list of the observation dictionaries from each simulation.
+        """
+        for conn in self._conns:
+            conn.send(('reset', kwargs))
+        return [self._obs(index, agent_obs) for index, (agent_obs,) in self._gather()]
+
+    def step(self, action_dicts, **kwargs):
+        """
+        Step all the simulations forward in parallel.
+
+        Args:
+            action_dicts: A list of action dictionaries, one for each simulation.
+
+        Returns:
+            Lists of the observations, rewards, dones, and infos from each simulation.
+        """
+        assert len(action_dicts) == self.num_sims, \
+            "There must be an action dictionary for each simulation."
+        for conn, action_dict in zip(self._conns, action_dicts):
+            conn.send(('step', (action_dict, kwargs)))
+        obs, rewards, dones, infos = [], [], [], []
+        for index, (agent_obs, reward, done, info) in self._gather():
+            obs.append(self._obs(index, agent_obs))
+            rewards.append(reward)
+            dones.append(done)
+            infos.append(info)
+        return obs, rewards, dones, infos
+
+    def close(self):
+        """
+        Stop the workers and release the shared memory.
+        """
+        if self._closed:
+            return
+        for conn in self._conns:
+            try:
+                conn.send(('close', None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join()
+        for conn in self._conns:
+            conn.close()
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _gather(self):
+        results = []
+        error = None
+        for index, conn in enumerate(self._conns):
+            ok, payload = conn.recv()
+            if ok:
+                results.append((index, payload))
+            elif error is None:
+                error = payload
+        if error is not None:
+            raise error
+        return results
+
+    def _obs(self, index, agent_obs):
+        if isinstance(agent_obs, dict):
+            # The observations came through the pipe instead of shared memory
+            for agent_id, flat_obs in agent_obs.items():
+                self.obs_buffers[agent_id][index] = flat_obs
+        agent_ids = list(agent_obs)
+        if self.flat_obs:
+            return {agent_id: self.obs_buffers[agent_id][index].copy() for agent_id in agent_ids}
+        else:
+            return {
+                agent_id: unflatten(self.spaces[agent_id], self.obs_buffers[agent_id][index])
+                for agent_id in agent_ids
+            }
@@ -45,14 +45,11 @@ class TurnBasedManager(SimulationManager):
 
         obs, rewards, dones, infos = {}, {}, {'__all__': self.sim.get_all_done()}, {}
         if dones['__all__']: # The simulation is done. Get output for all non-done agents
-            for agent in self.agents:
-                if agent in self.done_agents:
-                    continue
-                else:
-                    obs[agent] = self.sim.get_obs(agent)
-                    rewards[agent] = self.sim.get_reward(agent)
-                    dones[agent] = self.sim.get_done(agent)
-                    infos[agent] = self.sim.get_info(agent)
+            agent_ids = [agent for agent in self.agents if agent not in self.done_agents]
+            obs = self.sim.get_obs_batch(agent_ids)
+            rewards = self.sim.get_reward_batch(agent_ids)
+            dones.update(self.sim.get_done_batch(agent_ids))
+            infos = self.sim.get_info_batch(agent_ids)
         else: # Simulation is not done. Get the output for the next agent(s).
             for next_agent in self.agent_order:
                 # This agent was already done before, so there is no interaction
@@ -0,0 +1,129 @@
+import numpy as np
+
+from abmarl.sim import AgentBasedSimulation
+
+from .all_step_manager import AllStepManager
+
+
+class VecAllStepManager:
+    """
+    The VecAllStepManager steps K copies of a simulation together, each one
+    controlled by its own AllStepManager.
+
+    Actions, observations, rewards, and dones are dictionaries keyed by agent
+    id, and each value is stacked over the copies, so that the first axis indexes
+    the copy. Dictionary and tuple values are stacked element-wise. When every
+    agent in a copy is done, that copy is reset automatically: the stacked
+    observation holds the first observation of the new episode and the copy's
+    info holds the last observation of the old one under "terminal_obs".
+
+    Agents that are done in a copy while the other agents keep going repeat their
+    last observation with a reward of 0 and a done of True. Their actions for that
+    copy are ignored.
+
+    Attributes:
+        sims: The list of AgentBasedSimulations. They must have the same agents.
+        managers: The AllStepManager for each simulation.
+        agents: The agents in the first simulation.
+        num_sims: The number of simulations.
+    """
+    def __init__(self, sims):
+        assert type(sims) is list and len(sims) > 0, \
+            "sims must be a non-empty list of AgentBasedSimulations."
+        for sim in sims:
+            assert isinstance(sim, AgentBasedSimulation), \
+                "VecAllStepManager can only interface with AgentBasedSimulation."
+            assert sim.agents.keys() == sims[0].agents.keys(), \
+                "All the simulations must have the same agents."
+        self.sims = sims
+        self.managers = [AllStepManager(sim) for sim in sims]
+        self.agents = sims[0].agents
+        self.num_sims = len(sims)
+
+    def reset(self, **kwargs):
+        """
+        Reset all the simulations and return the stacked observations of the
+        agents.
+        """
+        self._last_obs = [manager.reset(**kwargs) for manager in self.managers]
+        self._agent_ids = list(self._last_obs[0])
+        return self._stack_obs()
+
+    def step(self, action_dict, **kwargs):
+        """
+        Step all the simulations forward.
+
+        Args:
+            action_dict:
+                Dictionary mapping each agent to its actions stacked over the copies.
+
+        Returns:
+            The stacked observations, rewards, and dones of all the agents, and the
+            info of all the agents as a list of dictionaries over the copies. The
+            "__all__" done is an array with the all-done status of each copy before
+            it was reset.
+        """
+        rewards = {agent_id: np.zeros(self.num_sims) for agent_id in self._agent_ids}
+        dones = {agent_id: np.ones(self.num_sims, dtype=bool) for agent_id in self._agent_ids}
+        dones['__all__'] = np.zeros(self.num_sims, dtype=bool)
+        infos = {agent_id: [{} for _ in range(self.num_sims)] for agent_id in self._agent_ids}
+
+        for k, manager in enumerate(self.managers):
+            obs, reward, done, info = manager.step({
+                agent_id: _index(action, k) for agent_id, action in action_dict.items()
+                if agent_id not in manager.done_agents
+            }, **kwargs)
+            self._last_obs[k].update(obs)
+            for agent_id in reward:
+                rewards[agent_id][k] = reward[agent_id]
+                dones[agent_id][k] = done[agent_id]
+                infos[agent_id][k] = info[agent_id]
+
+            if done['__all__']:
+                dones['__all__'][k] = True
+                for agent_id in self._agent_ids:
+                    infos[agent_id][k] = dict(
+                        infos[agent_id][k], terminal_obs=self._last_obs[k][agent_id]
+                    )
+                self._last_obs[k] = manager.reset()
+
+        return self._stack_obs(), rewards, dones, infos
+
+    def render(self, index=0, **kwargs):
+        """
+        Render one of the simulations.
+
+        Args:
+            index: The copy to render. Default 0.
+        """
+        self.sims[index].render(**kwargs)
+
+    def _stack_obs(self):
+        return {
+            agent_id: _stack([obs[agent_id] for obs in self._last_obs])
+            for agent_id in self._agent_ids
+        }
+
+
+def _stack(values):
+    """
+    Stack the values over a new first axis, recursing into dictionaries and tuples.
+    """
+    if isinstance(values[0], dict):
+        return {key: _stack([value[key] for value in values]) for key in values[0]}
+    elif isinstance(values[0], tuple):
+        return tuple(_stack([value[i] for value in values]) for i in range(len(values[0])))
+    else:
+        return np.stack([np.asarray(value) for value in values])
+
+
+def _index(values, k):
+    """
+    Get the k-th entry of stacked values, recursing into dictionaries and tuples.
+    """
+    if isinstance(values, dict):
+        return {key: _index(value, k) for key, value in values.items()}
+    elif isinstance(values, tuple):
+        return tuple(_index(value, k) for value in values)
+    else:
+        return values[k]
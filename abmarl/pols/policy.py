@@ -23,6 +23,16 @@ class Policy(ABC):
         """Calculate the probability of choosing this action given this state."""
         pass
 
+    def act_batch(self, states):
+        """Choose an action for each state in an array of states."""
+        return np.array([self.act(state) for state in states])
+
+    def probability_batch(self, states, actions):
+        """Calculate the probability of choosing each action given its state."""
+        return np.array([
+            self.probability(state, action) for state, action in zip(states, actions)
+        ])
+
     def reset(self):
         """
         Some policies behave differently at the beginning of an episode or as an episode
@@ -41,6 +51,12 @@ class GreedyPolicy(Policy):
     def probability(self, state, action):
         return 1 if action == np.argmax(self.q_table[state]) else 0
 
+    def act_batch(self, states):
+        return np.argmax(self.q_table[np.asarray(states, dtype=int)], axis=1)
+
+    def probability_batch(self, states, actions):
+        return (np.asarray(actions) == self.act_batch(states)).astype(int)
+
 
 class EpsilonSoftPolicy(GreedyPolicy):
     """
@@ -65,6 +81,20 @@ class EpsilonSoftPolicy(GreedyPolicy):
         else: # Nonoptimal action
             return self.epsilon / self.q_table[state].size
 
+    def act_batch(self, states):
+        states = np.asarray(states, dtype=int)
+        explore = np.random.uniform(0, 1, states.size) < self.epsilon
+        random_actions = np.random.randint(0, self.q_table.shape[1], states.size)
+        return np.where(explore, random_actions, super().act_batch(states))
+
+    def probability_batch(self, states, actions):
+        size = self.q_table.shape[1]
+        return np.where(
+            np.asarray(actions) == super().act_batch(states),
+            1 - self.epsilon + self.epsilon / size,
+            self.epsilon / size
+        )
+
 
 class RandomFirstActionPolicy(GreedyPolicy):
     """
@@ -95,3 +125,18 @@ class RandomFirstActionPolicy(GreedyPolicy):
             return 1. / self.q_table[state].size
         else:
             return super().probability(state, action)
+
+    def act_batch(self, states):
+        states = np.asarray(states, dtype=int)
+        if self.take_random_action:
+            actions = np.random.randint(0, self.q_table.shape[1], states.size)
+        else:
+            actions = super().act_batch(states)
+        self.take_random_action = False
+        return actions
+
+    def probability_batch(self, states, actions):
+        if self.take_random_action:
+            return np.full(np.size(states), 1. / self.q_table.shape[1])
+        else:
+            return super().probability_batch(states, actions)
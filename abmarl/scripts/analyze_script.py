@@ -10,6 +10,12 @@ def create_parser(subparsers):
         '-c', '--checkpoint', type=int,
         help='Specify which checkpoint to load. Default is the last timestep in the directory.'
     )
+    analyze_parser.add_argument(
+        '--record-trajectories', action='store_true',
+        help='Record the agents\' trajectories and the simulation\'s frames to the '
+        'trajectories directory in the saved policy directory. The simulation must implement '
+        'get_render_state and set_render_state.'
+    )
     analyze_parser.add_argument('--seed', type=int, help='Seed for reproducibility.')
     return analyze_parser
 
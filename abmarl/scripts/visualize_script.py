@@ -22,6 +22,22 @@ def create_parser(subparsers):
     visualize_parser.add_argument(
         '--no-explore', action='store_false', help='Turn off exploration in the action policy.'
     )
+    visualize_parser.add_argument(
+        '--record-trajectories', action='store_true',
+        help='Record the agents\' trajectories and the simulation\'s frames to the trajectories '
+        'directory in the saved policy directory. The simulation must implement '
+        'get_render_state and set_render_state.'
+    )
+    visualize_parser.add_argument(
+        '--from-recording', action='store_true',
+        help='Render the episodes from the trajectories recorded with --record-trajectories '
+        'by analyze or visualize instead of running the trainer.'
+    )
+    visualize_parser.add_argument(
+        '--headless', action='store_true',
+        help='Render offscreen without a GUI. Writes a video with --record, otherwise an '
+        'image sequence for each episode.'
+    )
     visualize_parser.add_argument('--seed', type=int, help='Seed for reproducibility.')
     return visualize_parser
 
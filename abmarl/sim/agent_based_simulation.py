@@ -231,3 +231,57 @@ class AgentBasedSimulation(ABC):
         Return the agent's info.
         """
         pass
+
+    def get_obs_batch(self, agent_ids, **kwargs):
+        """
+        Return a dictionary mapping each of the agents to its observation.
+
+        The managers get the output of all their agents at once through the batch
+        getters. By default, they call the getter of each agent. Override them
+        if the simulation can compute the output of many agents in one pass, and
+        fall back to the default if a subclass overrides the single-agent getter
+        (see _overrides).
+        """
+        return {agent_id: self.get_obs(agent_id, **kwargs) for agent_id in agent_ids}
+
+    def get_reward_batch(self, agent_ids, **kwargs):
+        """
+        Return a dictionary mapping each of the agents to its reward.
+        """
+        return {agent_id: self.get_reward(agent_id, **kwargs) for agent_id in agent_ids}
+
+    def get_done_batch(self, agent_ids, **kwargs):
+        """
+        Return a dictionary mapping each of the agents to its done status.
+        """
+        return {agent_id: self.get_done(agent_id, **kwargs) for agent_id in agent_ids}
+
+    def get_info_batch(self, agent_ids, **kwargs):
+        """
+        Return a dictionary mapping each of the agents to its info.
+        """
+        return {agent_id: self.get_info(agent_id, **kwargs) for agent_id in agent_ids}
+
+    def _overrides(self, name, base):
+        """
+        Determine if this object's class overrides the base class's function.
+        """
+        return getattr(type(self), name) is not getattr(base, name)
+
+    def get_render_state(self, **kwargs):
+        """
+        Return the part of the simulation's state that render draws from, so that
+        it can be recorded into a TrajectoryBuffer and rendered again later with
+        set_render_state. The output is a nested dictionary of values that have
+        the same shapes every step.
+
+        Simulations that support recording and replaying their frames implement
+        both functions.
+        """
+        raise NotImplementedError
+
+    def set_render_state(self, state, **kwargs):
+        """
+        Restore the state recorded by get_render_state so that render draws it.
+        """
+        raise NotImplementedError
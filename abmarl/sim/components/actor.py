@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod, abstractproperty
+import heapq
 
 from gym.spaces import Discrete, Box
 import numpy as np
@@ -6,6 +7,7 @@ import numpy as np
 from abmarl.sim.components.agent import AttackingAgent, GridMovementAgent, HarvestingAgent, \
     SpeedAngleAgent, AcceleratingAgent, VelocityAgent, \
     CollisionAgent, BroadcastingAgent
+from abmarl.sim.components.state import GridPositionState, state_column
 
 
 class Actor(ABC):
@@ -81,8 +83,14 @@ class AttackActor(Actor):
         Specify the number of teams in the simulation for building the team_attack_matrix
         if that is not specified here.
         Default 0, indicating that there are no teams and its a free-for-all battle.
+
+    position_state (PositionState):
+        The position state handler. If given, the distances between agents are
+        read from its cached distance matrix instead of computed pair by pair.
+        Default None.
     """
-    def __init__(self, attack_norm=np.inf, team_attack_matrix=None, number_of_teams=0, **kwargs):
+    def __init__(self, attack_norm=np.inf, team_attack_matrix=None, number_of_teams=0,
+                 position_state=None, **kwargs):
         super().__init__(
             instance=AttackingAgent,
             space_func=lambda agent: Discrete(2),
@@ -98,6 +106,7 @@ class AttackActor(Actor):
         else:
             self.team_attack_matrix = team_attack_matrix
         self.attack_norm = attack_norm
+        self.position_state = position_state
 
     def process_action(self, attacking_agent, action_dict, **kwargs):
         """
@@ -108,6 +117,8 @@ class AttackActor(Actor):
             attacked.
         """
         if self._get_action_from_dict(action_dict):
+            if self.position_state is not None:
+                return self._process_attack_with_position_state(attacking_agent)
             for attacked_agent in self.agents.values():
                 if attacked_agent.id == attacking_agent.id:
                     # Cannot attack yourself
@@ -129,6 +140,43 @@ class AttackActor(Actor):
                     # The agent was successfully attacked!
                     return attacked_agent
 
+    def _process_attack_with_position_state(self, attacking_agent, **kwargs):
+        """
+        Find the agents within the attack range using the position state. Grid
+        position states search only the nearby cells; other position states use
+        the cached distance matrix. The candidates are checked for accuracy in
+        the same order as the agents dict, so the outcome matches the agent-by-agent
+        search.
+        """
+        if isinstance(self.position_state, GridPositionState):
+            can_attack = self.team_attack_matrix[attacking_agent.team]
+            candidates = [
+                attacked_agent for attacked_agent in self.position_state.neighbors(
+                    attacking_agent, attacking_agent.attack_range, self.attack_norm
+                )
+                if attacked_agent.is_alive and can_attack[attacked_agent.team]
+            ]
+        else:
+            agents = self.position_state.agents
+            attacker_index = self.position_state.agent_index[attacking_agent.id]
+            distances = self.position_state.distance_matrix(self.attack_norm)[attacker_index]
+            alive = state_column(agents, 'is_alive').astype(bool)
+            can_attack = self.team_attack_matrix[
+                attacking_agent.team, state_column(agents, 'team')
+            ].astype(bool)
+            in_range = (distances <= attacking_agent.attack_range) & alive & can_attack
+            in_range[attacker_index] = False # Cannot attack yourself
+            agent_list = list(agents.values())
+            candidates = [agent_list[index] for index in np.flatnonzero(in_range)]
+
+        for attacked_agent in candidates:
+            if np.random.uniform() > attacking_agent.attack_accuracy:
+                # Attempted attack, but it failed
+                continue
+            else:
+                # The agent was successfully attacked!
+                return attacked_agent
+
     @property
     def channel(self):
         return 'attack'
@@ -211,7 +259,7 @@ class GridMovementActor(Actor):
             from the desired move if the position update was invalid.
         """
         move = self._get_action_from_dict(action_dict)
-        position_before = agent.position
+        position_before = agent.position.copy()
         self.position_state.modify_position(agent, move, **kwargs)
         return agent.position - position_before
 
@@ -279,7 +327,7 @@ class SpeedAngleMovementActor:
             x_position = agent.speed*np.cos(np.deg2rad(agent.ground_angle))
             y_position = agent.speed*np.sin(np.deg2rad(agent.ground_angle))
 
-            position_before = agent.position
+            position_before = agent.position.copy()
             self.position_state.modify_position(agent, np.array([x_position, y_position]))
             return agent.position - position_before
 
@@ -317,7 +365,7 @@ class AccelerationMovementActor(Actor):
         """
         acceleration = self._get_action_from_dict(action_dict)
         self.velocity_state.modify_velocity(agent, acceleration)
-        position_before = agent.position
+        position_before = agent.position.copy()
         self.position_state.modify_position(agent, agent.velocity, **kwargs)
         return agent.position - position_before
 
@@ -393,15 +441,62 @@ class ContinuousCollisionActor:
 
     agents (dict):
         The dictionary of agents.
+
+    batched (bool):
+        If True, resolve the collisions as array operations over all the colliding
+        pairs instead of one pair at a time. Pairs that share an agent are resolved
+        in the same order as the unbatched mode, so both modes give the same result.
+        Default False.
     """
-    def __init__(self, position_state=None, velocity_state=None, agents=None, **kwargs):
+    def __init__(self, position_state=None, velocity_state=None, agents=None, batched=False,
+                 **kwargs):
         self.position_state = position_state
         self.velocity_state = velocity_state
         self.agents = agents
+        self.batched = batched
 
     def detect_collisions_and_modify_states(self, **kwargs):
         """
         Detect collisions between agents and update position and velocities.
+
+        If the position state provides collision candidates, then only the pairs
+        of agents that overlap are checked. Resolving a collision moves the agents
+        back, so the pairs that they overlap at their new positions are checked
+        too. The pairs are processed in the same order as a check over all pairs
+        of agents, so both give the same result.
+        """
+        if hasattr(self.position_state, 'collision_candidates'):
+            if self.batched:
+                self._resolve_candidates_batched()
+            else:
+                self._resolve_candidates()
+            return
+        pairs = self._all_pairs()
+        if self.batched:
+            self._resolve_collisions_batched(pairs)
+            return
+        for agent1, agent2 in pairs:
+            self._resolve_collision(agent1, agent2)
+
+    def _resolve_collision(self, agent1, agent2, **kwargs):
+        """
+        Undo the overlap and update the velocities of the agents if they collide.
+
+        return (bool):
+            True if the agents collided.
+        """
+        dist = np.linalg.norm(agent1.position - agent2.position)
+        combined_sizes = agent1.size + agent2.size
+        if dist < combined_sizes:
+            self._undo_overlap(agent1, agent2, dist, combined_sizes)
+            self._update_velocities(agent1, agent2)
+            return True
+        return False
+
+    def _all_pairs(self, **kwargs):
+        """
+        Every pair of agents where the first is a moving CollisionAgent and the
+        second is a CollisionAgent that has not been checked yet.
         """
         checked_agents = set()
         for agent1 in self.agents.values():
@@ -409,15 +504,238 @@ class ContinuousCollisionActor:
                 continue
             checked_agents.add(agent1.id)
             for agent2 in self.agents.values():
-                if not (isinstance(agent1, VelocityAgent) and isinstance(agent2, CollisionAgent)):
-                    continue
+                if not isinstance(agent2, CollisionAgent): continue
                 if agent1.id == agent2.id: continue # Cannot collide with yourself
                 if agent2.id in checked_agents: continue # Already checked this agent
-                dist = np.linalg.norm(agent1.position - agent2.position)
-                combined_sizes = agent1.size + agent2.size
-                if dist < combined_sizes:
-                    self._undo_overlap(agent1, agent2, dist, combined_sizes)
-                    self._update_velocities(agent1, agent2)
+                yield agent1, agent2
+
+    def _candidate_pairs(self, **kwargs):
+        """
+        The nearby pairs from the position state's broad phase at the current
+        positions, arranged like _all_pairs.
+        """
+        agents = list(self.agents.values())
+        order = {agent.id: index for index, agent in enumerate(agents)}
+        keys = set()
+        for agent1, agent2 in self.position_state.collision_candidates():
+            key = self._pair_key(agents, order[agent1.id], order[agent2.id])
+            if key is not None:
+                keys.add(key)
+        return [(agents[index1], agents[index2]) for index1, index2 in sorted(keys)]
+
+    def _pair_key(self, agents, index1, index2, **kwargs):
+        """
+        The position of the pair in the order of _all_pairs, as the indices of
+        the agents in the agents dict with the moving agent first. None if neither
+        agent moves.
+        """
+        moving1 = isinstance(agents[index1], VelocityAgent)
+        moving2 = isinstance(agents[index2], VelocityAgent)
+        index1, index2 = int(index1), int(index2)
+        if moving1 and moving2:
+            return (min(index1, index2), max(index1, index2))
+        elif moving1:
+            return (index1, index2)
+        elif moving2:
+            return (index2, index1)
+        else:
+            return None
+
+    def _collider_arrays(self, agents, **kwargs):
+        """
+        The positions and sizes of the agents. Agents that are not CollisionAgents
+        have nan positions so that they never overlap.
+        """
+        position = np.array([
+            agent.position if isinstance(agent, CollisionAgent) else np.full(2, np.nan)
+            for agent in agents
+        ], dtype=float)
+        size = np.array([
+            agent.size if isinstance(agent, CollisionAgent) else 0. for agent in agents
+        ], dtype=float)
+        return position, size
+
+    def _resolve_candidates(self, **kwargs):
+        """
+        Resolve the collisions among the candidate pairs one at a time, in the
+        order of _all_pairs. When a collision moves two agents, the pairs that
+        they overlap at their new positions and that come later in the order are
+        added to the pairs still to check. A pair that is never added does not
+        overlap when its turn comes, because neither of its agents has moved since
+        it was last found apart.
+        """
+        agents = list(self.agents.values())
+        order = {agent.id: index for index, agent in enumerate(agents)}
+        position, size = self._collider_arrays(agents)
+        heap = [(order[agent1.id], order[agent2.id]) for agent1, agent2 in self._candidate_pairs()]
+        queued = set(heap)
+        heapq.heapify(heap)
+        while heap:
+            key = heapq.heappop(heap)
+            if not self._resolve_collision(agents[key[0]], agents[key[1]]):
+                continue
+            for index in key:
+                position[index] = agents[index].position
+                overlapping = np.linalg.norm(position - position[index], axis=-1) < \
+                    size + size[index]
+                overlapping[index] = False
+                for other_index in np.flatnonzero(overlapping):
+                    new_key = self._pair_key(agents, index, other_index)
+                    if new_key is not None and new_key > key and new_key not in queued:
+                        queued.add(new_key)
+                        heapq.heappush(heap, new_key)
+
+    def _resolve_candidates_batched(self, **kwargs):
+        """
+        Resolve the collisions among the candidate pairs with array operations.
+
+        The rounds are fixed before they are resolved, so pairs that only overlap
+        after a collision moved one of their agents are found afterwards: if any
+        position that an agent moved to overlaps any position of an agent that it
+        is not paired with, then that pair is added and the collisions are resolved
+        again from the start. Once no pair is added, the unchecked pairs never
+        overlap, so the result is the same as checking all the pairs.
+        """
+        agents = list(self.agents.values())
+        order = {agent.id: index for index, agent in enumerate(agents)}
+        position, size = self._collider_arrays(agents)
+        keys = {(order[agent1.id], order[agent2.id]) for agent1, agent2 in self._candidate_pairs()}
+        while True:
+            pairs = [(agents[index1], agents[index2]) for index1, index2 in sorted(keys)]
+            resolved = self._collide_batched(pairs)
+            slot_agents, moves = resolved[0], resolved[-1]
+            if not moves:
+                break
+            slot_index = np.array([order[agent.id] for agent in slot_agents], dtype=int)
+            owners = slot_index[np.concatenate([slots for slots, _ in moves])]
+            points = np.concatenate([slot_position for _, slot_position in moves])
+            all_owners = np.concatenate([np.arange(len(agents)), owners])
+            all_points = np.concatenate([position, points])
+            distances = np.linalg.norm(
+                points[:, np.newaxis, :] - all_points[np.newaxis, :, :], axis=-1
+            )
+            overlapping = distances < size[owners][:, np.newaxis] + size[all_owners]
+            new_keys = set()
+            for row, column in zip(*np.nonzero(overlapping)):
+                index1, index2 = owners[row], all_owners[column]
+                if index1 == index2: continue
+                key = self._pair_key(agents, index1, index2)
+                if key is not None and key not in keys:
+                    new_keys.add(key)
+            if not new_keys:
+                break
+            keys |= new_keys
+        self._write_batched(*resolved[:-1])
+
+    def _resolve_collisions_batched(self, pairs, **kwargs):
+        """
+        Resolve the collisions among the pairs with array operations.
+
+        pairs (list):
+            Pairs of CollisionAgents to check, in processing order.
+        """
+        self._write_batched(*self._collide_batched(pairs)[:-1])
+
+    def _collide_batched(self, pairs, **kwargs):
+        """
+        Compute the collisions among the pairs with array operations, without
+        modifying the states.
+
+        The pairs are split into rounds so that no agent appears twice in a round.
+        Each pair goes in the round after the latest round of either of its agents,
+        so pairs that share an agent keep their order and the pairs within a round
+        are independent. The rounds are resolved one after another.
+
+        pairs (list):
+            Pairs of CollisionAgents to check, in processing order.
+
+        return (tuple):
+            The agents in the pairs; their resulting positions, velocities, and
+            whether they collided; and the moves made, as a list of the moved
+            agents' slots and their new positions for each round.
+        """
+        agents = []
+        slots = {}
+        rounds = []
+        last_round = {}
+        for agent1, agent2 in pairs:
+            for agent in (agent1, agent2):
+                if agent.id not in slots:
+                    slots[agent.id] = len(agents)
+                    agents.append(agent)
+            round_ = max(last_round.get(agent1.id, -1), last_round.get(agent2.id, -1)) + 1
+            last_round[agent1.id] = last_round[agent2.id] = round_
+            if round_ == len(rounds):
+                rounds.append([])
+            rounds[round_].append((slots[agent1.id], slots[agent2.id]))
+        if not agents:
+            return agents, None, None, None, []
+
+        position = np.array([agent.position for agent in agents], dtype=float)
+        velocity = np.array([
+            agent.velocity if isinstance(agent, VelocityAgent) else np.zeros(2)
+            for agent in agents
+        ], dtype=float)
+        size = np.array([agent.size for agent in agents], dtype=float)
+        mass = np.array([agent.mass for agent in agents], dtype=float)
+        max_speed = np.array([
+            agent.max_speed if isinstance(agent, VelocityAgent) else np.inf for agent in agents
+        ], dtype=float)
+        collided = np.zeros(len(agents), dtype=bool)
+        moves = []
+
+        for round_pairs in rounds:
+            i, j = np.array(round_pairs).T
+            dist = np.linalg.norm(position[i] - position[j], axis=-1)
+            combined_sizes = size[i] + size[j]
+            colliding = dist < combined_sizes
+            if not colliding.any():
+                continue
+            i, j = i[colliding], j[colliding]
+            dist, combined_sizes = dist[colliding], combined_sizes[colliding]
+            collided[i] = collided[j] = True
+
+            # Undo the overlap
+            overlap = ((combined_sizes - dist) / combined_sizes)[:, np.newaxis]
+            position[i] -= velocity[i] * overlap
+            position[j] -= velocity[j] * overlap
+            moved = np.concatenate([i, j])
+            moves.append((moved, position[moved]))
+
+            # Elastic collision
+            rel_position = position[j] - position[i]
+            rel_velocity = velocity[i] - velocity[j]
+            total_mass = mass[i] + mass[j]
+            projection = np.sum(rel_velocity * rel_position, axis=-1)
+            scale = (projection / np.sum(np.square(rel_position), axis=-1))[:, np.newaxis]
+            impulse = scale * rel_position
+            vel_new_i = velocity[i] - (2 * mass[j] / total_mass)[:, np.newaxis] * impulse
+            vel_new_j = velocity[j] + (2 * mass[i] / total_mass)[:, np.newaxis] * impulse
+            velocity[i] = self._clip_speed(vel_new_i, max_speed[i])
+            velocity[j] = self._clip_speed(vel_new_j, max_speed[j])
+
+        return agents, position, velocity, collided, moves
+
+    def _write_batched(self, agents, position, velocity, collided, **kwargs):
+        """
+        Set the positions and velocities of the agents that collided.
+        """
+        if not agents:
+            return
+        for slot in np.flatnonzero(collided):
+            agent = agents[slot]
+            self.position_state.set_position(agent, position[slot].copy())
+            self.velocity_state.set_velocity(agent, velocity[slot].copy())
+
+    def _clip_speed(self, velocity, max_speed, **kwargs):
+        """
+        Scale down the velocities that are faster than their max speed, matching
+        VelocityState.set_velocity.
+        """
+        speed = np.linalg.norm(velocity, axis=-1)
+        too_fast = speed >= max_speed
+        velocity[too_fast] *= (max_speed[too_fast] / speed[too_fast])[:, np.newaxis]
+        return velocity
 
     def _undo_overlap(self, agent1, agent2, dist, combined_sizes, **kwargs):
         """
@@ -3,6 +3,57 @@ import numpy as np
 from abmarl.sim import PrincipleAgent, ActingAgent, ObservingAgent
 
 
+class _StateTableField:
+    """
+    Descriptor for agent state that can be stored in an AgentStateTable. If the
+    agent is bound to a table, then the attribute reads and writes the agent's
+    row in the table's column of the same name. Otherwise, the attribute is stored
+    on the agent itself.
+    """
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, agent, owner=None):
+        if agent is None:
+            return self
+        table = agent.__dict__.get('_state_table')
+        if table is not None:
+            return table.get(self.name, agent._state_slot)
+        try:
+            return agent.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(
+                f"'{type(agent).__name__}' object has no attribute '{self.name}'"
+            )
+
+    def __set__(self, agent, value):
+        table = agent.__dict__.get('_state_table')
+        if table is not None:
+            table.set(self.name, agent._state_slot, value)
+        else:
+            agent.__dict__[self.name] = value
+
+
+class _OccupancyField(_StateTableField):
+    """
+    Descriptor for the agent state that determines which cells it occupies. Every
+    write bumps the occupancy version of the position states that track the agent,
+    so that their cached occupancy rasters can check that they are current without
+    reading every agent's state.
+    """
+    def __set__(self, agent, value):
+        super().__set__(agent, value)
+        _bump_occupancy_version(agent)
+
+
+def _bump_occupancy_version(agent):
+    """
+    Bump the occupancy version of every position state that tracks the agent.
+    """
+    for position_state in agent.__dict__.get('_occupancy_trackers', ()):
+        position_state.occupancy_version += 1
+
+
 # ------------------ #
 # --- Base Agent --- #
 # ------------------ #
@@ -29,7 +80,14 @@ class ComponentAgent(PrincipleAgent):
     team (int or None):
         The agent's team. Teams are indexed starting from 1, with team 0 reserved
         for agents that are not on a team (None).
+
+    The agent's position, health, and life can be stored in an AgentStateTable
+    instead of on the agent itself. See AgentStateTable for more information.
     """
+    position = _OccupancyField()
+    health = _StateTableField()
+    is_alive = _OccupancyField()
+
     def __init__(self, initial_position=None, min_health=0.0, max_health=1.0, initial_health=None,
                  team=None, **kwargs):
         super().__init__(**kwargs)
@@ -88,6 +146,18 @@ class ComponentAgent(PrincipleAgent):
             self._team = value
         else:
             self._team = 0
+        if self.__dict__.get('_state_table') is not None:
+            self._state_table.set('team', self._state_slot, self._team)
+        _bump_occupancy_version(self)
+
+    def __getstate__(self):
+        """
+        Copies of the agent are not tracked by the original's position states.
+        Position states restore the tracking of their own copied agents.
+        """
+        state = self.__dict__.copy()
+        state.pop('_occupancy_trackers', None)
+        return state
 
     @property
     def configured(self):
@@ -254,6 +324,10 @@ class SpeedAngleAgent(ComponentAgent):
     initial_ground_angle (float):
         The agent's initial ground angle.
     """
+    speed = _StateTableField()
+    banking_angle = _StateTableField()
+    ground_angle = _StateTableField()
+
     def __init__(self, min_speed=0.25, max_speed=1.0, max_banking_angle=45, initial_speed=None,
                  initial_banking_angle=None, initial_ground_angle=None, **kwargs):
         super().__init__(**kwargs)
@@ -314,6 +388,8 @@ class VelocityAgent(ComponentAgent):
         The maximum amount by which an agent can change its velocity in a single
         time step.
     """
+    velocity = _StateTableField()
+
     def __init__(self, initial_velocity=None, max_speed=None, **kwargs):
         super().__init__(**kwargs)
         self.initial_velocity = initial_velocity
@@ -1,5 +1,7 @@
 import numpy as np
 
+from abmarl.sim.components.state import state_column
+
 
 class ResourcesDepletedDone:
     """
@@ -17,6 +19,14 @@ class ResourcesDepletedDone:
         """
         return self.get_all_done(**kwargs)
 
+    def get_done_batch(self, agents, **kwargs):
+        """
+        Return a dictionary mapping each of the agents to True if all the resources
+        are depleted.
+        """
+        done = self.get_all_done(**kwargs)
+        return {agent.id: done for agent in agents}
+
     def get_all_done(self, **kwargs):
         """
         Return True if all the resources are depleted.
@@ -41,6 +51,12 @@ class DeadDone:
         """
         return not agent.is_alive
 
+    def get_done_batch(self, agents, **kwargs):
+        """
+        Return a dictionary mapping each of the agents to True if it is dead.
+        """
+        return _dead(agents)
+
     def get_all_done(self, **kwargs):
         """
         Return True if all agents are dead. Otherwise, return False.
@@ -75,6 +91,12 @@ class TeamDeadDone:
         """
         return not agent.is_alive
 
+    def get_done_batch(self, agents, **kwargs):
+        """
+        Return a dictionary mapping each of the agents to True if it is dead.
+        """
+        return _dead(agents)
+
     def get_all_done(self, **kwargs):
         """
         Return true if the only agent left alive are all on the same team. Otherwise,
@@ -110,6 +132,12 @@ class AnyTeamDeadDone:
         """
         return not agent.is_alive
 
+    def get_done_batch(self, agents, **kwargs):
+        """
+        Return a dictionary mapping each of the agents to True if it is dead.
+        """
+        return _dead(agents)
+
     def get_all_done(self, **kwargs):
         """
         Return true if any team is wiped out, except for team 0 because it's not
@@ -163,12 +191,27 @@ class TooCloseDone:
             return True
 
         # Collision with other birds
-        for other in self.agents.values():
-            if other.id == agent.id: continue # Cannot collide with yourself
-            if np.linalg.norm(other.position - agent.position, self.collision_norm) < \
-                    self.collision_distance:
-                return True
-        return False
+        agent_index = self.position.agent_index[agent.id]
+        too_close = self.position.distance_matrix(self.collision_norm)[agent_index] < \
+            self.collision_distance
+        too_close[agent_index] = False # Cannot collide with yourself
+        return bool(too_close.any())
+
+    def get_done_batch(self, agents, **kwargs):
+        """
+        Return a dictionary mapping each of the agents to True if it is too close
+        to another agent or too close to the edge of the region.
+        """
+        indices = [self.position.agent_index[agent.id] for agent in agents]
+        positions = np.array([agent.position for agent in agents]).reshape(-1, 2)
+        too_low = positions < self.collision_distance
+        too_high = positions > self.position.region - self.collision_distance
+        too_close_edge = np.any(too_low | too_high, axis=1)
+        too_close = self.position.distance_matrix(self.collision_norm)[indices] < \
+            self.collision_distance
+        too_close[np.arange(len(indices)), indices] = False # Cannot collide with yourself
+        done = too_close_edge | too_close.any(axis=1)
+        return {agent.id: bool(agent_done) for agent, agent_done in zip(agents, done)}
 
     def get_all_done(self, **kwargs):
         """
@@ -179,3 +222,12 @@ class TooCloseDone:
             if self.get_done(agent):
                 return True
         return False
+
+
+def _dead(agents):
+    """
+    Map each of the agents to True if it is dead. The agents' life is looked up
+    in one pass if they are bound to an AgentStateTable.
+    """
+    is_alive = state_column({agent.id: agent for agent in agents}, 'is_alive')
+    return {agent.id: not agent_is_alive for agent, agent_is_alive in zip(agents, is_alive)}
@@ -8,6 +8,7 @@ from abmarl.sim.components.observer import SpeedObserver, AngleObserver, Positio
 from abmarl.sim.components.done import DeadDone
 from abmarl.sim.components.agent import SpeedAngleAgent, SpeedAngleActingAgent, AttackingAgent, \
     SpeedAngleObservingAgent, PositionObservingAgent, LifeObservingAgent, HealthObservingAgent
+from abmarl.sim.components.simulation import ComponentRenderStateMixin, ComponentDoneMixin
 from abmarl.sim import AgentBasedSimulation
 from abmarl.tools.matplotlib_utils import mscatter
 
@@ -18,7 +19,7 @@ class FightingBirdAgent(
 ): pass
 
 
-class FightingBirdsSim(AgentBasedSimulation):
+class FightingBirdsSim(ComponentRenderStateMixin, ComponentDoneMixin, AgentBasedSimulation):
     def __init__(self, **kwargs):
         self.agents = kwargs['agents']
 
@@ -31,7 +32,7 @@ class FightingBirdsSim(AgentBasedSimulation):
         self.move_actor = SpeedAngleMovementActor(
             position_state=self.position_state, speed_angle_state=self.speed_angle_state, **kwargs
         )
-        self.attack_actor = AttackActor(**kwargs)
+        self.attack_actor = AttackActor(position_state=self.position_state, **kwargs)
 
         # Observer
         self.position_observer = PositionObserver(position_state=self.position_state, **kwargs)
@@ -101,12 +102,6 @@ class FightingBirdsSim(AgentBasedSimulation):
     def get_reward(self, agent_id, **kwargs):
         pass
 
-    def get_done(self, agent_id, **kwargs):
-        return self.done.get_done(self.agents[agent_id], **kwargs)
-
-    def get_all_done(self, **kwargs):
-        return self.done.get_all_done(**kwargs)
-
     def get_info(self, agent_id, **kwargs):
         pass
 
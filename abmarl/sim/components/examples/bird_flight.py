@@ -7,6 +7,7 @@ from abmarl.sim.components.observer import SpeedObserver, AngleObserver
 from abmarl.sim.components.done import TooCloseDone
 from abmarl.sim.components.agent import SpeedAngleAgent, SpeedAngleActingAgent, \
     SpeedAngleObservingAgent
+from abmarl.sim.components.simulation import ComponentRenderStateMixin, ComponentDoneMixin
 from abmarl.sim import AgentBasedSimulation
 from abmarl.tools.matplotlib_utils import mscatter
 
@@ -14,7 +15,7 @@ from abmarl.tools.matplotlib_utils import mscatter
 class BirdAgent(SpeedAngleAgent, SpeedAngleActingAgent, SpeedAngleObservingAgent): pass
 
 
-class Flight(AgentBasedSimulation):
+class Flight(ComponentRenderStateMixin, ComponentDoneMixin, AgentBasedSimulation):
     def __init__(self, **kwargs):
         self.agents = kwargs['agents']
 
@@ -75,12 +76,6 @@ class Flight(AgentBasedSimulation):
     def get_reward(self, agent_id, **kwargs):
         pass
 
-    def get_done(self, agent_id, **kwargs):
-        return self.done.get_done(self.agents[agent_id], **kwargs)
-
-    def get_all_done(self, **kwargs):
-        return self.done.get_all_done(**kwargs)
-
     def get_info(self, agent_id, **kwargs):
         pass
 
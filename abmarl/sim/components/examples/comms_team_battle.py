@@ -10,6 +10,8 @@ from abmarl.sim.components.observer import PositionObserver, LifeObserver, TeamO
 from abmarl.sim.components.done import TeamDeadDone
 from abmarl.sim.components.wrappers.observer_wrapper import \
     PositionRestrictedObservationWrapper, TeamBasedCommunicationWrapper
+from abmarl.sim.components.simulation import ComponentRenderStateMixin, ComponentObserverMixin, \
+    ComponentDoneMixin
 from abmarl.sim import AgentBasedSimulation
 from abmarl.tools.matplotlib_utils import mscatter
 
@@ -21,7 +23,9 @@ class CommunicatingAgent(BroadcastingAgent, AllChannelsObservingAgent): pass
 class BattleAgent(AttackingAgent, GridMovementAgent, AllChannelsObservingAgent): pass
 
 
-class TeamBattleCommsSim(AgentBasedSimulation):
+class TeamBattleCommsSim(
+    ComponentRenderStateMixin, ComponentObserverMixin, ComponentDoneMixin, AgentBasedSimulation
+):
     def __init__(self, **kwargs):
         self.agents = kwargs['agents']
 
@@ -35,13 +39,16 @@ class TeamBattleCommsSim(AgentBasedSimulation):
         life_observer = LifeObserver(**kwargs)
         team_observer = TeamObserver(**kwargs)
         partial_observer = PositionRestrictedObservationWrapper(
-            [position_observer, team_observer, life_observer], **kwargs
+            [position_observer, team_observer, life_observer], position_state=self.position_state,
+            vectorized=True, **kwargs
+        )
+        self.observer = TeamBasedCommunicationWrapper(
+            [partial_observer], position_state=self.position_state, **kwargs
         )
-        self.comms_observer = TeamBasedCommunicationWrapper([partial_observer], **kwargs)
 
         # actor
         self.move_actor = GridMovementActor(position_state=self.position_state, **kwargs)
-        self.attack_actor = AttackActor(**kwargs)
+        self.attack_actor = AttackActor(position_state=self.position_state, **kwargs)
         self.broadcast_actor = BroadcastActor(broadcast_state=self.broadcast_state, **kwargs)
 
         # done
@@ -53,6 +60,7 @@ class TeamBattleCommsSim(AgentBasedSimulation):
         self.position_state.reset(**kwargs)
         self.life_state.reset(**kwargs)
         self.broadcast_state.reset(**kwargs)
+        self.observer.reset(**kwargs)
 
     def step(self, action_dict, **kwargs):
         # Process attacking
@@ -70,6 +78,8 @@ class TeamBattleCommsSim(AgentBasedSimulation):
         for agent_id, action in action_dict.items():
             self.broadcast_actor.process_action(self.agents[agent_id], action, **kwargs)
 
+        self.observer.step(**kwargs)
+
     def render(self, fig=None, **kwargs):
         fig.clear()
         ax = fig.gca()
@@ -95,19 +105,9 @@ class TeamBattleCommsSim(AgentBasedSimulation):
         plt.plot()
         plt.pause(1e-6)
 
-    def get_obs(self, agent_id, **kwargs):
-        agent = self.agents[agent_id]
-        return self.comms_observer.get_obs(agent, **kwargs)
-
     def get_reward(self, agent_id, **kwargs):
         pass
 
-    def get_done(self, agent_id, **kwargs):
-        return self.done.get_done(self.agents[agent_id], **kwargs)
-
-    def get_all_done(self, **kwargs):
-        return self.done.get_all_done(**kwargs)
-
     def get_info(self, agent_id, **kwargs):
         return {}
 
@@ -9,6 +9,7 @@ from abmarl.sim.components.actor import GridMovementActor, GridResourcesActor, A
 from abmarl.sim.components.done import DeadDone
 from abmarl.sim.components.agent import PositionObservingAgent, ResourceObservingAgent, \
     HealthObservingAgent, LifeObservingAgent, GridMovementAgent, HarvestingAgent, AttackingAgent
+from abmarl.sim.components.simulation import ComponentRenderStateMixin, ComponentDoneMixin
 from abmarl.sim import AgentBasedSimulation
 from abmarl.tools.matplotlib_utils import mscatter
 
@@ -19,7 +20,7 @@ class FightForResourcesAgent(
 ): pass
 
 
-class FightForResourcesSim(AgentBasedSimulation):
+class FightForResourcesSim(ComponentRenderStateMixin, ComponentDoneMixin, AgentBasedSimulation):
     def __init__(self, **kwargs):
         self.agents = kwargs['agents']
 
@@ -37,7 +38,7 @@ class FightForResourcesSim(AgentBasedSimulation):
         # Actor components
         self.move_actor = GridMovementActor(position_state=self.position_state, **kwargs)
         self.resource_actor = GridResourcesActor(resource_state=self.resource_state, **kwargs)
-        self.attack_actor = AttackActor(**kwargs)
+        self.attack_actor = AttackActor(position_state=self.position_state, **kwargs)
 
         # Done components
         self.done = DeadDone(**kwargs)
@@ -113,12 +114,6 @@ class FightForResourcesSim(AgentBasedSimulation):
     def get_reward(self, agent_id, **kwargs):
         pass
 
-    def get_done(self, agent_id, **kwargs):
-        return self.done.get_done(self.agents[agent_id])
-
-    def get_all_done(self, **kwargs):
-        return self.done.get_all_done(**kwargs)
-
     def get_info(self, **kwargs):
         return {}
 
@@ -8,6 +8,7 @@ from abmarl.sim.components.actor import GridMovementActor, AttackActor
 from abmarl.sim.components.done import TeamDeadDone
 from abmarl.sim.components.agent import TeamObservingAgent, PositionObservingAgent, \
     HealthObservingAgent, LifeObservingAgent, GridMovementAgent, AttackingAgent
+from abmarl.sim.components.simulation import ComponentRenderStateMixin
 from abmarl.sim import AgentBasedSimulation
 from abmarl.tools.matplotlib_utils import mscatter
 
@@ -18,7 +19,7 @@ class FightingTeamsAgent(
 ): pass
 
 
-class FightingTeamsSim(AgentBasedSimulation):
+class FightingTeamsSim(ComponentRenderStateMixin, AgentBasedSimulation):
     def __init__(self, **kwargs):
         self.agents = kwargs['agents']
 
@@ -34,7 +35,7 @@ class FightingTeamsSim(AgentBasedSimulation):
 
         # Actor Components
         self.move_actor = GridMovementActor(position_state=self.position_state, **kwargs)
-        self.attack_actor = AttackActor(**kwargs)
+        self.attack_actor = AttackActor(position_state=self.position_state, **kwargs)
 
         # Done components
         self.done = TeamDeadDone(**kwargs)
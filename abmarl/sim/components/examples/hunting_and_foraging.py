@@ -14,6 +14,8 @@ from abmarl.sim.components.agent import ComponentAgent, AttackingAgent, GridMove
     AgentObservingAgent, PositionObservingAgent, TeamObservingAgent, LifeObservingAgent
 
 # Import the interface
+from abmarl.sim.components.simulation import ComponentRenderStateMixin, ComponentObserverMixin, \
+    ComponentDoneMixin
 from abmarl.sim import AgentBasedSimulation
 
 # Import extra tools
@@ -38,7 +40,9 @@ class FoodAgent(ComponentAgent): pass
 
 
 # Create the simulation environment from the components
-class HuntingForagingEnv(AgentBasedSimulation):
+class HuntingForagingEnv(
+    ComponentRenderStateMixin, ComponentObserverMixin, ComponentDoneMixin, AgentBasedSimulation
+):
     def __init__(self, **kwargs):
         # Explicitly pull out the the dictionary of agents. This makes the env
         # easier to work with.
@@ -57,15 +61,16 @@ class HuntingForagingEnv(AgentBasedSimulation):
         position_observer = PositionObserver(position_state=self.position_state, **kwargs)
         team_observer = TeamObserver(**kwargs)
         life_observer = LifeObserver(**kwargs)
-        self.partial_observer = PositionRestrictedObservationWrapper(
-            [position_observer, team_observer, life_observer], **kwargs
+        self.observer = PositionRestrictedObservationWrapper(
+            [position_observer, team_observer, life_observer], position_state=self.position_state,
+            vectorized=True, **kwargs
         )
 
         # Actor components
         # These components handle the actions in the step function. This environment
         # supports agents that can move around and attack agents from other teams.
         self.move_actor = GridMovementActor(position_state=self.position_state, **kwargs)
-        self.attack_actor = AttackActor(**kwargs)
+        self.attack_actor = AttackActor(position_state=self.position_state, **kwargs)
 
         # Done components
         # This component tracks when the simulation is done. This environment is
@@ -149,10 +154,6 @@ class HuntingForagingEnv(AgentBasedSimulation):
         plt.plot()
         plt.pause(1e-6)
 
-    def get_obs(self, agent_id, **kwargs):
-        agent = self.agents[agent_id]
-        return self.partial_observer.get_obs(agent, **kwargs)
-
     def get_reward(self, agent_id, **kwargs):
         """
         Return the agents reward and reset it to zero.
@@ -161,12 +162,6 @@ class HuntingForagingEnv(AgentBasedSimulation):
         self.rewards[agent_id] = 0
         return reward_out
 
-    def get_done(self, agent_id, **kwargs):
-        return self.done.get_done(self.agents[agent_id], **kwargs)
-
-    def get_all_done(self, **kwargs):
-        return self.done.get_all_done(**kwargs)
-
     def get_info(self, *args, **kwargs):
         return {}
 
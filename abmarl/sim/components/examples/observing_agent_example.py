@@ -6,6 +6,7 @@ from abmarl.sim.components.observer import GridPositionTeamBasedObserver
 from abmarl.sim.components.actor import GridMovementActor
 from abmarl.sim.components.agent import PositionObservingAgent, AgentObservingAgent, \
     GridMovementAgent
+from abmarl.sim.components.simulation import ComponentRenderStateMixin
 from abmarl.sim import AgentBasedSimulation
 from abmarl.tools.matplotlib_utils import mscatter
 
@@ -14,7 +15,7 @@ class ObservingTeamMovementAgent(PositionObservingAgent, AgentObservingAgent, Gr
     pass
 
 
-class SimpleGridObservations(AgentBasedSimulation):
+class SimpleGridObservations(ComponentRenderStateMixin, AgentBasedSimulation):
     def __init__(self, **kwargs):
         self.agents = kwargs['agents']
 
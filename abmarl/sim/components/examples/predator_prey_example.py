@@ -8,6 +8,7 @@ from abmarl.sim.components.actor import GridMovementActor, AttackActor, GridReso
 from abmarl.sim.components.done import TeamDeadDone
 from abmarl.sim.components.agent import AgentObservingAgent, PositionObservingAgent, \
     ResourceObservingAgent, GridMovementAgent, AttackingAgent, HarvestingAgent
+from abmarl.sim.components.simulation import ComponentRenderStateMixin, ComponentDoneMixin
 from abmarl.sim import AgentBasedSimulation
 from abmarl.tools.matplotlib_utils import mscatter
 
@@ -23,7 +24,7 @@ class PredatorAgent(
 ): pass
 
 
-class PredatorPreySimGridBased(AgentBasedSimulation):
+class PredatorPreySimGridBased(ComponentRenderStateMixin, ComponentDoneMixin, AgentBasedSimulation):
     def __init__(self, **kwargs):
         self.agents = kwargs['agents']
 
@@ -41,7 +42,7 @@ class PredatorPreySimGridBased(AgentBasedSimulation):
         # Actor components
         self.move_actor = GridMovementActor(position_state=self.position_state, **kwargs)
         self.resource_actor = GridResourcesActor(resource_state=self.resource_state, **kwargs)
-        self.attack_actor = AttackActor(**kwargs)
+        self.attack_actor = AttackActor(position_state=self.position_state, **kwargs)
 
         # Done components
         self.done = TeamDeadDone(**kwargs)
@@ -118,12 +119,6 @@ class PredatorPreySimGridBased(AgentBasedSimulation):
     def get_reward(self, agent_id, **kwargs):
         pass
 
-    def get_done(self, agent_id, **kwargs):
-        return self.done.get_done(self.agents[agent_id])
-
-    def get_all_done(self, **kwargs):
-        return self.done.get_all_done(**kwargs)
-
     def get_info(self, *args, **kwargs):
         return {}
 
@@ -9,6 +9,7 @@ from abmarl.sim.components.actor import GridMovementActor, GridResourcesActor
 from abmarl.sim.components.done import DeadDone
 from abmarl.sim.components.agent import PositionObservingAgent, ResourceObservingAgent, \
     HealthObservingAgent, LifeObservingAgent, GridMovementAgent, HarvestingAgent
+from abmarl.sim.components.simulation import ComponentRenderStateMixin, ComponentDoneMixin
 from abmarl.sim import AgentBasedSimulation
 from abmarl.tools.matplotlib_utils import mscatter
 
@@ -19,7 +20,7 @@ class ResourceManagementAgent(
 ): pass
 
 
-class ResourceManagementSim(AgentBasedSimulation):
+class ResourceManagementSim(ComponentRenderStateMixin, ComponentDoneMixin, AgentBasedSimulation):
     def __init__(self, **kwargs):
         self.agents = kwargs['agents']
 
@@ -105,12 +106,6 @@ class ResourceManagementSim(AgentBasedSimulation):
     def get_reward(self, agent_id, **kwargs):
         pass
 
-    def get_done(self, agent_id, **kwargs):
-        return self.done.get_done(self.agents[agent_id])
-
-    def get_all_done(self, **kwargs):
-        return self.done.get_all_done(**kwargs)
-
     def get_info(self, **kwargs):
         return {}
 
@@ -6,6 +6,7 @@ from abmarl.sim.components.actor import AccelerationMovementActor, ContinuousCol
 from abmarl.sim.components.observer import VelocityObserver, PositionObserver
 from abmarl.sim.components.agent import VelocityAgent, AcceleratingAgent, \
     VelocityObservingAgent, PositionObservingAgent, ActingAgent, CollisionAgent, ComponentAgent
+from abmarl.sim.components.simulation import ComponentRenderStateMixin
 from abmarl.sim import AgentBasedSimulation
 from abmarl.tools.matplotlib_utils import mscatter
 
@@ -18,7 +19,7 @@ class FixedLandmark(ComponentAgent): pass
 class MovingLandmark(VelocityAgent): pass
 
 
-class ParticleSim(AgentBasedSimulation):
+class ParticleSim(ComponentRenderStateMixin, AgentBasedSimulation):
     def __init__(self, **kwargs):
         self.agents = kwargs['agents']
 
@@ -52,6 +52,25 @@ class GridWorld(World):
 
         return ax
 
+    def init_render(self, fig, **kwargs):
+        """
+        Create the persistent artists for the HeadlessRenderer.
+        """
+        ax = fig.gca()
+        return {
+            'agents': ax.scatter([], [], marker='o', s=200, edgecolor='black', facecolor='gray')
+        }
+
+    def update_render(self, artists, render_condition=None, **kwargs):
+        """
+        Move the agents' markers to their current positions.
+        """
+        artists['agents'].set_offsets(np.array([
+            [agent.position[1] + 0.5, self.region - 0.5 - agent.position[0]]
+            for agent in self.agents.values()
+            if render_condition is None or render_condition[agent.id]
+        ]).reshape(-1, 2))
+
 
 class Movement:
     def __init__(self, region=None, agents=None, **kwargs):
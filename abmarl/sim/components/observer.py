@@ -280,8 +280,12 @@ class GridPositionBasedObserver:
         Empty          :  0
         Agent occupied : 1
 
-    position (PositionState):
-        The position state handler, which contains the region.
+    The observations are sliced out of the position state's occupancy raster,
+    which is padded by the largest agent_view and shared by all the agents.
+
+    position (GridPositionState):
+        The position state handler, which contains the region and the occupancy
+        of the agents.
 
     agents (dict):
         The dictionary of agents.
@@ -290,12 +294,14 @@ class GridPositionBasedObserver:
         self.position_state = position_state
         self.agents = agents
 
+        self._padding = 0
         for agent in agents.values():
             if isinstance(agent, AgentObservingAgent) and \
                isinstance(agent, PositionObservingAgent):
                 agent.observation_space['position'] = Box(
                     -1, 1, (agent.agent_view*2+1, agent.agent_view*2+1), np.int
                 )
+                self._padding = max(self._padding, agent.agent_view)
 
     def get_obs(self, my_agent, **kwargs):
         """
@@ -304,40 +310,10 @@ class GridPositionBasedObserver:
         """
         if isinstance(my_agent, AgentObservingAgent) and \
            isinstance(my_agent, PositionObservingAgent):
-            signal = np.zeros((my_agent.agent_view*2+1, my_agent.agent_view*2+1))
-
-            # --- Determine the boundaries of the agents' grids --- #
-            # For left and top, we just do: view - x,y >= 0
-            # For the right and bottom, we just do region - x,y - 1 - view > 0
-            if my_agent.agent_view - my_agent.position[0] >= 0: # Top end
-                signal[0:my_agent.agent_view - my_agent.position[0], :] = -1
-            if my_agent.agent_view - my_agent.position[1] >= 0: # Left end
-                signal[:, 0:my_agent.agent_view - my_agent.position[1]] = -1
-            if self.position_state.region - my_agent.position[0] - my_agent.agent_view - 1 < 0:
-                # Bottom end
-                signal[
-                    self.position_state.region - my_agent.position[0] - my_agent.agent_view - 1:,
-                    :
-                ] = -1
-            if self.position_state.region - my_agent.position[1] - my_agent.agent_view - 1 < 0:
-                # Right end
-                signal[
-                    :, self.position_state.region - my_agent.position[1] - my_agent.agent_view - 1:
-                ] = -1
-
-            # --- Determine the positions of all the other alive agents --- #
-            for other_id, other_agent in self.agents.items():
-                if other_id == my_agent.id: continue # Don't observe yourself
-                if not other_agent.is_alive: continue # Can only observe alive agents
-                r_diff = other_agent.position[0] - my_agent.position[0]
-                c_diff = other_agent.position[1] - my_agent.position[1]
-                if -my_agent.agent_view <= r_diff <= my_agent.agent_view and \
-                        -my_agent.agent_view <= c_diff <= my_agent.agent_view:
-                    r_diff += my_agent.agent_view
-                    c_diff += my_agent.agent_view
-                    signal[r_diff, c_diff] = 1 # There is an agent at this location.
-
-            return {'position': signal}
+            signal = _occupancy_window(
+                self.position_state.occupancy(self._padding), self._padding, my_agent
+            )
+            return {'position': np.where(signal > 0, 1., signal)}
         else:
             return {}
 
@@ -349,8 +325,12 @@ class GridPositionTeamBasedObserver:
     the cell is the number of agents on that team that occupy that square. -1
     indicates out of bounds.
 
-    position (PositionState):
-        The position state handler, which contains the region.
+    The observations are sliced out of the position state's occupancy raster,
+    which is padded by the largest agent_view and shared by all the agents.
+
+    position (GridPositionState):
+        The position state handler, which contains the region and the occupancy
+        of the agents.
 
     number_of_teams (int):
         The number of teams in this simuation.
@@ -364,6 +344,7 @@ class GridPositionTeamBasedObserver:
         self.number_of_teams = number_of_teams + 1
         self.agents = agents
 
+        self._padding = 0
         for agent in self.agents.values():
             if isinstance(agent, AgentObservingAgent) and \
                isinstance(agent, PositionObservingAgent):
@@ -373,6 +354,7 @@ class GridPositionTeamBasedObserver:
                     (agent.agent_view*2+1, agent.agent_view*2+1, self.number_of_teams),
                     np.int
                 )
+                self._padding = max(self._padding, agent.agent_view)
 
     def get_obs(self, my_agent, **kwargs):
         """
@@ -382,48 +364,31 @@ class GridPositionTeamBasedObserver:
         """
         if isinstance(my_agent, AgentObservingAgent) and \
            isinstance(my_agent, PositionObservingAgent):
-            signal = np.zeros((my_agent.agent_view*2+1, my_agent.agent_view*2+1))
-
-            # --- Determine the boundaries of the agents' grids --- #
-            # For left and top, we just do: view - x,y >= 0
-            # For the right and bottom, we just do region - x,y - 1 - view > 0
-            if my_agent.agent_view - my_agent.position[0] >= 0: # Top end
-                signal[0:my_agent.agent_view - my_agent.position[0], :] = -1
-            if my_agent.agent_view - my_agent.position[1] >= 0: # Left end
-                signal[:, 0:my_agent.agent_view - my_agent.position[1]] = -1
-            if self.position_state.region - my_agent.position[0] - my_agent.agent_view - 1 < 0:
-                # Bottom end
-                signal[
-                    self.position_state.region - my_agent.position[0] - my_agent.agent_view - 1:,
-                    :
-                ] = -1
-            if self.position_state.region - my_agent.position[1] - my_agent.agent_view - 1 < 0:
-                # Right end
-                signal[
-                    :,
-                    self.position_state.region - my_agent.position[1] - my_agent.agent_view - 1:
-                ] = -1
-
-            # Repeat the boundaries signal for all teams
-            signal = np.repeat(signal[:, :, np.newaxis], self.number_of_teams, axis=2)
-
-            # --- Determine the positions of all the other alive agents --- #
-            for other_id, other_agent in self.agents.items():
-                if other_id == my_agent.id: continue # Don't observe yourself
-                if not other_agent.is_alive: continue # Can only observe alive agents
-                r_diff = other_agent.position[0] - my_agent.position[0]
-                c_diff = other_agent.position[1] - my_agent.position[1]
-                if -my_agent.agent_view <= r_diff <= my_agent.agent_view and \
-                        -my_agent.agent_view <= c_diff <= my_agent.agent_view:
-                    r_diff += my_agent.agent_view
-                    c_diff += my_agent.agent_view
-                    signal[r_diff, c_diff, other_agent.team] += 1
-
-            return {'position': signal}
+            raster = self.position_state.occupancy(
+                self._padding, number_of_teams=self.number_of_teams
+            )
+            return {'position': _occupancy_window(raster, self._padding, my_agent)}
         else:
             return {}
 
 
+def _occupancy_window(raster, padding, my_agent):
+    """
+    Copy the agent's view out of the padded occupancy raster, not counting the
+    agent itself.
+    """
+    view = my_agent.agent_view
+    row = int(my_agent.position[0]) + padding
+    col = int(my_agent.position[1]) + padding
+    signal = raster[row - view:row + view + 1, col - view:col + view + 1].copy()
+    if my_agent.is_alive:
+        if signal.ndim == 3:
+            signal[view, view, my_agent.team] -= 1
+        else:
+            signal[view, view] -= 1
+    return signal
+
+
 class SpeedObserver(Observer):
     """
     Observe the speed of all the agents in the simulator.
@@ -0,0 +1,83 @@
+import numpy as np
+
+from abmarl.sim.components.agent import ComponentAgent
+
+
+class ComponentRenderStateMixin:
+    """
+    Record and restore the render state of a simulation built from the components
+    whose render draws from the agents' positions and life and from the resources
+    of its resource_state, if it has one. Inherit from this before AgentBasedSimulation
+    to support recording frames for replay.
+
+    Positions are 2-dimensional, as in the position states. Agents without a position
+    are recorded at nan.
+    """
+    def get_render_state(self, **kwargs):
+        """
+        The agents' positions and life, keyed by the agents' ids, and the resources.
+        """
+        agents = [agent for agent in self.agents.values() if isinstance(agent, ComponentAgent)]
+        state = {
+            'position': {
+                agent.id: np.full(2, np.nan) if agent.position is None else agent.position
+                for agent in agents
+            },
+            'is_alive': {agent.id: agent.is_alive for agent in agents},
+        }
+        if hasattr(self, 'resource_state'):
+            state['resources'] = self.resource_state.resources
+        return state
+
+    def set_render_state(self, state, **kwargs):
+        """
+        Restore the agents' positions and life and the resources.
+        """
+        for agent_id, position in state['position'].items():
+            position = np.array(position)
+            self.agents[agent_id].position = None if np.isnan(position).all() else position
+        for agent_id, is_alive in state['is_alive'].items():
+            self.agents[agent_id].is_alive = bool(is_alive)
+        if 'resources' in state:
+            self.resource_state.resources = np.array(state['resources'])
+
+
+class ComponentDoneMixin:
+    """
+    Get the agents' done conditions from the simulation's done component, which
+    must be stored as done. Inherit from this before AgentBasedSimulation.
+
+    get_done_batch gets the whole batch from the done component in one call. If
+    a subclass overrides get_done, then get_done_batch calls it for each agent
+    instead so that the override is respected.
+    """
+    def get_done(self, agent_id, **kwargs):
+        return self.done.get_done(self.agents[agent_id], **kwargs)
+
+    def get_done_batch(self, agent_ids, **kwargs):
+        if type(self).get_done is not ComponentDoneMixin.get_done:
+            return super().get_done_batch(agent_ids, **kwargs)
+        return self.done.get_done_batch([self.agents[agent_id] for agent_id in agent_ids], **kwargs)
+
+    def get_all_done(self, **kwargs):
+        return self.done.get_all_done(**kwargs)
+
+
+class ComponentObserverMixin:
+    """
+    Get the agents' observations from the simulation's observer component, which
+    must be stored as observer. Inherit from this before AgentBasedSimulation.
+
+    get_obs_batch gets the whole batch from the observer in one call. If a subclass
+    overrides get_obs, then get_obs_batch calls it for each agent instead so that
+    the override is respected.
+    """
+    def get_obs(self, agent_id, **kwargs):
+        return self.observer.get_obs(self.agents[agent_id], **kwargs)
+
+    def get_obs_batch(self, agent_ids, **kwargs):
+        if type(self).get_obs is not ComponentObserverMixin.get_obs:
+            return super().get_obs_batch(agent_ids, **kwargs)
+        return self.observer.get_obs_batch(
+            [self.agents[agent_id] for agent_id in agent_ids], **kwargs
+        )
@@ -4,6 +4,132 @@ import numpy as np
 
 from abmarl.sim.components.agent import SpeedAngleAgent, VelocityAgent, CollisionAgent, \
     BroadcastingAgent
+from abmarl.sim.modules.grid_resources import RegrowingCells
+
+
+# ------------------- #
+# --- State Table --- #
+# ------------------- #
+
+class AgentStateTable:
+    """
+    Stores the agents' state in contiguous numpy arrays indexed by each agent's
+    slot instead of as attributes on each agent. The agents are bound to the table
+    when it is created, after which their position, health, is_alive, team,
+    velocity, speed, banking_angle, and ground_angle attributes are views onto
+    the table's rows. Components can then update or query every agent with a
+    single vectorized operation over the table's columns.
+
+    The table is opt-in. Create it after the agents and before any of the state
+    handlers. Agents that are not bound to a table store their state on themselves.
+
+    agents (dict):
+        The dictionary of agents.
+
+    position_dtype (type):
+        The dtype of the position column. Use int for grid positions.
+        Default float.
+    """
+    columns = (
+        'position', 'health', 'is_alive', 'team', 'velocity', 'speed', 'banking_angle',
+        'ground_angle'
+    )
+
+    def __init__(self, agents=None, position_dtype=float, **kwargs):
+        assert type(agents) is dict, "agents must be a dict"
+        self.agents = agents
+        self.ids = list(agents)
+        self.slots = {agent_id: slot for slot, agent_id in enumerate(self.ids)}
+
+        number_of_agents = len(self.ids)
+        self.position = np.zeros((number_of_agents, 2), dtype=position_dtype)
+        self.health = np.zeros(number_of_agents)
+        self.is_alive = np.zeros(number_of_agents, dtype=bool)
+        self.team = np.zeros(number_of_agents, dtype=int)
+        self.velocity = np.zeros((number_of_agents, 2))
+        self.speed = np.zeros(number_of_agents)
+        self.banking_angle = np.zeros(number_of_agents)
+        self.ground_angle = np.zeros(number_of_agents)
+        # Track which entries have been set. An unset entry reads as None.
+        self.valid = {
+            column: np.zeros(number_of_agents, dtype=bool) for column in self.columns
+        }
+
+        for slot, agent in enumerate(self.agents.values()):
+            self._bind(agent, slot)
+
+    def _bind(self, agent, slot):
+        """
+        Move the agent's state into the table and bind the agent to its slot.
+        """
+        existing_state = {
+            column: agent.__dict__.pop(column) for column in self.columns
+            if column in agent.__dict__
+        }
+        agent._state_table = self
+        agent._state_slot = slot
+        self.set('team', slot, agent.team)
+        for column, value in existing_state.items():
+            self.set(column, slot, value)
+
+    def get(self, column, slot):
+        """
+        Get the value of the column at the slot. Vector columns return a view
+        onto the row, so in-place modifications are written to the table. Unset
+        entries return None.
+        """
+        if not self.valid[column][slot]:
+            return None
+        values = getattr(self, column)
+        if values.ndim > 1:
+            return values[slot]
+        else:
+            return values[slot].item()
+
+    def set(self, column, slot, value):
+        """
+        Set the value of the column at the slot. Setting None unsets the entry.
+        """
+        if value is None:
+            self.valid[column][slot] = False
+        else:
+            getattr(self, column)[slot] = value
+            self.valid[column][slot] = True
+
+    def indices(self, agents):
+        """
+        Get the slots of an iterable of agents as an integer array.
+        """
+        return np.array([self.slots[agent.id] for agent in agents], dtype=int)
+
+
+def bound_state_table(agents):
+    """
+    Return the AgentStateTable to which all the agents are bound, or None if the
+    agents are not all bound to the same table.
+    """
+    table = None
+    for agent in agents.values():
+        agent_table = agent.__dict__.get('_state_table')
+        if agent_table is None or (table is not None and agent_table is not table):
+            return None
+        table = agent_table
+    return table
+
+
+def state_column(agents, column):
+    """
+    Gather an attribute of the agents into an array ordered like the agents dict.
+    If the agents are bound to an AgentStateTable, then the table's column is
+    returned directly, or indexed by the agents' slots if they are only some of
+    the table's agents.
+    """
+    table = bound_state_table(agents)
+    if table is not None:
+        if table.ids == list(agents):
+            return getattr(table, column)
+        return getattr(table, column)[table.indices(agents.values())]
+    return np.array([getattr(agent, column) for agent in agents.values()])
 
 
 # --------------------- #
@@ -124,6 +250,8 @@ class PositionState(ABC):
         self.region = region
         assert type(agents) is dict, "agents must be a dict"
         self.agents = agents
+        self.agent_index = {agent_id: index for index, agent_id in enumerate(self.agents)}
+        self._distance_cache = {}
 
     def reset(self, **kwargs):
         """
@@ -133,12 +261,65 @@ class PositionState(ABC):
         # Invalidate all the agents' positions from last episode
         for agent in self.agents.values():
             agent.position = None
+        self.invalidate_distances()
 
         for agent in self.agents.values():
             if agent.initial_position is not None:
                 agent.position = agent.initial_position
             else:
                 self.random_reset(agent)
+        self.invalidate_distances()
+
+    def invalidate_distances(self, **kwargs):
+        """
+        Clear the cached distance matrices. This is called whenever a position
+        is changed through this state handler. If you change the agents' positions
+        outside of the state handler, then you must call this yourself.
+        """
+        self._distance_cache.clear()
+
+    def distance_matrix(self, norm=2, **kwargs):
+        """
+        Get the distances between every pair of agents according to the norm.
+        The matrix is indexed by agent_index and is computed once per norm and
+        cached until a position changes. Agents without a position have nan
+        distances.
+
+        norm (int):
+            The norm to use when calculating the distances.
+            Default 2.
+
+        return (np.ndarray):
+            Matrix of distances between agents.
+        """
+        if norm not in self._distance_cache:
+            positions = self._positions()
+            self._distance_cache[norm] = np.linalg.norm(
+                positions[:, np.newaxis, :] - positions[np.newaxis, :, :], norm, axis=-1
+            )
+        return self._distance_cache[norm]
+
+    def distance(self, agent, other, norm=2, **kwargs):
+        """
+        Get the distance between two agents according to the norm.
+        """
+        return self.distance_matrix(norm)[
+            self.agent_index[agent.id], self.agent_index[other.id]
+        ]
+
+    def _positions(self):
+        """
+        Gather the agents' positions into an array ordered by agent_index. Agents
+        without a position are filled with nan.
+        """
+        table = bound_state_table(self.agents)
+        if table is not None and table.ids == list(self.agents):
+            return np.where(table.valid['position'][:, np.newaxis], table.position, np.nan)
+        positions = np.full((len(self.agents), 2), np.nan)
+        for index, agent in enumerate(self.agents.values()):
+            if agent.position is not None:
+                positions[index] = agent.position
+        return positions
 
     @abstractmethod
     def random_reset(self, agent, **kwargs):
@@ -168,14 +349,85 @@ class GridPositionState(PositionState):
     Agents are positioned in a grid and cannot go outside of the region. Positions
     are a 2-element numpy array, where the first element is the grid-row from top
     to bottom and the second is the grid-column from left to right.
+
+    The state handler maintains an index from each occupied cell to the agents
+    in that cell, which is updated whenever a position changes through the state
+    handler. Use neighbors to find the agents near some agent without scanning
+    all the agents, or occupancy to get a raster of the whole region.
+
+    The state handler tracks its agents' occupancy_version, which is bumped whenever
+    one of its agents' position, is_alive, or team is set, so that the occupancy
+    raster is only rebuilt when it could have changed.
     """
+    def __init__(self, **kwargs):
+        self._occupancy_cache = {}
+        self.occupancy_version = 0
+        super().__init__(**kwargs)
+        self._cells = {}
+
+    @property
+    def agents(self):
+        return self._agents
+
+    @agents.setter
+    def agents(self, value):
+        for agent in getattr(self, '_agents', {}).values():
+            self._untrack(agent)
+        self._agents = value
+        for agent in value.values():
+            self._track(agent)
+        self.occupancy_version += 1
+
+    def __setstate__(self, state):
+        """
+        Track the copied agents when the state handler is copied or unpickled.
+        """
+        self.__dict__.update(state)
+        for agent in self.agents.values():
+            self._track(agent)
+
+    def _track(self, agent):
+        """
+        Register the state handler with the agent so that writes to the agent's
+        position, is_alive, or team bump this state handler's occupancy_version.
+        """
+        trackers = agent.__dict__.setdefault('_occupancy_trackers', [])
+        if not any(tracker is self for tracker in trackers):
+            trackers.append(self)
+
+    def _untrack(self, agent):
+        """
+        Stop tracking the agent's writes.
+        """
+        trackers = agent.__dict__.get('_occupancy_trackers', [])
+        trackers[:] = [tracker for tracker in trackers if tracker is not self]
+
+    def reset(self, **kwargs):
+        """
+        Reset the agents' positions and rebuild the cell index.
+        """
+        for agent in self.agents.values():
+            self._track(agent)
+        super().reset(**kwargs)
+        self._cells = {}
+        for agent in self.agents.values():
+            if agent.position is not None:
+                self._cells.setdefault(self._cell(agent.position), set()).add(agent.id)
+
     def set_position(self, agent, _position, **kwargs):
         """
         Set the agent's position to the incoming value only if the new position
         is within the region.
         """
         if 0 <= _position[0] < self.region and 0 <= _position[1] < self.region:
+            if agent.position is not None:
+                old_cell = self._cell(agent.position)
+                self._cells.get(old_cell, set()).discard(agent.id)
+                if not self._cells.get(old_cell, True):
+                    del self._cells[old_cell]
             agent.position = _position
+            self._cells.setdefault(self._cell(_position), set()).add(agent.id)
+            self.invalidate_distances()
 
     def random_reset(self, agent, **kwargs):
         """
@@ -183,22 +435,151 @@ class GridPositionState(PositionState):
         """
         agent.position = np.random.randint(0, self.region, 2)
 
+    def invalidate_distances(self, **kwargs):
+        """
+        Clear the cached distance matrices and occupancy rasters.
+        """
+        super().invalidate_distances(**kwargs)
+        self._occupancy_cache.clear()
+
+    def occupancy(self, padding=0, number_of_teams=None, **kwargs):
+        """
+        Count the living agents in each cell of the region. The raster is built
+        once with a single scatter-add and cached until the occupancy_version changes,
+        so observers can slice every agent's view out of it. If you write the positions,
+        lives, or teams directly into an AgentStateTable's columns, then you must call
+        invalidate_distances yourself.
+
+        padding (int):
+            The number of cells to add around each side of the region. Padded cells
+            are -1.
+            Default 0.
+
+        number_of_teams (int or None):
+            If given, the raster has a channel for each team, indexed by the agents'
+            team, and counts the agents on each team separately.
+            Default None.
+
+        return (np.ndarray):
+            The raster, with the region's cell (r, c) at (r + padding, c + padding).
+        """
+        key = (padding, number_of_teams)
+        if key in self._occupancy_cache:
+            version, raster = self._occupancy_cache[key]
+            if version == self.occupancy_version:
+                return raster
+
+        is_alive = state_column(self.agents, 'is_alive').astype(bool)
+        positions = self._positions()
+        counted = is_alive & ~np.isnan(positions[:, 0])
+        rows = positions[counted, 0].astype(int) + padding
+        cols = positions[counted, 1].astype(int) + padding
+        size = self.region + 2 * padding
+        if number_of_teams is None:
+            raster = np.zeros((size, size))
+            np.add.at(raster, (rows, cols), 1)
+        else:
+            raster = np.zeros((size, size, number_of_teams))
+            teams = state_column(self.agents, 'team')[counted].astype(int)
+            np.add.at(raster, (rows, cols, teams), 1)
+        if padding > 0:
+            raster[:padding] = -1
+            raster[-padding:] = -1
+            raster[:, :padding] = -1
+            raster[:, -padding:] = -1
+
+        self._occupancy_cache[key] = (self.occupancy_version, raster)
+        return raster
+
+    def neighbors(self, agent, radius, norm=np.inf, **kwargs):
+        """
+        Get the agents within some distance of the agent, not including the agent
+        itself. Only the cells within the radius are searched, so the cost depends
+        on the number of nearby agents, not on the total number of agents.
+
+        agent (ComponentAgent):
+            The agent whose neighbors we want to find.
+
+        radius (int):
+            The maximum distance from the agent.
+
+        norm (int):
+            The norm to use when calculating the distance.
+            Default np.inf.
+
+        return (list):
+            The neighboring agents, ordered the same as the agents dict.
+        """
+        r, c = self._cell(agent.position)
+        reach = int(np.floor(radius))
+        if (2 * reach + 1) ** 2 < len(self._cells):
+            # Search the window of cells around the agent
+            nearby_cells = [
+                (row, col)
+                for row in range(max(0, r - reach), min(self.region - 1, r + reach) + 1)
+                for col in range(max(0, c - reach), min(self.region - 1, c + reach) + 1)
+                if (row, col) in self._cells
+            ]
+        else:
+            # There are fewer occupied cells than cells in the window
+            nearby_cells = [
+                (row, col) for (row, col) in self._cells
+                if abs(row - r) <= reach and abs(col - c) <= reach
+            ]
+
+        neighbor_ids = []
+        for row, col in nearby_cells:
+            if norm != np.inf and np.linalg.norm(np.array([row - r, col - c]), norm) > radius:
+                continue
+            neighbor_ids.extend(
+                other_id for other_id in self._cells[(row, col)] if other_id != agent.id
+            )
+        neighbor_ids.sort(key=self.agent_index.get)
+        return [self.agents[other_id] for other_id in neighbor_ids]
+
+    @staticmethod
+    def _cell(position):
+        return (int(position[0]), int(position[1]))
+
 
 class ContinuousPositionState(PositionState):
     """
     Agents are positioned in a continuous space and can go outside the bounds
     of the region. Positions are a 2-element array, where the first element is
     the x-location and the second is the y-location.
+
+    CollisionAgents are binned into a cell list whose cells are as wide as the
+    largest combined size of two agents. Two agents can only overlap if they are
+    in the same or neighboring cells, so collision checks only need to consider
+    the agents in those cells.
     """
     def __init__(self, reset_attempts=100, **kwargs):
         super().__init__(**kwargs)
         self.reset_attempts = reset_attempts
+        sizes = [agent.size for agent in self.agents.values() if isinstance(agent, CollisionAgent)]
+        self.collision_cell_size = 2 * max(sizes) if sizes else 1
+        self._placed_cells = {}
+
+    def reset(self, **kwargs):
+        """
+        Reset the agents' positions. The CollisionAgents with initial positions
+        are indexed up front so that the randomly placed agents can be checked
+        against them.
+        """
+        self._placed_cells = {}
+        for agent in self.agents.values():
+            if isinstance(agent, CollisionAgent) and agent.initial_position is not None:
+                self._placed_cells.setdefault(
+                    self._collision_cell(agent.initial_position), []
+                ).append(agent)
+        super().reset(**kwargs)
 
     def set_position(self, agent, _position, **kwargs):
         """
         Set the agent's position to the incoming value.
         """
         agent.position = _position
+        self.invalidate_distances()
 
     def random_reset(self, agent, **kwargs):
         """
@@ -207,22 +588,71 @@ class ContinuousPositionState(PositionState):
         if isinstance(agent, CollisionAgent):
             for _ in range(self.reset_attempts):
                 potential_position = np.random.uniform(0, self.region, 2)
-                collision = False
-                for other in self.agents.values():
-                    if other.id != agent.id and \
-                       isinstance(other, CollisionAgent) and \
-                       other.position is not None and \
-                       np.linalg.norm(other.position - potential_position) < \
-                                     (other.size + agent.size):
-                        collision = True
-                        break
-                if not collision:
+                if not self._collides_with_placed(agent, potential_position):
                     agent.position = potential_position
+                    self._placed_cells.setdefault(
+                        self._collision_cell(potential_position), []
+                    ).append(agent)
                     return
             raise Exception("Could not fit all the agents in the region without collisions")
         else:
             agent.position = np.random.uniform(0, self.region, 2)
 
+    def collision_candidates(self, margin=0, **kwargs):
+        """
+        Broad phase for collision detection. Bin the CollisionAgents by their positions
+        and pair up the agents that are in the same or neighboring cells.
+
+        margin (float):
+            Extra width added to the cells. Use this if positions will change while
+            the candidates are being processed.
+            Default 0.
+
+        return (list):
+            Pairs of agents that might be colliding. Each pair is ordered like
+            the agents dict, and the pairs are sorted in that order.
+        """
+        colliders = [
+            (index, agent) for index, agent in enumerate(self.agents.values())
+            if isinstance(agent, CollisionAgent)
+        ]
+        if not colliders:
+            return []
+        cell_size = self.collision_cell_size + margin
+        cells = np.floor(
+            np.array([agent.position for _, agent in colliders]) / cell_size
+        ).astype(int)
+        cell_list = {}
+        for (index, agent), cell in zip(colliders, map(tuple, cells)):
+            cell_list.setdefault(cell, []).append((index, agent))
+
+        pairs = []
+        for (index, agent), (r, c) in zip(colliders, cells):
+            for dr in (-1, 0, 1):
+                for dc in (-1, 0, 1):
+                    for other_index, other in cell_list.get((r + dr, c + dc), ()):
+                        if other_index > index:
+                            pairs.append((index, other_index, agent, other))
+        pairs.sort(key=lambda pair: pair[:2])
+        return [(agent, other) for _, _, agent, other in pairs]
+
+    def _collides_with_placed(self, agent, position):
+        """
+        Check if an agent at this position would overlap any of the CollisionAgents
+        that have already been placed in this reset.
+        """
+        r, c = self._collision_cell(position)
+        for dr in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                for other in self._placed_cells.get((r + dr, c + dc), ()):
+                    if other.position is None: continue # Not placed yet
+                    if np.linalg.norm(other.position - position) < (other.size + agent.size):
+                        return True
+        return False
+
+    def _collision_cell(self, position):
+        return tuple(np.floor(np.asarray(position) / self.collision_cell_size).astype(int))
+
 
 class SpeedAngleState:
     """
@@ -367,6 +797,8 @@ class GridResourceState:
     to that original value. This component supports resource depletion: if a resource falls below
     the minimum value, it will not regrow. Agents can harvest resources from the cell they occupy.
     Agents can observe the resources in a grid-like observation surrounding their positions.
+    Only the cells that are regrowing are processed each step. If you change the
+    resources without set_resources or modify_resources, then call invalidate_resources.
 
     An agent can harvest up to its max harvest value on the cell it occupies. It
     can observe the resources in a grid surrounding its position, up to its view
@@ -433,6 +865,9 @@ class GridResourceState:
                 np.random.uniform(self.min_value, self.max_value, (self.region, self.region)),
                 coverage_filter
             )
+        self._regrowth = RegrowingCells(
+            self.resources, self.min_value, self.max_value, self.regrow_rate
+        )
 
     def set_resources(self, location, value, **kwargs):
         """
@@ -446,6 +881,7 @@ class GridResourceState:
             self.resources[location] = self.max_value
         else:
             self.resources[location] = value
+        self._regrowth.touch(location)
 
     def modify_resources(self, location, value, **kwargs):
         """
@@ -458,5 +894,18 @@ class GridResourceState:
         """
         Regrow the resources according to the regrow_rate.
         """
-        self.resources[self.resources >= self.min_value] += self.regrow_rate
-        self.resources[self.resources >= self.max_value] = self.max_value
+        self._regrowth.regrow(self.resources)
+
+    def fast_forward(self, steps, **kwargs):
+        """
+        Regrow the resources as if steps steps had passed with no harvesting. The
+        values are computed in closed form, so they can differ from calling regrow
+        steps times by floating point rounding.
+        """
+        self._regrowth.regrow(self.resources, steps)
+
+    def invalidate_resources(self, **kwargs):
+        """
+        Find the regrowing cells again after the resources were changed directly.
+        """
+        self._regrowth.track(self.resources)
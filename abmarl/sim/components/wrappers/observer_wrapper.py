@@ -2,14 +2,18 @@ from gym.spaces import Dict, Discrete
 import numpy as np
 
 from abmarl.sim.components.agent import AgentObservingAgent, ObservingAgent, BroadcastingAgent
+from abmarl.sim.components.state import GridPositionState
 
 
 def obs_filter_step(distance, view):
     """
     Perfectly observe the agent if it is within the observing agent's view. If
-    it is not within the view, then don't observe it at all.
+    it is not within the view, then don't observe it at all. The distance and view
+    can also be arrays.
     """
-    return 0 if distance > view else 1
+    if np.ndim(distance) == 0 and np.ndim(view) == 0:
+        return 0 if distance > view else 1
+    return np.where(np.asarray(distance) > view, 0, 1)
 
 
 class PositionRestrictedObservationWrapper:
@@ -42,9 +46,22 @@ class PositionRestrictedObservationWrapper:
 
     agents (dict):
         Dictionary of agents.
+
+    position_state (PositionState):
+        The position state handler. If given, the distances between agents are
+        read from its cached distance matrix instead of computed pair by pair.
+        Default None.
+
+    vectorized (bool):
+        If True, the observation mask is computed for all the other agents at
+        once: obs_filter is called with an array of distances and an array of
+        views, and the random draws are made in a single array. obs_filter must
+        support arrays, like obs_filter_step does. The random draws are the same
+        as in the unvectorized mode, so the two give the same observations.
+        Default False.
     """
     def __init__(self, observers, obs_filter=obs_filter_step, obs_norm=np.inf, agents=None,
-                 **kwargs):
+                 position_state=None, vectorized=False, **kwargs):
         assert type(observers) is list, "observers must be in a list."
         self.observers = observers
         self._channel_observer_map = {observer.channel: observer for observer in self.observers}
@@ -56,6 +73,8 @@ class PositionRestrictedObservationWrapper:
 
         assert type(agents) is dict, "agents must be the dictionary of agents."
         self.agents = agents
+        self.position_state = position_state
+        self.vectorized = vectorized
 
         # Append a "mask" observation to the observing agents
         for agent in agents.values():
@@ -90,12 +109,14 @@ class PositionRestrictedObservationWrapper:
                     all_obs.update(observer.get_obs(agent, **kwargs))
                 return all_obs
 
+            if self.vectorized:
+                return self._masked_obs(agent, self.visibility([agent])[0], **kwargs)
+
             # Determine which other agents the observing agent sees. Add the observation mask.
             mask = {}
             for other in self.agents.values():
                 if np.random.uniform() <= self.obs_filter(
-                    np.linalg.norm(agent.position - other.position, self.obs_norm),
-                    agent.agent_view
+                    self._distance(agent, other), agent.agent_view
                 ):
                     mask[other.id] = 1 # We perfectly observed this agent
                 else:
@@ -116,6 +137,100 @@ class PositionRestrictedObservationWrapper:
         else:
             return {}
 
+    def get_obs_batch(self, agents, **kwargs):
+        """
+        Get the observations of many agents. In vectorized mode, the visibility
+        of every other agent to every observing agent is computed as one boolean
+        matrix before the observers are called.
+
+        agents (iterable):
+            The observing agents.
+
+        return (dict):
+            Dictionary mapping the agents' ids to their observations.
+        """
+        if not self.vectorized:
+            return {agent.id: self.get_obs(agent, **kwargs) for agent in agents}
+        agents = list(agents)
+        viewing_agents = [
+            agent for agent in agents
+            if isinstance(agent, ObservingAgent) and isinstance(agent, AgentObservingAgent)
+        ]
+        visibility = dict(zip(
+            [agent.id for agent in viewing_agents], self.visibility(viewing_agents)
+        ))
+        return {
+            agent.id: self._masked_obs(agent, visibility[agent.id], **kwargs)
+            if agent.id in visibility else self.get_obs(agent, **kwargs)
+            for agent in agents
+        }
+
+    def visibility(self, agents):
+        """
+        Determine which agents each of the observing agents sees, according to
+        the obs_filter, with a single array of random draws. obs_filter must support
+        arrays.
+
+        agents (list of AgentObservingAgents):
+            The observing agents.
+
+        return (np.ndarray):
+            Boolean matrix whose rows are the observing agents and whose columns
+            are all the agents, ordered like the agents dict. True if the observing
+            agent sees the other agent.
+        """
+        distances = self._distances(agents)
+        views = np.array([agent.agent_view for agent in agents])
+        probabilities = self.obs_filter(distances, views[:, np.newaxis])
+        return np.random.uniform(size=distances.shape) <= probabilities
+
+    def _masked_obs(self, agent, visible, **kwargs):
+        """
+        Get the observations from the observers and replace the agents that are
+        not visible with the observers' null values. Each channel is stacked into
+        an array ordered like the agents dict, promoted to hold the null value,
+        and the hidden rows are replaced with one boolean index.
+        """
+        all_obs = {'mask': dict(zip(self.agents, visible.astype(int).tolist()))}
+        hidden = ~np.asarray(visible, dtype=bool)
+        for observer in self.observers:
+            obs = observer.get_obs(agent, **kwargs)
+            if hidden.any():
+                for channel, obs_content in obs.items():
+                    stacked = np.stack([obs_content[other] for other in self.agents])
+                    null_value = np.asarray(observer.null_value)
+                    stacked = stacked.astype(np.result_type(stacked, null_value), copy=False)
+                    stacked[hidden] = null_value
+                    obs[channel] = dict(zip(self.agents, stacked))
+            all_obs.update(obs)
+        return all_obs
+
+    def _distances(self, agents):
+        """
+        Distances from each of the agents to all the agents according to the obs_norm.
+        """
+        if self.position_state is not None:
+            agent_index = self.position_state.agent_index
+            matrix = self.position_state.distance_matrix(self.obs_norm)
+            return matrix[
+                np.array([agent_index[agent.id] for agent in agents], dtype=int)[:, np.newaxis],
+                np.array([agent_index[other] for other in self.agents], dtype=int)
+            ]
+        positions = np.array([other.position for other in self.agents.values()], dtype=float)
+        agent_positions = np.array([agent.position for agent in agents], dtype=float)
+        return np.linalg.norm(
+            agent_positions.reshape(-1, 1, 2) - positions.reshape(1, -1, 2), self.obs_norm, axis=-1
+        )
+
+    def _distance(self, agent, other):
+        """
+        Distance between the agents according to the obs_norm.
+        """
+        if self.position_state is not None:
+            return self.position_state.distance(agent, other, self.obs_norm)
+        else:
+            return np.linalg.norm(agent.position - other.position, self.obs_norm)
+
     def null_value(self, channel):
         if channel == 'mask':
             return np.array([0])
@@ -144,11 +259,47 @@ class TeamBasedCommunicationWrapper:
     obs_norm (int):
         The norm to use for measuring the distance between agents.
         Default np.inf.
+
+    position_state (PositionState):
+        The position state handler. If given, the distances between agents are
+        read from its cached distance matrix instead of computed pair by pair.
+        A GridPositionState will also restrict the search for broadcasting agents
+        to the cells within broadcasting range of the receiving agent.
+        Default None.
+
+    Call reset when the simulation resets and step after the simulation steps.
+    From then on, each agent's observation from the wrapped observers is computed
+    at most once per step and shared by all the agents that receive its broadcast,
+    both in get_obs and get_obs_batch. Until reset is called, nothing is cached.
     """
-    def __init__(self, observers, agents=None, obs_norm=np.inf, **kwargs):
+    def __init__(self, observers, agents=None, obs_norm=np.inf, position_state=None, **kwargs):
         self.observers = observers
         self.agents = agents
         self.obs_norm = obs_norm
+        self.position_state = position_state
+        self._max_broadcast_range = max([
+            agent.broadcast_range for agent in self.agents.values()
+            if isinstance(agent, BroadcastingAgent)
+        ], default=0)
+        self._step = None
+        self._obs_cache = {}
+
+    def reset(self, **kwargs):
+        """
+        Start caching the observations from the wrapped observers and clear the
+        observations cached before the reset.
+        """
+        self._step = 0
+        self._obs_cache.clear()
+
+    def step(self, **kwargs):
+        """
+        Clear the observations cached in the previous step. Call this after the
+        state changes in the simulation's step.
+        """
+        if self._step is not None:
+            self._step += 1
+        self._obs_cache.clear()
 
     def get_obs(self, receiving_agent, **kwargs):
         """
@@ -163,18 +314,27 @@ class TeamBasedCommunicationWrapper:
             # Generate my normal observation
             my_obs = {}
             for observer in self.observers:
-                my_obs.update(observer.get_obs(receiving_agent, **kwargs))
+                # Copy the channels because they are modified by the fusion below
+                my_obs.update({
+                    obs_type: dict(obs_content) for obs_type, obs_content in
+                    self._observe(observer, receiving_agent, **kwargs).items()
+                })
 
             # Fuse my observation with information from the broadcasting agent.
             # If I'm on the same team, then I will see its observation.
             # If I'm not on the same team, then I will not see its observation,
             #   but I will still see its own attributes.
-            for broadcasting_agent in self.agents.values():
+            for broadcasting_agent in self._potential_broadcasters(receiving_agent):
                 if isinstance(broadcasting_agent, BroadcastingAgent) and \
                         broadcasting_agent.broadcasting:
-                    distance = np.linalg.norm(
-                        broadcasting_agent.position - receiving_agent.position, self.obs_norm
-                    )
+                    if self.position_state is not None:
+                        distance = self.position_state.distance(
+                            broadcasting_agent, receiving_agent, self.obs_norm
+                        )
+                    else:
+                        distance = np.linalg.norm(
+                            broadcasting_agent.position - receiving_agent.position, self.obs_norm
+                        )
                     if distance > broadcasting_agent.broadcast_range:
                         # Too far from this broadcasting agent
                         continue
@@ -182,7 +342,7 @@ class TeamBasedCommunicationWrapper:
                         # Broadcasting and receiving agent are on the same team,
                         # so the receiving agent receives the observation
                         for observer in self.observers:
-                            tmp_obs = observer.get_obs(broadcasting_agent, **kwargs)
+                            tmp_obs = self._observe(observer, broadcasting_agent, **kwargs)
                             for obs_type, obs_content in tmp_obs.items():
                                 for agent_id, obs_value in obs_content.items():
                                     if np.all(my_obs[obs_type][agent_id] ==
@@ -197,7 +357,7 @@ class TeamBasedCommunicationWrapper:
                         # the broadcasting agent might not have information about
                         # itself. This is the best we can do right now without a re-design.
                         for observer in self.observers:
-                            tmp_obs = observer.get_obs(broadcasting_agent, **kwargs)
+                            tmp_obs = self._observe(observer, broadcasting_agent, **kwargs)
                             for obs_type, obs_content in tmp_obs.items():
                                 if np.all(my_obs[obs_type][broadcasting_agent.id] ==
                                           observer.null_value(obs_type)):
@@ -206,3 +366,42 @@ class TeamBasedCommunicationWrapper:
             return my_obs
         else:
             return {}
+
+    def get_obs_batch(self, agents, **kwargs):
+        """
+        Get the observations of many agents in the same step.
+
+        agents (iterable):
+            The receiving agents.
+
+        return (dict):
+            Dictionary mapping the agents' ids to their observations.
+        """
+        return {agent.id: self.get_obs(agent, **kwargs) for agent in agents}
+
+    def _observe(self, observer, agent, **kwargs):
+        """
+        Get the agent's observation from the observer, reusing it if it was already
+        computed in this step.
+        """
+        if self._step is None:
+            return observer.get_obs(agent, **kwargs)
+        key = (agent.id, id(observer), self._step)
+        if key not in self._obs_cache:
+            self._obs_cache[key] = observer.get_obs(agent, **kwargs)
+        return self._obs_cache[key]
+
+    def _potential_broadcasters(self, receiving_agent):
+        """
+        The agents that might be broadcasting to the receiving agent, ordered the
+        same as the agents dict.
+        """
+        if isinstance(self.position_state, GridPositionState):
+            nearby_agents = self.position_state.neighbors(
+                receiving_agent, self._max_broadcast_range, self.obs_norm
+            )
+            nearby_agents.append(receiving_agent)
+            nearby_agents.sort(key=lambda agent: self.position_state.agent_index[agent.id])
+            return nearby_agents
+        else:
+            return self.agents.values()
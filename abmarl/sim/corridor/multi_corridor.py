@@ -120,6 +120,42 @@ class MultiCorridor(AgentBasedSimulation):
             plt.plot()
             plt.pause(1e-17)
 
+    def init_render(self, fig, **kwargs):
+        """
+        Create the persistent artists for the HeadlessRenderer.
+        """
+        fig.clear()
+        ax = fig.gca()
+        ax.set(xlim=(-0.5, self.end + 0.5), ylim=(-0.5, 0.5))
+        ax.set_xticks(np.arange(-0.5, self.end + 0.5, 1.))
+        return {'agents': ax.scatter([], [], marker='s', s=200, c='g')}
+
+    def update_render(self, artists, **kwargs):
+        """
+        Move the agents' markers to their current positions.
+        """
+        artists['agents'].set_offsets(np.array([
+            [agent.position, 0] for agent in self.agents.values()
+        ]))
+
+    def get_render_state(self, **kwargs):
+        """
+        The agents' positions along the corridor, which render draws from.
+        """
+        return {'position': {agent.id: agent.position for agent in self.agents.values()}}
+
+    def set_render_state(self, state, **kwargs):
+        """
+        Restore the agents' positions and put them back in the corridor. Agents
+        at the end have left the corridor.
+        """
+        self.corridor = np.empty(self.end, dtype=object)
+        for agent_id, position in state['position'].items():
+            agent = self.agents[agent_id]
+            agent.position = int(position)
+            if agent.position != self.end - 1:
+                self.corridor[agent.position] = agent
+
     def get_obs(self, agent_id, **kwargs):
         """
         Agents observe their own position and if the squares to the left and right
@@ -1 +1 @@
-from .grid_resources import GridResources
+from .grid_resources import GridResources, RegrowingCells
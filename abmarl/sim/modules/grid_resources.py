@@ -1,13 +1,73 @@
 import numpy as np
 
 
+class RegrowingCells:
+    """
+    Track the cells of a resource grid that are regrowing and regrow only those.
+
+    A cell regrows while its value is at least the min_value and is not the
+    max_value. The grid is scanned for these cells when it is tracked. After that,
+    the cells that stop regrowing are dropped in bulk, and only the cells that are
+    marked with touch are checked again, so a step costs the number of regrowing
+    cells instead of the size of the grid. If the grid is changed in any other way,
+    then it must be tracked again.
+
+    Args:
+        resources: The grid of resources, which is modified in place.
+        min_value: The smallest value that regrows.
+        max_value: The value at which the regrowth stops.
+        rate: How much a cell regrows each step.
+    """
+    def __init__(self, resources, min_value, max_value, rate):
+        self.min_value = min_value
+        self.max_value = max_value
+        self.rate = rate
+        self.track(resources)
+
+    def track(self, resources):
+        """
+        Scan the grid for the cells that are regrowing.
+        """
+        self.resources = resources
+        self.active = np.flatnonzero(
+            (resources >= self.min_value) & (resources != self.max_value)
+        )
+        self._touched = set()
+
+    def touch(self, location):
+        """
+        Mark a cell whose value was changed, so that it is checked at the next regrowth.
+        """
+        self._touched.add(np.ravel_multi_index(location, self.resources.shape))
+
+    def regrow(self, resources, steps=1):
+        """
+        Regrow the cells as if steps steps had passed without any changes to the
+        grid. Each regrowing cell gains steps times the rate, up to the max_value.
+        If the grid is not the tracked one, then it is tracked first.
+        """
+        if resources is not self.resources:
+            self.track(resources)
+        if self._touched:
+            cells = np.union1d(self.active, np.fromiter(self._touched, dtype=int))
+            values = resources.flat[cells]
+            self.active = cells[(values >= self.min_value) & (values != self.max_value)]
+            self._touched = set()
+        values = resources.flat[self.active] + steps * self.rate
+        full = values >= self.max_value
+        values[full] = self.max_value
+        resources.flat[self.active] = values
+        self.active = self.active[~full]
+
+
 class GridResources:
     """
     GridResources provides resources that exist on the grid and can be consumed
     by agents in the simulation via their "harvest" action. The resources will
     replenish over time. The grid is covered up to some coverage percentage, and
     the initial value of the resources on each cell are random between the minimum
-    and maximum values.
+    and maximum values. Only the cells that are regrowing are processed each step.
+    If you change the resources without harvest, then call invalidate_resources.
 
         max_value: double
             The maximum value that a resource can reach. Default 1.0
@@ -37,6 +97,9 @@ class GridResources:
             np.random.uniform(self.min_value, self.max_value, (self.region, self.region)),
             coverage_filter
         )
+        self._regrowth = RegrowingCells(
+            self.resources, self.min_value, self.max_value, self.revive_rate
+        )
 
     def harvest(self, location, amount, **kwargs):
         """
@@ -49,6 +112,7 @@ class GridResources:
         else:
             actual_amount_harvested = self.resources[location]
         self.resources[location] = max([0., self.resources[location] - amount])
+        self._regrowth.touch(location)
 
         return actual_amount_harvested
 
@@ -56,8 +120,21 @@ class GridResources:
         """
         Process the regrowth, which is done according to the revival rate.
         """
-        self.resources[self.resources >= self.min_value] += self.revive_rate
-        self.resources[self.resources >= self.max_value] = self.max_value
+        self._regrowth.regrow(self.resources)
+
+    def fast_forward(self, steps, **kwargs):
+        """
+        Regrow the resources as if steps steps had passed with no harvesting. The
+        values are computed in closed form, so they can differ from calling regrow
+        steps times by floating point rounding.
+        """
+        self._regrowth.regrow(self.resources, steps)
+
+    def invalidate_resources(self, **kwargs):
+        """
+        Find the regrowing cells again after the resources were changed directly.
+        """
+        self._regrowth.track(self.resources)
 
     def render(self, *args, fig=None, **kwargs):
         draw_now = fig is None
@@ -76,6 +153,25 @@ class GridResources:
 
         return ax
 
+    def init_render(self, fig, **kwargs):
+        """
+        Create the persistent heatmap for the HeadlessRenderer. The layout matches render.
+        """
+        fig.clear()
+        ax = fig.gca()
+        image = ax.imshow(
+            np.flipud(self.resources), cmap='Greens', vmin=0, vmax=self.max_value,
+            extent=(0, self.region, self.region, 0), aspect='auto'
+        )
+        fig.colorbar(image, ax=ax)
+        return {'ax': ax, 'resources': image}
+
+    def update_render(self, artists, **kwargs):
+        """
+        Update the heatmap with the current resources.
+        """
+        artists['resources'].set_data(np.flipud(self.resources))
+
     @classmethod
     def build(cls, sim_config={}):
         config = {
@@ -120,6 +120,11 @@ class PredatorPreySimulation(AgentBasedSimulation):
         self.agents = config['agents']
         self.reward_map = config['rewards']
 
+        # The agents that can be attacked, ordered like the agents dict.
+        self._target_ids = [
+            agent.id for agent in self.agents.values() if type(agent) != Predator
+        ]
+
     def reset(self, **kwargs):
         """
         Randomly pick positions for each of the agents.
@@ -156,16 +161,25 @@ class PredatorPreySimulation(AgentBasedSimulation):
         for agent_id in joint_actions:
             self.rewards[agent_id] = 0 # Reset the reward of the acting agent(s).
 
-        # Process the predators first
-        for predator_id, action in joint_actions.items():
-            predator = self.agents[predator_id]
-            if type(predator) == Prey: continue # Process the predators first
-            # Attack takes precedent over move
-            if action['attack'] == 1:
-                action_status = self._process_attack_action(predator)
-            else:
-                action_status = self._process_move_action(predator, action['move'])
-            self.rewards[predator_id] = self.reward_map['predator'][action_status]
+        # Process the predators first. Attack takes precedent over move. The predators'
+        # moves do not affect the attacks, so they can be processed separately.
+        predator_ids = [
+            agent_id for agent_id in joint_actions if type(self.agents[agent_id]) != Prey
+        ]
+        attacking_ids = [
+            agent_id for agent_id in predator_ids if joint_actions[agent_id]['attack'] == 1
+        ]
+        moving_ids = [
+            agent_id for agent_id in predator_ids if joint_actions[agent_id]['attack'] != 1
+        ]
+        action_status = {
+            **self._process_attack_actions(attacking_ids),
+            **self._process_move_actions(
+                moving_ids, [joint_actions[agent_id]['move'] for agent_id in moving_ids]
+            ),
+        }
+        for predator_id in predator_ids:
+            self.rewards[predator_id] = self.reward_map['predator'][action_status[predator_id]]
 
         # The prey are processed differently for Grid and Distance modes because
         # grid mode supports resources on the grid.
@@ -200,6 +214,23 @@ class PredatorPreySimulation(AgentBasedSimulation):
         """
         return {}
 
+    def get_render_state(self, **kwargs):
+        """
+        The agents' positions and whether they are alive, which render draws from.
+        """
+        return {
+            'position': {agent.id: agent.position for agent in self.agents.values()},
+            'is_alive': {agent_id: agent_id not in self.cemetery for agent_id in self.agents},
+        }
+
+    def set_render_state(self, state, **kwargs):
+        """
+        Restore the agents' positions and rebuild the cemetery from the dead agents.
+        """
+        for agent_id, position in state['position'].items():
+            self.agents[agent_id].position = np.array(position, dtype=np.int)
+        self.cemetery = {agent_id for agent_id, alive in state['is_alive'].items() if not alive}
+
     def _process_move_action(self, agent, action):
         """
         The simulation will attempt to move the agent according to its action.
@@ -242,6 +273,75 @@ class PredatorPreySimulation(AgentBasedSimulation):
                 return self.ActionStatus.GOOD_ATTACK
         return self.ActionStatus.BAD_ATTACK
 
+    def _positions(self, agent_ids):
+        """
+        Gather the positions of the agents into an array.
+        """
+        return np.array([self.agents[agent_id].position for agent_id in agent_ids]).reshape(-1, 2)
+
+    def _process_move_actions(self, agent_ids, actions):
+        """
+        Process the move actions of many agents at once. The results are the same
+        as calling _process_move_action for each agent.
+
+        Returns:
+            Dictionary mapping the agents to their action status.
+        """
+        if not agent_ids:
+            return {}
+        actions = np.rint(np.array(actions, dtype=float)).reshape(-1, 2)
+        new_positions = self._positions(agent_ids) + actions
+        no_move = np.all(actions == 0, axis=1)
+        inside = np.all((0 <= new_positions) & (new_positions < self.region), axis=1)
+        for index in np.flatnonzero(~no_move & inside):
+            self.agents[agent_ids[index]].position[:] = new_positions[index]
+
+        action_status = np.where(
+            no_move, self.ActionStatus.NO_MOVE,
+            np.where(inside, self.ActionStatus.GOOD_MOVE, self.ActionStatus.BAD_MOVE)
+        )
+        return {
+            agent_id: self.ActionStatus(status)
+            for agent_id, status in zip(agent_ids, action_status)
+        }
+
+    def _process_attack_actions(self, predator_ids):
+        """
+        Process the attack actions of many predators at once. The distances between
+        the attacking predators and the living prey are computed together. Then
+        each predator, in order, eats the first prey in its range that has not
+        already been eaten, so the results are the same as calling _process_attack_action
+        for each predator.
+
+        Returns:
+            Dictionary mapping the predators to their action status.
+        """
+        if not predator_ids:
+            return {}
+        prey_ids = [prey_id for prey_id in self._target_ids if prey_id not in self.cemetery]
+        attack = np.array([self.agents[predator_id].attack for predator_id in predator_ids])
+        predator_positions = self._positions(predator_ids)[:, np.newaxis, :]
+        prey_positions = self._positions(prey_ids)[np.newaxis, :, :]
+        in_range = np.all(
+            np.abs(predator_positions - prey_positions) <= attack[:, np.newaxis, np.newaxis],
+            axis=-1
+        )
+
+        action_status = {}
+        alive = np.ones(len(prey_ids), dtype=bool)
+        for predator_id, predator_in_range in zip(predator_ids, in_range):
+            eaten = np.flatnonzero(predator_in_range & alive)
+            if eaten.size:
+                # Good attack, prey is eaten:
+                alive[eaten[0]] = False
+                prey_id = prey_ids[eaten[0]]
+                self.cemetery.add(prey_id)
+                self.rewards[prey_id] += self.reward_map['prey'][self.ActionStatus.EATEN]
+                action_status[predator_id] = self.ActionStatus.GOOD_ATTACK
+            else:
+                action_status[predator_id] = self.ActionStatus.BAD_ATTACK
+        return action_status
+
     def _process_harvest_action(self, prey):
         """
         The simulation will process the prey's harvest action by calling the resources
@@ -475,28 +575,42 @@ class PredatorPreySimGridObs(PredatorPreySimulation):
     """
     PredatorPreySimulation where observations are of the grid and the items/agents on
     that grid up to the view.
+
+    The agents are rasterized onto the grid once per step, and each agent's agents
+    channel is sliced from that raster. The raster is cleared at reset and step. If
+    you change the agents outside of reset and step, then you must call
+    invalidate_observations yourself.
     """
     def __init__(self, config):
         super().__init__(config)
         self.resources = config['resources']
+        self._raster = None
 
     def reset(self, **kwargs):
         super().reset(**kwargs)
         self.resources.reset(**kwargs)
+        self.invalidate_observations()
 
     def step(self, joint_actions, **kwargs):
+        self.invalidate_observations()
         super().step(joint_actions, **kwargs)
 
-        for prey_id, action in joint_actions.items():
-            prey = self.agents[prey_id]
-            if type(prey) == Predator: continue # Process the prey now
-            if prey_id in self.cemetery: # This prey was eaten by a predator in this time step.
-                continue
-            if action['harvest'] == 1:
-                action_status = self._process_harvest_action(prey)
-            else:
-                action_status = self._process_move_action(prey, action['move'])
-            self.rewards[prey_id] = self.reward_map['prey'][action_status]
+        # Process the prey now, except the ones that were eaten by a predator in
+        # this time step. Harvesting and moving do not affect each other.
+        prey_ids = [
+            agent_id for agent_id in joint_actions
+            if type(self.agents[agent_id]) != Predator and agent_id not in self.cemetery
+        ]
+        moving_ids = [
+            prey_id for prey_id in prey_ids if joint_actions[prey_id]['harvest'] != 1
+        ]
+        action_status = self._process_move_actions(
+            moving_ids, [joint_actions[prey_id]['move'] for prey_id in moving_ids]
+        )
+        for prey_id in prey_ids:
+            if joint_actions[prey_id]['harvest'] == 1:
+                action_status[prey_id] = self._process_harvest_action(self.agents[prey_id])
+            self.rewards[prey_id] = self.reward_map['prey'][action_status[prey_id]]
 
         # Now process the other pieces of the simulation
         self.resources.regrow()
@@ -543,6 +657,48 @@ class PredatorPreySimGridObs(PredatorPreySimulation):
 
         return ax
 
+    def get_render_state(self, **kwargs):
+        """
+        The agents' positions, whether they are alive, and the resources.
+        """
+        state = super().get_render_state(**kwargs)
+        state['resources'] = self.resources.resources
+        return state
+
+    def set_render_state(self, state, **kwargs):
+        """
+        Restore the agents and the resources.
+        """
+        self.resources.resources = np.array(state['resources'])
+        super().set_render_state(state, **kwargs)
+
+    def init_render(self, fig, **kwargs):
+        """
+        Create the persistent artists for the HeadlessRenderer: the resources heatmap
+        and a scatter for the prey and the predators.
+        """
+        artists = self.resources.init_render(fig)
+        ax = artists['ax']
+        artists['prey'] = ax.scatter(
+            [], [], marker='s', s=200, edgecolor='black', facecolor='gray'
+        )
+        artists['predators'] = ax.scatter(
+            [], [], s=200, marker='o', edgecolor='black', facecolor='gray'
+        )
+        return artists
+
+    def update_render(self, artists, **kwargs):
+        """
+        Update the resources and move the agents' markers.
+        """
+        self.resources.update_render(artists)
+        for name, agent_type in (('prey', Prey), ('predators', Predator)):
+            artists[name].set_offsets(np.array([
+                [agent.position[1] + 0.5, self.region - 0.5 - agent.position[0]]
+                for agent in self.agents.values()
+                if type(agent) == agent_type and agent.id not in self.cemetery
+            ]).reshape(-1, 2))
+
     def get_obs(self, my_id, **kwargs):
         """
         Each agent observes a grid of values surrounding its location, whose size
@@ -563,36 +719,58 @@ class PredatorPreySimGridObs(PredatorPreySimulation):
         and another prey both occupy.
         """
         my_agent = self.agents[my_id]
+        padding, counts, values, outside = self._agent_raster()
+        (r, c) = my_agent.position + padding
+        window = (
+            slice(r - my_agent.view, r + my_agent.view + 1),
+            slice(c - my_agent.view, c + my_agent.view + 1)
+        )
+        my_layer = int(type(my_agent) == Predator)
+        same = counts[my_layer][window].copy()
+        if my_id not in self.cemetery:
+            same[my_agent.view, my_agent.view] -= 1 # Don't see yourself
+        other = counts[1 - my_layer][window]
+
         signal = np.zeros((my_agent.view*2+1, my_agent.view*2+1))
+        signal[same > 0] = values[my_layer]
+        signal[other > 0] = values[1 - my_layer]
+        signal[outside[window]] = -1
+        return signal
+
+    def invalidate_observations(self, **kwargs):
+        """
+        Clear the raster of the agents.
+        """
+        self._raster = None
 
-        # --- Determine the boundaries of the agents' grids --- #
-        # For left and top, we just do: view - x,y >= 0
-        # For the right and bottom, we just do region - x,y - 1 - view > 0
-        if my_agent.view - my_agent.position[0] >= 0: # Top end
-            signal[0:my_agent.view - my_agent.position[0], :] = -1
-        if my_agent.view - my_agent.position[1] >= 0: # Left end
-            signal[:, 0:my_agent.view - my_agent.position[1]] = -1
-        if self.region - my_agent.position[0] - my_agent.view - 1 < 0: # Bottom end
-            signal[self.region - my_agent.position[0] - my_agent.view - 1:, :] = -1
-        if self.region - my_agent.position[1] - my_agent.view - 1 < 0: # Right end
-            signal[:, self.region - my_agent.position[1] - my_agent.view - 1:] = -1
-
-        # --- Determine the positions of all the other alive agents --- #
-        for other_id, other_agent in self.agents.items():
-            if other_id == my_id or other_id in self.cemetery: continue
-            r_diff = other_agent.position[0] - my_agent.position[0]
-            c_diff = other_agent.position[1] - my_agent.position[1]
-            if -my_agent.view <= r_diff <= my_agent.view and \
-                    -my_agent.view <= c_diff <= my_agent.view:
-                r_diff += my_agent.view
-                c_diff += my_agent.view
-                if signal[r_diff, c_diff] != 0: # Already another agent here
-                    if type(my_agent) != type(other_agent):
-                        signal[r_diff, c_diff] = other_agent.value
-                else:
-                    signal[r_diff, c_diff] = other_agent.value
+    def _agent_raster(self):
+        """
+        Count the alive agents on each cell of the grid in two layers: one for prey
+        and one for predators. The grid is padded by the largest view so that every
+        agent's window is a plain slice. It is computed once and cached until
+        invalidated.
 
-        return signal
+        Returns:
+            The padding, the counts, the value of the agents in each layer, and the
+            mask of the cells that are out of bounds.
+        """
+        if self._raster is None:
+            padding = max(agent.view for agent in self.agents.values())
+            size = self.region + 2 * padding
+            alive = [agent for agent in self.agents.values() if agent.id not in self.cemetery]
+            layers = np.array([int(type(agent) == Predator) for agent in alive], dtype=int)
+            positions = np.array(
+                [agent.position for agent in alive], dtype=int
+            ).reshape(-1, 2) + padding
+            counts = np.zeros((2, size, size), dtype=int)
+            np.add.at(counts, (layers, positions[:, 0], positions[:, 1]), 1)
+            values = np.zeros(2)
+            for layer, agent in zip(layers, alive):
+                values[layer] = agent.value
+            outside = np.ones((size, size), dtype=bool)
+            outside[padding:padding + self.region, padding:padding + self.region] = False
+            self._raster = (padding, counts, values, outside)
+        return self._raster
 
     def _observe_resources(self, agent_id, **kwargs):
         """
@@ -621,16 +799,39 @@ class PredatorPreySimDistanceObs(PredatorPreySimulation):
     """
     PredatorPrey simulation where observations are of the distance from each
     other agent within the view.
+
+    The relative positions of all the agents and which agents each one sees are
+    computed once per step as NxN arrays, and each agent's observation dictionary
+    is built from them when it is asked for. Fusing observations through
+    communication is a boolean matrix product over these arrays. The caches are
+    cleared at reset and step. If you change the agents outside of reset and step,
+    then you must call invalidate_observations yourself.
     """
+    def __init__(self, config):
+        super().__init__(config)
+        self._agent_index = {agent_id: index for index, agent_id in enumerate(self.agents)}
+        self._obs_cache = {}
+        self._distance_cache = None
+
+    def reset(self, **kwargs):
+        super().reset(**kwargs)
+        self.invalidate_observations()
+
     def step(self, joint_actions, **kwargs):
+        self.invalidate_observations()
         super().step(joint_actions, **kwargs)
-        for prey_id, action in joint_actions.items():
-            prey = self.agents[prey_id]
-            if type(prey) == Predator: continue # Process the prey now
-            if prey_id in self.cemetery: # This prey was eaten by a predator in this time step.
-                continue
-            action_status = self._process_move_action(prey, action)
-            self.rewards[prey_id] = self.reward_map['prey'][action_status]
+
+        # Process the prey now, except the ones that were eaten by a predator in
+        # this time step.
+        prey_ids = [
+            agent_id for agent_id in joint_actions
+            if type(self.agents[agent_id]) != Predator and agent_id not in self.cemetery
+        ]
+        action_status = self._process_move_actions(
+            prey_ids, [joint_actions[prey_id] for prey_id in prey_ids]
+        )
+        for prey_id in prey_ids:
+            self.rewards[prey_id] = self.reward_map['prey'][action_status[prey_id]]
 
     def render(self, *args, fig=None, **kwargs):
         """
@@ -677,6 +878,34 @@ class PredatorPreySimDistanceObs(PredatorPreySimulation):
 
         return ax
 
+    def init_render(self, fig, **kwargs):
+        """
+        Create the persistent artists for the HeadlessRenderer.
+        """
+        fig.clear()
+        ax = fig.gca()
+        ax.set(xlim=(-0.5, self.region - 0.5), ylim=(-0.5, self.region - 0.5))
+        ax.set_xticks(np.arange(-0.5, self.region - 0.5, 1.))
+        ax.set_yticks(np.arange(-0.5, self.region - 0.5, 1.))
+        ax.grid(linewidth=5)
+        return {
+            'prey': ax.scatter([], [], marker='s', s=200, edgecolor='black', facecolor='gray'),
+            'predators': ax.scatter(
+                [], [], s=200, marker='o', edgecolor='black', facecolor='gray'
+            ),
+        }
+
+    def update_render(self, artists, **kwargs):
+        """
+        Move the agents' markers.
+        """
+        for name, agent_type in (('prey', Prey), ('predators', Predator)):
+            artists[name].set_offsets(np.array([
+                [agent.position[1], self.region - 1 - agent.position[0]]
+                for agent in self.agents.values()
+                if type(agent) == agent_type and agent.id not in self.cemetery
+            ]).reshape(-1, 2))
+
     def get_obs(self, my_id, fusion_matrix={}, **kwargs):
         """
         Agents observe a distance from itself to other agents only if the other
@@ -684,42 +913,138 @@ class PredatorPreySimDistanceObs(PredatorPreySimulation):
         then the observation "slot" is empty.
 
         Via communication an agent's observations can be combined with other agents.
-        The fusion_matrix dictates which observations to share.
+        The fusion_matrix dictates which observations to share. An agent also sees
+        the agents that it receives messages from. Messages from dead agents and
+        from the agent itself are ignored.
         """
-        my_agent = self.agents[my_id]
-        my_obs = {}
-
-        # --- Determine the positions of all the other alive agents --- #
-        for other_id in self.agents:
-            if my_id == other_id: continue
-            my_obs[other_id] = np.zeros(3, dtype=np.int)
-        # Fill values for agents that are still alive
-        for other_id, other_agent in self.agents.items():
-            if other_id == my_id or other_id in self.cemetery: continue
-            r_diff = other_agent.position[0] - my_agent.position[0]
-            c_diff = other_agent.position[1] - my_agent.position[1]
-            if -my_agent.view <= c_diff <= my_agent.view and \
-                    -my_agent.view <= r_diff <= my_agent.view:
-                my_obs[other_id] = np.array((r_diff, c_diff, other_agent.value))
+        # Copy because the fusion below replaces entries.
+        my_obs = dict(self._observe(my_id))
 
         # --- Get the observations from other agents --- #
+        my_index = self._agent_index[my_id]
+        fusion = np.zeros((1, len(self.agents)), dtype=bool)
         for sending_agent_id, message in fusion_matrix.items():
-            # Only receive messages from alive agents
-            if sending_agent_id not in self.cemetery and message:
-                for spied_agent_id, distance_type in self.get_obs(sending_agent_id).items():
-                    # Don't receive a message about yourself or other agents
-                    # that you already see
-                    if spied_agent_id != my_id and \
-                            my_obs[spied_agent_id][2] == 0 and \
-                            distance_type[2] != 0: # We actually see an agent here
-                        spied_agent = self.agents[spied_agent_id]
-                        r_diff = spied_agent.position[0] - my_agent.position[0]
-                        c_diff = spied_agent.position[1] - my_agent.position[1]
-                        my_obs[spied_agent_id] = np.array([r_diff, c_diff, spied_agent.value])
-                # Also see the relative location of the sending agent itself
-                sending_agent = self.agents[sending_agent_id]
-                c_diff = sending_agent.position[1] - my_agent.position[1]
-                r_diff = sending_agent.position[0] - my_agent.position[0]
-                my_obs[sending_agent_id] = np.array([r_diff, c_diff, sending_agent.value])
+            if message:
+                fusion[0, self._agent_index[sending_agent_id]] = True
+        if fusion.any():
+            agent_ids, distances, values, visible = self._distances()
+            fused = self._fuse([my_index], fusion)[0] & ~visible[my_index]
+            for other_index in np.flatnonzero(fused):
+                my_obs[agent_ids[other_index]] = np.array(
+                    [*distances[my_index, other_index], values[other_index]]
+                )
 
         return my_obs
+
+    def get_obs_batch(self, agent_ids, **kwargs):
+        """
+        The agents' observations without communication, read from observe_all.
+        Falls back to get_obs for each agent if there is a fusion_matrix or if a
+        subclass overrides get_obs.
+        """
+        if 'fusion_matrix' in kwargs or self._overrides('get_obs', PredatorPreySimDistanceObs):
+            return super().get_obs_batch(agent_ids, **kwargs)
+        obs = self.observe_all()
+        all_ids = list(self.agents)
+        batch = {}
+        for agent_id in agent_ids:
+            my_index = self._agent_index[agent_id]
+            batch[agent_id] = {
+                other_id: obs[my_index, other_index]
+                for other_index, other_id in enumerate(all_ids) if other_index != my_index
+            }
+        return batch
+
+    def observe_all(self, fusion=None, **kwargs):
+        """
+        Observe the other agents for all the agents at once. Agents are indexed in
+        the order of the agents dictionary.
+
+        Args:
+            fusion: Optional NxN boolean array, where entry [i, j] is True if agent
+                i receives agent j's observation.
+
+        Returns:
+            NxNx3 array, where entry [i, j] is agent i's observation of agent j: the
+            row distance, column distance, and value of agent j, or zeros if agent
+            i does not see agent j.
+        """
+        agent_ids, distances, values, visible = self._distances()
+        if fusion is None:
+            seen = visible
+        else:
+            seen = self._fuse(np.arange(len(agent_ids)), np.asarray(fusion, dtype=bool))
+        obs = np.zeros((len(agent_ids), len(agent_ids), 3), dtype=np.int)
+        obs[..., :2] = np.where(seen[..., np.newaxis], distances, 0)
+        obs[..., 2] = np.where(seen, values, 0)
+        return obs
+
+    def invalidate_observations(self, **kwargs):
+        """
+        Clear the cached distances and observations of the agents.
+        """
+        self._obs_cache.clear()
+        self._distance_cache = None
+
+    def _distances(self):
+        """
+        The relative positions of the agents and which agents each one sees. It is
+        computed once and cached until invalidated.
+
+        Returns:
+            The agent ids, an NxNx2 array of the position of agent j relative to
+            agent i, the value of each agent, and an NxN boolean array of whether
+            agent i sees agent j.
+        """
+        if self._distance_cache is None:
+            agents = list(self.agents.values())
+            positions = np.array([agent.position for agent in agents], dtype=np.int)
+            views = np.array([agent.view for agent in agents])
+            values = np.array([agent.value for agent in agents])
+            alive = np.array([agent.id not in self.cemetery for agent in agents])
+            distances = positions[np.newaxis, :, :] - positions[:, np.newaxis, :]
+            visible = (np.abs(distances).max(axis=2) <= views[:, np.newaxis]) & alive
+            np.fill_diagonal(visible, False)
+            self._distance_cache = (list(self.agents), distances, values, visible)
+        return self._distance_cache
+
+    def _fuse(self, receivers, fusion):
+        """
+        Which agents the receivers see once they have fused in the observations
+        of the agents they receive from.
+
+        Args:
+            receivers: The indices of the receiving agents.
+            fusion: Boolean array with a row for each receiver, where entry [r, j]
+                is True if the receiver receives agent j's observation.
+
+        Returns:
+            Boolean array with a row for each receiver of the agents it sees.
+        """
+        agent_ids, distances, values, visible = self._distances()
+        receivers = np.asarray(receivers)
+        alive = np.array([agent_id not in self.cemetery for agent_id in agent_ids])
+        fusion = fusion & alive
+        fusion[np.arange(len(receivers)), receivers] = False
+        seen = visible[receivers] | np.matmul(fusion, visible) | fusion
+        seen[np.arange(len(receivers)), receivers] = False
+        return seen
+
+    def _observe(self, my_id):
+        """
+        The agent's own observation of the other agents, without any communication.
+        It is computed once and cached until invalidated.
+        """
+        if my_id not in self._obs_cache:
+            agent_ids, distances, values, visible = self._distances()
+            my_index = self._agent_index[my_id]
+            my_obs = {
+                other_id: np.zeros(3, dtype=np.int) for other_id in agent_ids if other_id != my_id
+            }
+            # Fill values for agents that are visible
+            for other_index in np.flatnonzero(visible[my_index]):
+                my_obs[agent_ids[other_index]] = np.array(
+                    [*distances[my_index, other_index], values[other_index]]
+                )
+            self._obs_cache[my_id] = my_obs
+        return self._obs_cache[my_id]
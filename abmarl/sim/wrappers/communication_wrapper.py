@@ -1,6 +1,7 @@
 from .wrapper import Wrapper
 
-from gym.spaces import Discrete, Dict
+from gym.spaces import Discrete, Dict, MultiBinary
+import numpy as np
 
 
 class CommunicationHandshakeWrapper(Wrapper):
@@ -18,9 +19,35 @@ class CommunicationHandshakeWrapper(Wrapper):
     respectively. We add 'message_buffer' to the observation, which shows incoming
     messages; and 'receive' and 'send' to the action, which are the two communication
     actions the agents can take.
+
+    multi_binary (bool):
+        If True, the handshake is stored as NxN boolean matrices and the 'send',
+        'receive', and 'message_buffer' spaces are MultiBinary(N), where N is the
+        number of agents. Entry i refers to the agent at index i in agent_ids,
+        and an agent's own entry is ignored. Use handshake_dicts to view the state
+        as dictionaries. Otherwise, the spaces are Dicts keyed by the other agents'
+        ids.
+        Default False.
     """
-    def __init__(self, sim):
+    def __init__(self, sim, multi_binary=False):
         super().__init__(sim)
+        self.multi_binary = multi_binary
+        self.agent_ids = list(self.agents)
+        self.agent_index = {agent_id: index for index, agent_id in enumerate(self.agent_ids)}
+
+        if multi_binary:
+            number_of_agents = len(self.agent_ids)
+            for agent in self.agents.values():
+                agent.action_space = Dict({
+                    'action': agent.action_space,
+                    'send': MultiBinary(number_of_agents),
+                    'receive': MultiBinary(number_of_agents),
+                })
+                agent.observation_space = Dict({
+                    'obs': agent.observation_space,
+                    'message_buffer': MultiBinary(number_of_agents),
+                })
+            return
 
         # Augment the agents' action and observation spaces.
         # We use a dict keyed off the agents' id to Discrete(2) instead of just
@@ -49,6 +76,12 @@ class CommunicationHandshakeWrapper(Wrapper):
         Set the internal communication state to the null state and reset the wrapped
         simulation.
         """
+        if self.multi_binary:
+            # Entry [i, j] is the message that agent i has from (or received from) agent j.
+            self.message_matrix = np.zeros((len(self.agent_ids), len(self.agent_ids)), dtype=bool)
+            self.received_matrix = np.zeros_like(self.message_matrix)
+            self.sim.reset(**kwargs)
+            return
         self.message_buffer = {}
         self.received_message = {}
         for my_id in self.agents:
@@ -67,6 +100,9 @@ class CommunicationHandshakeWrapper(Wrapper):
         the step function from the wrapped simulation. Finally, we process the
         send actions to update the message buffer observations.
         """
+        if self.multi_binary:
+            self._step_matrices(action_dict, **kwargs)
+            return
         # Process receive actions
         for receiving_agent, action in action_dict.items():
             self.received_message[receiving_agent] = {
@@ -96,5 +132,55 @@ class CommunicationHandshakeWrapper(Wrapper):
         The (fused) observation from the wrapped simulation is keyed on 'obs'
         and we add 'message_buffer' for incoming messages.
         """
+        if self.multi_binary:
+            index = self.agent_index[agent_id]
+            fusion_matrix = {
+                self.agent_ids[sender]: True
+                for sender in np.flatnonzero(self.received_matrix[index])
+            }
+            return {
+                'obs': self.sim.get_obs(agent_id, fusion_matrix=fusion_matrix),
+                'message_buffer': self.message_matrix[index].astype(np.int8),
+            }
         obs_from_sim = self.sim.get_obs(agent_id, fusion_matrix=self.received_message[agent_id])
         return {'obs': obs_from_sim, 'message_buffer': self.message_buffer[agent_id]}
+
+    def handshake_dicts(self):
+        """
+        View the communication state as dictionaries.
+
+        Returns:
+            The message buffer and the received messages, each a dictionary mapping
+            every agent to a dictionary of the other agents and whether there is a
+            message from them.
+        """
+        if not self.multi_binary:
+            return self.message_buffer, self.received_message
+        return tuple(
+            {
+                my_id: {
+                    other_id: bool(matrix[i, j]) for j, other_id in enumerate(self.agent_ids)
+                    if j != i
+                } for i, my_id in enumerate(self.agent_ids)
+            } for matrix in (self.message_matrix, self.received_matrix)
+        )
+
+    def _step_matrices(self, action_dict, **kwargs):
+        """
+        Step the handshake with the boolean matrices. The rows of the acting agents
+        are updated with a single operation for each of the receive and send actions.
+        """
+        acting = [self.agent_index[agent_id] for agent_id in action_dict]
+        if acting:
+            receive = np.array([action['receive'] for action in action_dict.values()], dtype=bool)
+            self.received_matrix[acting] = self.message_matrix[acting] & receive
+        self.message_matrix[:] = False
+
+        self.sim.step(
+            {agent_id: action['action'] for agent_id, action in action_dict.items()}, **kwargs
+        )
+
+        if acting:
+            send = np.array([action['send'] for action in action_dict.values()], dtype=bool)
+            self.message_matrix[:, acting] = send.T
+            np.fill_diagonal(self.message_matrix, False)
@@ -169,19 +169,96 @@ def flatten_space(space):
     raise TypeError
 
 
+class FlattenPlan:
+    """Precompiled layout for flattening points from a space.
+
+    The space is compiled once into a list of leaves, each with its path into the
+    nested point, its offset and size in the flat array, and whether it is one-hot
+    encoded. Points are then written straight into a single output array without
+    building intermediate arrays at each Dict or Tuple level. The output matches
+    flatten().
+
+    Accepts a space. Raises TypeError if the space is not a gym space.
+
+    Example::
+
+        >>> space = Dict({"position": Discrete(2),
+        ...               "velocity": Box(0, 1, shape=(2, 2))})
+        >>> plan = FlattenPlan(space)
+        >>> plan.flatten(space.sample()).shape
+        (6,)
+    """
+    def __init__(self, space):
+        self.space = space
+        self.leaves = []
+        self.size = self._compile(space, (), 0)
+        self.dtype = np.result_type(*[leaf[4] for leaf in self.leaves]) \
+            if self.leaves else np.dtype(np.int)
+
+    def flatten(self, x, out=None):
+        """Flatten a point from the space.
+
+        If out is given, the point is written into it and it is returned.
+        Otherwise, a new array is returned.
+        """
+        if out is None:
+            out = np.empty(self.size, dtype=self.dtype)
+        for path, offset, size, one_hot, _ in self.leaves:
+            value = x
+            for key in path:
+                value = value[key]
+            if one_hot:
+                out[offset:offset + size] = 0
+                out[offset + value] = 1
+            else:
+                out[offset:offset + size] = np.ravel(value)
+        return out
+
+    def _compile(self, space, path, offset):
+        if isinstance(space, Box):
+            size = int(np.prod(space.shape))
+            self.leaves.append((path, offset, size, False, space.dtype))
+            return offset + size
+        elif isinstance(space, Discrete):
+            self.leaves.append((path, offset, int(space.n), True, np.dtype(np.int)))
+            return offset + int(space.n)
+        elif isinstance(space, Tuple):
+            for i, s in enumerate(space.spaces):
+                offset = self._compile(s, path + (i,), offset)
+            return offset
+        elif isinstance(space, Dict):
+            for key, s in space.spaces.items():
+                offset = self._compile(s, path + (key,), offset)
+            return offset
+        elif isinstance(space, (MultiBinary, MultiDiscrete)):
+            size = flatdim(space)
+            self.leaves.append((path, offset, size, False, np.dtype(np.int)))
+            return offset + size
+        else:
+            raise TypeError('space must be instance of gym.spaces')
+
+
 class FlattenWrapper(SARWrapper):
     """
     Flattens all agents' action and observation spaces into continuous Boxes.
+
+    Each agent's observation space is compiled into a FlattenPlan at construction,
+    which is used to flatten its observations.
     """
     def __init__(self, sim):
         super().__init__(sim)
+        self.observation_plans = {}
         for agent_id, wrapped_agent in self.sim.agents.items(): # Wrap the agents' spaces
             self.agents[agent_id].action_space = flatten_space(wrapped_agent.action_space)
             self.agents[agent_id].observation_space = flatten_space(
                 wrapped_agent.observation_space
             )
+            self.observation_plans[agent_id] = FlattenPlan(wrapped_agent.observation_space)
 
     def wrap_observation(self, from_agent, observation):
+        plan = self.observation_plans.get(from_agent.id)
+        if plan is not None and plan.space is from_agent.observation_space:
+            return plan.flatten(observation)
         return flatten(from_agent.observation_space, observation)
 
     def unwrap_observation(self, from_agent, observation):
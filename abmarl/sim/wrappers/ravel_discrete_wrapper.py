@@ -110,6 +110,146 @@ def ravel_space(space):
     return Discrete(dims[0])
 
 
+class RavelPlan:
+    """
+    Precompiled strides for ravelling points in a space to a single discrete value.
+
+    The space is compiled once into leaves, each with its path into the nested
+    point, its lower bound, and its position in the flat list of digits. Ravelling
+    a point is the same as ravel_multi_index over all of those digits at once, so
+    the value is the dot product of the digits with precomputed strides. The
+    results match ravel and unravel.
+
+    Batches use 2-D arrays of values, where each row holds the digits of one point
+    plus their lower bounds, in the order of the leaves.
+    """
+    def __init__(self, space):
+        self.space = space
+        self.leaves = []
+        self._radices = []
+        self._lows = []
+        self._compile(space, ())
+        self.radices = np.array(self._radices, dtype=np.int64)
+        self.low = np.array(self._lows, dtype=np.int64)
+        self.n = int(np.prod([int(radix) for radix in self._radices], dtype=object))
+        assert self.n <= np.iinfo(np.int64).max, "The space is too large to ravel."
+        self.strides = np.ones(len(self._radices), dtype=np.int64)
+        if len(self._radices) > 1:
+            self.strides[:-1] = np.cumprod(self.radices[::-1])[::-1][1:]
+        del self._radices, self._lows
+
+    def ravel(self, point):
+        """
+        Ravel a point in the space to a single discrete value.
+        """
+        if isinstance(self.space, Discrete):
+            return point
+        return int(np.dot(self._values(point) - self.low, self.strides))
+
+    def unravel(self, index):
+        """
+        Unravel a single discrete value to a point in the space.
+        """
+        if isinstance(self.space, Discrete):
+            return index
+        values = index // self.strides % self.radices + self.low
+        return self._build(self.space, values, 0)[0]
+
+    def ravel_values(self, values):
+        """
+        Ravel a 2-D array of values, one point per row, to a 1-D array of indices.
+        """
+        return (np.asarray(values, dtype=np.int64) - self.low) @ self.strides
+
+    def unravel_values(self, indices):
+        """
+        Unravel a 1-D array of indices to a 2-D array of values, one point per row.
+        """
+        indices = np.asarray(indices, dtype=np.int64)[:, np.newaxis]
+        return indices // self.strides % self.radices + self.low
+
+    def ravel_many(self, points):
+        """
+        Ravel a sequence of points to a 1-D array of indices.
+        """
+        values = np.empty((len(points), len(self.strides)), dtype=np.int64)
+        for path, start, size, _ in self.leaves:
+            leaf_values = []
+            for point in points:
+                value = point
+                for key in path:
+                    value = value[key]
+                leaf_values.append(value)
+            values[:, start:start + size] = np.reshape(leaf_values, (len(points), size))
+        return self.ravel_values(values)
+
+    def unravel_many(self, indices):
+        """
+        Unravel a sequence of indices to a list of points.
+        """
+        return [self._build(self.space, values, 0)[0] for values in self.unravel_values(indices)]
+
+    def _values(self, point):
+        values = np.empty(len(self.strides), dtype=np.int64)
+        for path, start, size, _ in self.leaves:
+            value = point
+            for key in path:
+                value = value[key]
+            values[start:start + size] = np.ravel(value)
+        return values
+
+    def _build(self, space, values, start):
+        """
+        Rebuild the point from its values in the same form that unravel does.
+        """
+        if isinstance(space, Discrete):
+            return values[start], start + 1
+        elif isinstance(space, (MultiDiscrete, MultiBinary)):
+            size = int(np.prod(space.shape))
+            return [*values[start:start + size]], start + size
+        elif isinstance(space, Box):
+            size = int(np.prod(space.shape))
+            return np.reshape(values[start:start + size], space.shape), start + size
+        elif isinstance(space, Dict):
+            output = {}
+            for key, sub_space in space.spaces.items():
+                output[key], start = self._build(sub_space, values, start)
+            return output, start
+        elif isinstance(space, Tuple):
+            output = []
+            for sub_space in space.spaces:
+                value, start = self._build(sub_space, values, start)
+                output.append(value)
+            return tuple(output), start
+        else:
+            raise TypeError
+
+    def _compile(self, space, path):
+        start = len(self._radices)
+        if isinstance(space, Discrete):
+            radices, lows = [space.n], [0]
+        elif isinstance(space, MultiDiscrete):
+            radices, lows = list(space.nvec.flatten()), [0] * space.nvec.size
+        elif isinstance(space, MultiBinary):
+            radices, lows = [2] * space.n, [0] * space.n
+        elif isinstance(space, Box):
+            radices = list((space.high + 1 - space.low).flatten())
+            lows = list(space.low.flatten())
+        elif isinstance(space, Dict):
+            for key, sub_space in space.spaces.items():
+                self._compile(sub_space, path + (key,))
+            return
+        elif isinstance(space, Tuple):
+            for i, sub_space in enumerate(space.spaces):
+                self._compile(sub_space, path + (i,))
+            return
+        else:
+            raise TypeError
+        self._radices.extend(radices)
+        self._lows.extend(lows)
+        self.leaves.append((path, start, len(radices), space))
+
+
 def _isbounded(space):
     """
     Gym Box converts np.inf to min and max values for integer types. As a result,
@@ -147,25 +287,44 @@ class RavelDiscreteWrapper(SARWrapper):
     according to numpy's ravel_mult_index function. Thus, observations and actions that are
     represented by arrays are converted into unique numbers. This is useful for building Q
     tables where each observation and action is a row and column of the Q table, respectively.
+
+    Each agent's spaces are compiled into RavelPlans at construction.
     """
     def __init__(self, sim):
         super().__init__(sim)
+        self.observation_plans = {}
+        self.action_plans = {}
         for agent_id, wrapped_agent in self.agents.items():
             assert check_space(wrapped_agent.observation_space), \
                 f"{agent_id}: observation must be discretizable."
             assert check_space(wrapped_agent.action_space), \
                 f"{agent_id} action must be discretizable."
+            sim_agent = self.sim.agents[agent_id]
+            self.observation_plans[agent_id] = RavelPlan(sim_agent.observation_space)
+            self.action_plans[agent_id] = RavelPlan(sim_agent.action_space)
             self.agents[agent_id].observation_space = ravel_space(wrapped_agent.observation_space)
             self.agents[agent_id].action_space = ravel_space(wrapped_agent.action_space)
 
     def wrap_observation(self, from_agent, observation):
+        plan = self.observation_plans.get(from_agent.id)
+        if plan is not None and plan.space is from_agent.observation_space:
+            return plan.ravel(observation)
         return ravel(from_agent.observation_space, observation)
 
     def unwrap_observation(self, from_agent, observation):
+        plan = self.observation_plans.get(from_agent.id)
+        if plan is not None and plan.space is from_agent.observation_space:
+            return plan.unravel(observation)
         return unravel(from_agent.observation_space, observation)
 
     def wrap_action(self, from_agent, action):
+        plan = self.action_plans.get(from_agent.id)
+        if plan is not None and plan.space is from_agent.action_space:
+            return plan.unravel(action)
         return unravel(from_agent.action_space, action)
 
     def unwrap_action(self, from_agent, action):
+        plan = self.action_plans.get(from_agent.id)
+        if plan is not None and plan.space is from_agent.action_space:
+            return plan.ravel(action)
         return ravel(from_agent.action_space, action)
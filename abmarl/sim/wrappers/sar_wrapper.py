@@ -36,6 +36,22 @@ class SARWrapper(Wrapper):
     def get_reward(self, agent_id, **kwargs):
         return self.wrap_reward(self.sim.get_reward(agent_id))
 
+    def get_obs_batch(self, agent_ids, **kwargs):
+        if self._overrides('get_obs', SARWrapper):
+            return super().get_obs_batch(agent_ids, **kwargs)
+        return {
+            agent_id: self.wrap_observation(self.sim.agents[agent_id], obs)
+            for agent_id, obs in self.sim.get_obs_batch(agent_ids).items()
+        }
+
+    def get_reward_batch(self, agent_ids, **kwargs):
+        if self._overrides('get_reward', SARWrapper):
+            return super().get_reward_batch(agent_ids, **kwargs)
+        return {
+            agent_id: self.wrap_reward(reward)
+            for agent_id, reward in self.sim.get_reward_batch(agent_ids).items()
+        }
+
     # Default wrapping and unwrapping behavior. Override these in your custom wrapper.
     # Developer note: we have to have separate wrappers for each because we don't
     # want to force the observation and action space to map to the same wrapped space.
@@ -41,6 +41,29 @@ class Wrapper(AgentBasedSimulation):
     def get_info(self, agent_id, **kwargs):
         return self.sim.get_info(agent_id, **kwargs)
 
+    # The batch getters are forwarded to the simulation so that its batch overrides
+    # are used through every layer of wrappers. If a wrapper overrides one of the
+    # single-agent getters, then the matching batch getter calls it for each agent.
+    def get_obs_batch(self, agent_ids, **kwargs):
+        if self._overrides('get_obs', Wrapper):
+            return super().get_obs_batch(agent_ids, **kwargs)
+        return self.sim.get_obs_batch(agent_ids, **kwargs)
+
+    def get_reward_batch(self, agent_ids, **kwargs):
+        if self._overrides('get_reward', Wrapper):
+            return super().get_reward_batch(agent_ids, **kwargs)
+        return self.sim.get_reward_batch(agent_ids, **kwargs)
+
+    def get_done_batch(self, agent_ids, **kwargs):
+        if self._overrides('get_done', Wrapper):
+            return super().get_done_batch(agent_ids, **kwargs)
+        return self.sim.get_done_batch(agent_ids, **kwargs)
+
+    def get_info_batch(self, agent_ids, **kwargs):
+        if self._overrides('get_info', Wrapper):
+            return super().get_info_batch(agent_ids, **kwargs)
+        return self.sim.get_info_batch(agent_ids, **kwargs)
+
     @property
     def unwrapped(self):
         """
@@ -2,23 +2,20 @@ import os
 
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
-import ray
-import ray.rllib
-from ray.rllib.env import MultiAgentEnv
-from ray.tune.registry import get_trainable_cls
 
 from abmarl.tools import utils as adu
+from abmarl.tools.headless_renderer import HeadlessRenderer
+from abmarl.tools.trajectory_buffer import TrajectoryBuffer, TrajectoryRecorder, \
+    supports_render_state, unwrap_simulation
 from abmarl.managers import SimulationManager
 
 
 def _start(full_trained_directory, requested_checkpoint, seed=None):
     """The elements that are common to both analyze and visualize."""
-    # Load the experiment as a module
-    # First, we must find the .py file in the directory
-    py_files = [file for file in os.listdir(full_trained_directory) if file.endswith('.py')]
-    assert len(py_files) == 1
-    full_path_to_config = os.path.join(full_trained_directory, py_files[0])
-    experiment_mod = adu.custom_import_module(full_path_to_config)
+    import ray
+    from ray.tune.registry import get_trainable_cls
+
+    experiment_mod = _load_experiment(full_trained_directory)
     # Modify the number of workers in the configuration
     experiment_mod.params['ray_tune']['config']['num_workers'] = 1
     experiment_mod.params['ray_tune']['config']['num_envs_per_worker'] = 1
@@ -40,16 +37,64 @@ def _start(full_trained_directory, requested_checkpoint, seed=None):
     )
     trainer.restore(os.path.join(checkpoint_dir, 'checkpoint-' + str(checkpoint_value)))
 
-    # Get the simulation
-    sim = experiment_mod.params['experiment']['sim_creator'](
+    return _build_sim(experiment_mod), trainer
+
+
+def _load_experiment(full_trained_directory):
+    """Load the experiment configuration, which is the .py file in the directory."""
+    py_files = [file for file in os.listdir(full_trained_directory) if file.endswith('.py')]
+    assert len(py_files) == 1
+    full_path_to_config = os.path.join(full_trained_directory, py_files[0])
+    return adu.custom_import_module(full_path_to_config)
+
+
+def _build_sim(experiment_mod):
+    """Create the simulation from the experiment configuration."""
+    return experiment_mod.params['experiment']['sim_creator'](
         experiment_mod.params['ray_tune']['config']['env_config']
     )
 
-    return sim, trainer
+
+def _trajectory_buffer(full_trained_directory, parameters, sim):
+    """
+    Create a TrajectoryBuffer if the trajectories should be recorded. The simulation
+    must support recording its frames.
+    """
+    if getattr(parameters, 'record_trajectories', False):
+        if not supports_render_state(sim):
+            raise TypeError(
+                "The simulation must implement get_render_state and set_render_state "
+                "to record its frames."
+            )
+        return TrajectoryBuffer(os.path.join(full_trained_directory, 'trajectories'))
+
+
+def _write_headless(full_trained_directory, episode, sims, parameters):
+    """
+    Render each simulation state offscreen. Write a video if recording. Otherwise,
+    write an image sequence.
+    """
+    sims = iter(sims)
+    renderer = HeadlessRenderer(next(sims))
+    if parameters.record:
+        video_path = os.path.join(full_trained_directory, 'Episode_{}.mp4'.format(episode))
+        with renderer.video(video_path, fps=1000 / parameters.frame_delay):
+            renderer.grab_frame()
+            for sim in sims:
+                renderer.sim = sim
+                renderer.grab_frame()
+    else:
+        image_directory = os.path.join(full_trained_directory, 'Episode_{}'.format(episode))
+        os.makedirs(image_directory, exist_ok=True)
+        renderer.save_image(os.path.join(image_directory, 'frame_0000.png'))
+        for i, sim in enumerate(sims, 1):
+            renderer.sim = sim
+            renderer.save_image(os.path.join(image_directory, 'frame_{:04d}.png'.format(i)))
 
 
 def _finish():
     """Finish off the evaluation run."""
+    import ray
     ray.shutdown()
 
 
@@ -62,15 +107,82 @@ def run_analysis(full_trained_directory, full_subscript, parameters):
     if not isinstance(sim, SimulationManager):
         sim = sim.unwrapped
 
+    buffer = _trajectory_buffer(full_trained_directory, parameters, sim)
+    if buffer is not None:
+        sim = TrajectoryRecorder(sim, buffer, record_frames=True)
+
     # Load the analysis module and run it
     analysis_mod = adu.custom_import_module(full_subscript)
     analysis_mod.run(sim, trainer)
 
+    if buffer is not None:
+        buffer.flush()
+
     _finish()
 
 
+def run_replay(full_trained_directory, parameters):
+    """
+    Visualize episodes from the trajectories recorded with --record-trajectories
+    by analyze or visualize. The simulation is built from the experiment
+    configuration and drawn from each recorded frame, so there is no need to start
+    ray or restore the trainer.
+    """
+    sim = unwrap_simulation(_build_sim(_load_experiment(full_trained_directory)))
+    if not supports_render_state(sim):
+        raise TypeError(
+            "The simulation must implement get_render_state and set_render_state "
+            "to replay its frames."
+        )
+    trajectory_directory = os.path.join(full_trained_directory, 'trajectories')
+    if not os.path.exists(os.path.join(trajectory_directory, 'index.json')):
+        print('No recording in {}'.format(trajectory_directory))
+        return
+    buffer = TrajectoryBuffer.load(trajectory_directory)
+    sim.reset()
+
+    for episode in range(parameters.episodes):
+        frames = buffer.read_frames(episode) if episode < buffer.num_episodes else []
+        if not frames:
+            print('No recording for episode {}'.format(episode))
+            break
+        print('Episode: {}'.format(episode))
+
+        def replayed_sims():
+            for frame in frames:
+                sim.set_render_state(frame)
+                yield sim
+
+        if getattr(parameters, 'headless', False):
+            _write_headless(full_trained_directory, episode, replayed_sims(), parameters)
+            continue
+        fig = plt.figure()
+
+        def animate(i):
+            sim.set_render_state(frames[i])
+            sim.render(fig=fig)
+            plt.pause(1e-16)
+
+        if parameters.record:
+            anim = FuncAnimation(
+                fig, animate, frames=len(frames), repeat=False, interval=parameters.frame_delay
+            )
+            anim.save(os.path.join(full_trained_directory, 'Episode_{}.mp4'.format(episode)))
+        else:
+            plt.show(block=False)
+            for i in range(len(frames)):
+                animate(i)
+                plt.pause(parameters.frame_delay / 1000)
+        plt.close(fig)
+
+
 def run_visualize(full_trained_directory, parameters):
     """Visualize MARL policies from a saved policy"""
+    if getattr(parameters, 'from_recording', False):
+        run_replay(full_trained_directory, parameters)
+        return
+
+    from ray.rllib.env import MultiAgentEnv
     sim, trainer = _start(full_trained_directory, parameters.checkpoint, seed=parameters.seed)
 
     # Determine if we are single- or multi-agent case.
@@ -105,8 +217,30 @@ def run_visualize(full_trained_directory, parameters):
         _get_action = _single_get_action
         _get_done = _single_get_done
 
+    buffer = _trajectory_buffer(full_trained_directory, parameters, sim)
+    if buffer is not None:
+        sim = TrajectoryRecorder(
+            sim, buffer, single_agent=policy_agent_mapping is None, record_frames=True
+        )
+
+    def headless_episode():
+        obs = sim.reset()
+        done = None
+        while True:
+            yield unwrap_simulation(sim)
+            if done is not None and _get_done(done):
+                break
+            action = _get_action(
+                obs, done=done, sim=sim, trainer=trainer, policy_agent_mapping=policy_agent_mapping
+            )
+            obs, _, done, _ = sim.step(action)
+
     for episode in range(parameters.episodes):
         print('Episode: {}'.format(episode))
+        if getattr(parameters, 'headless', False):
+            _write_headless(full_trained_directory, episode, headless_episode(), parameters)
+            continue
+
         obs = sim.reset()
         done = None
         all_done = False
@@ -144,4 +278,6 @@ def run_visualize(full_trained_directory, parameters):
             plt.pause(1)
         plt.close(fig)
 
+    if buffer is not None:
+        buffer.flush()
     _finish()
@@ -1,4 +1,5 @@
 from gym.spaces import Space, Discrete, MultiBinary, MultiDiscrete, Box, Dict, Tuple
+import numpy as np
 
 
 def check_space(space, strict=False):
@@ -41,3 +42,22 @@ def make_dict(space):
             assert isinstance(subspace, Space), "Cannot convert this to a Dict."
 
     return Dict(space) if type(space) is dict else space
+
+
+def null_value(space):
+    """
+    Build the null value of a gym space: zeros, moved within the bounds of a Box,
+    and the first value of a Discrete. Dicts and Tuples are filled recursively.
+    """
+    if isinstance(space, Discrete):
+        return getattr(space, 'start', 0)
+    elif isinstance(space, (MultiBinary, MultiDiscrete)):
+        return np.zeros(space.shape, dtype=space.dtype)
+    elif isinstance(space, Box):
+        return np.clip(np.zeros(space.shape), space.low, space.high).astype(space.dtype)
+    elif isinstance(space, Dict):
+        return {key: null_value(subspace) for key, subspace in space.spaces.items()}
+    elif isinstance(space, Tuple):
+        return tuple(null_value(subspace) for subspace in space.spaces)
+    else:
+        raise TypeError(f"Cannot build the null value of {space}.")
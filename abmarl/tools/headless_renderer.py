@@ -0,0 +1,76 @@
+import contextlib
+
+import numpy as np
+
+
+class HeadlessRenderer:
+    """
+    Render a simulation offscreen and write the frames to images or a video, with
+    no GUI event loop.
+
+    If the simulation has init_render and update_render, then its artists are
+    created once and only their data is updated for each frame. Otherwise, the
+    simulation's render function redraws the figure every frame.
+
+    Args:
+        sim: The simulation to render. It can be swapped out between frames, for
+            example with snapshots of the same simulation.
+        figsize: The size of the figure in inches.
+        dpi: The resolution of the figure.
+    """
+    def __init__(self, sim, figsize=None, dpi=100):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        self.sim = sim
+        self.fig = Figure(figsize=figsize, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.artists = None
+        self._writer = None
+
+    def render(self, **kwargs):
+        """
+        Draw the current state of the simulation onto the figure.
+        """
+        if hasattr(self.sim, 'update_render'):
+            if self.artists is None:
+                self.artists = self.sim.init_render(self.fig, **kwargs)
+            self.sim.update_render(self.artists, **kwargs)
+        else:
+            self.sim.render(fig=self.fig, **kwargs)
+        self.canvas.draw()
+        return self.fig
+
+    def to_array(self, **kwargs):
+        """
+        Render the simulation and return the frame as an RGB array.
+        """
+        self.render(**kwargs)
+        return np.asarray(self.canvas.buffer_rgba())[..., :3].copy()
+
+    def save_image(self, path, **kwargs):
+        """
+        Render the simulation and save the frame as an image.
+        """
+        self.render(**kwargs)
+        self.fig.savefig(path)
+
+    @contextlib.contextmanager
+    def video(self, path, fps=5):
+        """
+        Open a video file for grab_frame. The video is written with ffmpeg.
+        """
+        from matplotlib.animation import FFMpegWriter
+        self._writer = FFMpegWriter(fps=fps)
+        with self._writer.saving(self.fig, path, self.fig.dpi):
+            try:
+                yield self
+            finally:
+                self._writer = None
+
+    def grab_frame(self, **kwargs):
+        """
+        Render the simulation and add the frame to the open video.
+        """
+        assert self._writer is not None, "grab_frame must be called within video."
+        self.render(**kwargs)
+        self._writer.grab_frame()
@@ -0,0 +1,345 @@
+import json
+import os
+
+import numpy as np
+
+from abmarl.managers import SimulationManager
+from abmarl.sim import AgentBasedSimulation
+
+# The key under which the frames of the simulation are recorded.
+FRAMES = '__frames__'
+
+
+def _flatten_value(name, value, output):
+    """
+    Split nested dictionaries and tuples into leaves named by their path.
+    """
+    if isinstance(value, dict):
+        for key, sub_value in value.items():
+            _flatten_value(f'{name}.{key}', sub_value, output)
+    elif isinstance(value, tuple):
+        for i, sub_value in enumerate(value):
+            _flatten_value(f'{name}.{i}', sub_value, output)
+    else:
+        output[name] = value
+    return output
+
+
+class _Columns:
+    """
+    Growable NumPy columns. Each column is created from the first value added to
+    it, and all the columns double in capacity when they are full. If a later value
+    does not fit a column's dtype, such as a float reward after integer ones, then
+    the column is promoted to a dtype that holds both.
+    """
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.size = 0
+        self.arrays = {}
+
+    def append(self, row):
+        if not self.arrays:
+            self.arrays = {
+                name: np.empty((self.capacity, *np.shape(value)), dtype=np.asarray(value).dtype)
+                for name, value in row.items()
+            }
+        elif self.size == self.capacity:
+            self.capacity *= 2
+            for name, array in self.arrays.items():
+                grown = np.empty((self.capacity, *array.shape[1:]), dtype=array.dtype)
+                grown[:self.size] = array[:self.size]
+                self.arrays[name] = grown
+        for name, value in row.items():
+            array = self.arrays[name]
+            dtype = np.result_type(array.dtype, np.asarray(value).dtype)
+            if dtype != array.dtype:
+                array = self.arrays[name] = array.astype(dtype)
+            array[self.size] = value
+        self.size += 1
+
+    def take(self, start, stop):
+        return {name: array[start:stop] for name, array in self.arrays.items()}
+
+    def clear(self):
+        self.size = 0
+
+
+class TrajectoryBuffer:
+    """
+    Record the agents' transitions into preallocated, growable NumPy columns.
+
+    Each agent has its own set of columns: step, reward, done, and one column for
+    each leaf of the observation and action. Nested observations and actions are
+    split into leaves named like "observation.position". Every leaf must have the
+    same shape each time the agent records it.
+
+    The buffer can also record a frame of the simulation each step with add_frame:
+    the state that the simulation renders from, as given by its get_render_state.
+    The frames are stored like another agent under FRAMES, and read_frames reads
+    them back so that the episode can be rendered again without running it.
+
+    If a directory is given, then completed episodes are spilled to disk as
+    .npy shards once the buffer holds shard_size transitions, and an index.json
+    file maps each episode to its shard and rows. Episodes are read back with
+    memory-mapping, so only the requested episode is loaded.
+
+    Args:
+        directory: Where to write the shards. If None, everything stays in memory.
+        shard_size: The number of transitions to hold in memory before spilling.
+        capacity: The starting number of rows in each agent's columns.
+    """
+    def __init__(self, directory=None, shard_size=100_000, capacity=1024):
+        self.directory = directory
+        self.shard_size = shard_size
+        self.capacity = capacity
+        self.agents = []
+        self.columns = {}
+        self.episodes = []
+        self.num_shards = 0
+        self._tables = {}
+        self._episode_start = {}
+        self._step = {}
+        self._size = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Open a buffer that was written to a directory.
+        """
+        with open(os.path.join(directory, 'index.json'), 'r') as index_file:
+            index = json.load(index_file)
+        buffer = cls(directory)
+        buffer.agents = index['agents']
+        buffer.columns = index['columns']
+        buffer.episodes = index['episodes']
+        buffer.num_shards = index['num_shards']
+        return buffer
+
+    @property
+    def num_episodes(self):
+        """
+        The number of completed episodes.
+        """
+        return len(self.episodes)
+
+    def add(self, agent_id, observation, action, reward, done):
+        """
+        Record a transition for an agent: the observation the agent acted on, its
+        action, and the reward and done it received afterwards.
+        """
+        row = {'reward': reward, 'done': done}
+        _flatten_value('observation', observation, row)
+        _flatten_value('action', action, row)
+        self._append(agent_id, row)
+
+    def add_frame(self, state):
+        """
+        Record a frame of the simulation: a dictionary of the state that it renders
+        from, such as the output of get_render_state. Each leaf must have the same
+        shape in every frame.
+        """
+        self._append(FRAMES, _flatten_value('state', state, {}))
+
+    def _append(self, key, row):
+        if key not in self._tables:
+            self.agents.append(key)
+            self._tables[key] = _Columns(self.capacity)
+        table = self._tables[key]
+        if key not in self._step:
+            self._episode_start[key] = table.size
+            self._step[key] = 0
+        row = {'step': self._step[key], **row}
+        if key not in self.columns:
+            self.columns[key] = list(row)
+        table.append(row)
+        self._step[key] += 1
+        self._size += 1
+
+    def end_episode(self):
+        """
+        Mark the end of the current episode. If there is a directory and the buffer
+        holds at least shard_size transitions, then spill to disk.
+        """
+        self._close_episode()
+        if self.directory is not None and self._size >= self.shard_size:
+            self.flush()
+
+    def flush(self):
+        """
+        End the current episode and write the episodes held in memory to a new shard.
+        """
+        self._close_episode()
+        if self.directory is None or self._size == 0:
+            return
+        shard = self.num_shards
+        shard_directory = os.path.join(self.directory, f'shard_{shard:05d}')
+        os.makedirs(shard_directory, exist_ok=True)
+        for agent_index, agent_id in enumerate(self.agents):
+            table = self._tables[agent_id]
+            for column_index, column in enumerate(self.columns[agent_id]):
+                np.save(
+                    os.path.join(shard_directory, f'{agent_index}_{column_index}.npy'),
+                    table.arrays[column][:table.size]
+                )
+            table.clear()
+        for episode in self.episodes:
+            if episode['shard'] is None:
+                episode['shard'] = shard
+        self.num_shards += 1
+        self._size = 0
+        with open(os.path.join(self.directory, 'index.json'), 'w') as index_file:
+            json.dump({
+                'agents': self.agents,
+                'columns': self.columns,
+                'episodes': self.episodes,
+                'num_shards': self.num_shards,
+            }, index_file)
+
+    def _close_episode(self):
+        if self._step:
+            self.episodes.append({
+                'shard': None,
+                'rows': {
+                    agent_id: [self._episode_start[agent_id], self._tables[agent_id].size]
+                    for agent_id in self._step
+                }
+            })
+            self._step = {}
+            self._episode_start = {}
+
+    def read_episode(self, index):
+        """
+        Read an episode.
+
+        Returns:
+            Dictionary mapping each agent in the episode to a dictionary of its
+            columns. Columns of spilled episodes are memory-mapped.
+        """
+        episode = self.episodes[index]
+        output = {}
+        for agent_id, (start, stop) in episode['rows'].items():
+            if episode['shard'] is None:
+                output[agent_id] = self._tables[agent_id].take(start, stop)
+            else:
+                agent_index = self.agents.index(agent_id)
+                shard_directory = os.path.join(self.directory, f"shard_{episode['shard']:05d}")
+                output[agent_id] = {
+                    column: np.load(
+                        os.path.join(shard_directory, f'{agent_index}_{column_index}.npy'),
+                        mmap_mode='r'
+                    )[start:stop]
+                    for column_index, column in enumerate(self.columns[agent_id])
+                }
+        return output
+
+    def read_frames(self, index):
+        """
+        Read the frames of an episode.
+
+        Returns:
+            List of the recorded states, with the same nesting as they were given
+            to add_frame. The list is empty if the episode has no frames.
+        """
+        columns = self.read_episode(index).get(FRAMES)
+        if columns is None:
+            return []
+        frames = [{} for _ in range(len(columns['step']))]
+        for name, column in columns.items():
+            if name == 'step':
+                continue
+            *keys, leaf = name.split('.')[1:]
+            for frame, value in zip(frames, column):
+                for key in keys:
+                    frame = frame.setdefault(key, {})
+                frame[leaf] = np.array(value)
+        return frames
+
+
+class TrajectoryRecorder:
+    """
+    Wrap a simulation manager and record every agent's transitions into a
+    TrajectoryBuffer. Each reset starts a new episode. If record_frames is set,
+    then a frame of the render state of the AgentBasedSimulation inside the wrapped
+    simulation is also recorded after every reset and step.
+
+    Args:
+        sim: The simulation manager, or any simulation with the same reset and
+            step API.
+        buffer: The TrajectoryBuffer.
+        single_agent: Set to True if the simulation has the gym API of a single
+            agent. Its transitions are recorded under the agent id "agent".
+        record_frames: Set to True to also record the frames. The simulation
+            must implement get_render_state and set_render_state.
+    """
+    def __init__(self, sim, buffer, single_agent=False, record_frames=False):
+        if record_frames and not supports_render_state(sim):
+            raise TypeError(
+                "The simulation must implement get_render_state and set_render_state "
+                "to record its frames."
+            )
+        self.sim = sim
+        self.buffer = buffer
+        self.single_agent = single_agent
+        self.record_frames = record_frames
+        self._obs = {}
+
+    def reset(self, **kwargs):
+        self.buffer.end_episode()
+        obs = self.sim.reset(**kwargs)
+        self._obs = {'agent': obs} if self.single_agent else dict(obs)
+        self._add_frame()
+        return obs
+
+    def step(self, action, **kwargs):
+        output = self.sim.step(action, **kwargs)
+        if self.single_agent:
+            action_dict, (obs, rewards, dones, _) = {'agent': action}, \
+                [{'agent': value} for value in output]
+        else:
+            action_dict, (obs, rewards, dones, _) = action, output
+        for agent_id, agent_action in action_dict.items():
+            if agent_id in self._obs and agent_id in rewards:
+                self.buffer.add(
+                    agent_id, self._obs[agent_id], agent_action, rewards[agent_id],
+                    dones[agent_id]
+                )
+        self._obs.update(obs)
+        self._add_frame()
+        return output
+
+    def _add_frame(self):
+        if self.record_frames:
+            self.buffer.add_frame(unwrap_simulation(self.sim).get_render_state())
+
+    def render(self, **kwargs):
+        self.sim.render(**kwargs)
+
+    def __getattr__(self, name):
+        if name == 'sim':
+            raise AttributeError(name)
+        return getattr(self.sim, name)
+
+
+def unwrap_simulation(sim):
+    """
+    Get the AgentBasedSimulation inside of managers and wrappers, which has the
+    render functions. Returns the input if there is none.
+    """
+    sim = getattr(sim, 'unwrapped', sim)
+    if isinstance(sim, SimulationManager):
+        sim = getattr(sim.sim, 'unwrapped', sim.sim)
+    return sim
+
+
+def supports_render_state(sim):
+    """
+    Determine if the AgentBasedSimulation inside of the managers and wrappers
+    implements get_render_state and set_render_state.
+    """
+    sim = unwrap_simulation(sim)
+    return isinstance(sim, AgentBasedSimulation) and all(
+        getattr(type(sim), name) is not getattr(AgentBasedSimulation, name)
+        for name in ['get_render_state', 'set_render_state']
+    )
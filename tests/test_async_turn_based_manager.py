@@ -0,0 +1,96 @@
+import asyncio
+import time
+
+from gym.spaces import Box, Discrete, MultiBinary, Tuple
+import numpy as np
+
+from abmarl.sim.corridor import MultiCorridor as Corridor
+from abmarl.sim.components.examples.fighting_teams import FightingTeamsSim, FightingTeamsAgent
+from abmarl.managers import TurnBasedManager, AsyncTurnBasedManager
+
+
+def build_fighting_sim():
+    agents = {
+        f'agent{i}': FightingTeamsAgent(
+            id=f'agent{i}', team=i % 2 + 1, attack_range=1, attack_strength=0.4,
+            move_range=1, view=3, initial_position=np.array([i, i])
+        ) for i in range(3)
+    }
+    return FightingTeamsSim(region=4, agents=agents, number_of_teams=2)
+
+
+def test_matches_turn_based_manager():
+    async def run():
+        async_sim = AsyncTurnBasedManager(Corridor())
+        sim = TurnBasedManager(Corridor())
+        np.random.seed(24)
+        obs = sim.reset()
+        np.random.seed(24)
+        assert await async_sim.reset() == obs
+        for _ in range(4):
+            action = {agent_id: Corridor.Actions.RIGHT for agent_id in obs}
+            expected = sim.step(action)
+            assert await async_sim.step(action) == expected
+            obs = expected[0]
+    asyncio.run(run())
+
+
+def test_decide_with_deadline():
+    async def fast_policy(obs):
+        return {'move': np.array([1, 0]), 'attack': False}
+
+    def slow_policy(obs):
+        time.sleep(0.5)
+        return {'move': np.array([1, 1]), 'attack': True}
+
+    async def run():
+        sim = AsyncTurnBasedManager(
+            build_fighting_sim(),
+            policies={'agent0': fast_policy, 'agent1': slow_policy},
+            deadline=0.1,
+        )
+        obs = await sim.reset()
+        assert list(obs) == ['agent0']
+        obs = {agent_id: None for agent_id in sim.agents}
+        actions = await sim.decide(obs, dones={'agent2': False})
+        np.testing.assert_array_equal(actions['agent0']['move'], np.array([1, 0]))
+        np.testing.assert_array_equal(actions['agent1']['move'], np.zeros(2))
+        assert not actions['agent1']['attack']
+        np.testing.assert_array_equal(actions['agent2']['move'], np.zeros(2))
+
+        sim = AsyncTurnBasedManager(
+            Corridor(),
+            policies={'agent0': lambda obs: Corridor.Actions.RIGHT},
+            null_actions={agent_id: Corridor.Actions.STAY for agent_id in sim.agents},
+        )
+        np.random.seed(24)
+        obs = await sim.reset()
+        position = sim.sim.agents['agent0'].position
+        obs, _, _, _ = await sim.step_with_policies(obs)
+        assert sim.sim.agents['agent0'].position == position + 1
+        assert list(obs) == ['agent1']
+        position = sim.sim.agents['agent1'].position
+        obs, _, _, _ = await sim.step_with_policies(obs)
+        assert sim.sim.agents['agent1'].position == position
+    asyncio.run(run())
+
+
+def test_null_actions():
+    sim = AsyncTurnBasedManager(Corridor(), null_actions={'agent0': Corridor.Actions.STAY})
+    assert sim.null_action('agent0') == Corridor.Actions.STAY
+    assert sim.null_action('agent1') == 0
+
+    sim = AsyncTurnBasedManager(build_fighting_sim())
+    for agent_id in sim.agents:
+        null_action = sim.null_action(agent_id)
+        assert sim.agents[agent_id].action_space.contains(null_action)
+        assert not null_action['attack']
+        np.testing.assert_array_equal(null_action['move'], np.zeros(2))
+
+    agent = sim.agents['agent0']
+    agent.action_space = Tuple((Box(1, 3, (2,)), MultiBinary(3), Discrete(2, start=1)))
+    null_action = sim.null_action('agent0')
+    np.testing.assert_array_equal(null_action[0], np.ones(2))
+    np.testing.assert_array_equal(null_action[1], np.zeros(3))
+    assert null_action[2] == 1
+    assert agent.action_space.contains(null_action)
@@ -2,6 +2,7 @@ import numpy as np
 
 from abmarl.sim.components.agent import AttackingAgent
 from abmarl.sim.components.actor import AttackActor
+from abmarl.sim.components.state import GridPositionState
 
 
 def test_position_based_attack_actor():
@@ -199,3 +200,46 @@ def test_team_matrix():
     assert actor.process_action(agents['agent3'], {'attack': True}).id == 'agent2'
     assert actor.process_action(agents['agent4'], {'attack': True}) is None
     assert actor.process_action(agents['agent5'], {'attack': True}) is None
+
+
+def test_attack_actor_with_position_state():
+    agents = {
+        'agent0': AttackingAgent(
+            id='agent0', attack_range=1, initial_position=np.array([1, 1]), attack_strength=0.6,
+            team=1
+        ),
+        'agent1': AttackingAgent(
+            id='agent1', attack_range=4, initial_position=np.array([0, 1]), attack_strength=0.6,
+            team=2
+        ),
+        'agent2': AttackingAgent(
+            id='agent2', attack_range=1, initial_position=np.array([4, 2]), attack_strength=0.6,
+            team=1
+        ),
+        'agent3': AttackingAgent(
+            id='agent3', attack_range=1, initial_position=np.array([4, 3]), attack_strength=0.6
+        ),
+        'agent4': AttackingAgent(
+            id='agent4', attack_range=1, initial_position=np.array([3, 2]), attack_strength=0.6,
+            team=3
+        ),
+        'agent5': AttackingAgent(
+            id='agent5', attack_range=1, initial_position=np.array([4, 0]), attack_strength=0.6,
+            team=1
+        ),
+    }
+    position_state = GridPositionState(region=5, agents=agents)
+    position_state.reset()
+
+    actor = AttackActor(agents=agents, number_of_teams=3, position_state=position_state)
+    assert actor.process_action(agents['agent0'], {'attack': True}).id == 'agent1'
+    assert actor.process_action(agents['agent1'], {'attack': True}).id == 'agent0'
+    assert actor.process_action(agents['agent2'], {'attack': True}).id == 'agent3'
+    assert actor.process_action(agents['agent3'], {'attack': True}).id == 'agent2'
+    assert actor.process_action(agents['agent4'], {'attack': True}).id == 'agent2'
+    assert actor.process_action(agents['agent5'], {'attack': True}) is None
+
+    agents['agent2'].is_alive = False
+    assert actor.process_action(agents['agent3'], {'attack': True}).id == 'agent4'
+    assert actor.process_action(agents['agent4'], {'attack': True}).id == 'agent3'
+    assert actor.process_action(agents['agent1'], {'attack': False}) is None
@@ -60,3 +60,153 @@ def test_collision():
         movement_actor.process_action(agents['agent1'], {'accelerate': np.zeros(2)}),
         np.array([1., 1.])
     )
+
+
+def test_collision_candidates_cover_all_overlaps():
+    np.random.seed(24)
+    agents = {
+        f'agent{i}': ParticleAgent(
+            id=f'agent{i}', max_acceleration=0, max_speed=1, size=0.5, mass=1,
+            initial_velocity=np.zeros(2)
+        ) for i in range(40)
+    }
+    position_state = ContinuousPositionState(region=20, agents=agents)
+    position_state.reset()
+    distances = position_state.distance_matrix()
+    np.fill_diagonal(distances, np.inf)
+    assert (distances >= 1).all()
+
+    for agent in agents.values():
+        agent.position = np.random.uniform(0, 20, 2)
+    candidates = {
+        (agent1.id, agent2.id) for agent1, agent2 in position_state.collision_candidates()
+    }
+    ids = list(agents)
+    for i, agent1 in enumerate(agents.values()):
+        for agent2 in list(agents.values())[i+1:]:
+            if np.linalg.norm(agent1.position - agent2.position) < 1:
+                assert (agent1.id, agent2.id) in candidates
+    assert all(ids.index(id1) < ids.index(id2) for id1, id2 in candidates)
+    assert len(candidates) < 40 * 39 / 2
+
+    collision_actor = ContinuousCollisionActor(position_state=position_state, agents=agents)
+    candidate_pairs = [
+        (agent1.id, agent2.id) for agent1, agent2 in collision_actor._candidate_pairs()
+    ]
+    assert candidates <= set(candidate_pairs)
+    assert candidate_pairs == [
+        (agent1.id, agent2.id) for agent1, agent2 in collision_actor._all_pairs()
+        if (agent1.id, agent2.id) in set(candidate_pairs)
+    ]
+
+
+def test_batched_collisions_match_pairwise():
+    def build(batched):
+        np.random.seed(5)
+        agents = {
+            f'agent{i}': ParticleAgent(
+                id=f'agent{i}', max_acceleration=0, max_speed=2, size=0.5,
+                mass=np.random.uniform(0.5, 2), initial_velocity=np.random.uniform(-1, 1, 2)
+            ) for i in range(30)
+        }
+        position_state = ContinuousPositionState(region=8, agents=agents)
+        velocity_state = VelocityState(agents=agents, friction=0.0)
+        position_state.reset()
+        velocity_state.reset()
+        for agent in agents.values():
+            agent.position = np.random.uniform(0, 8, 2)
+        collision_actor = ContinuousCollisionActor(
+            position_state=position_state, velocity_state=velocity_state, agents=agents,
+            batched=batched
+        )
+        return agents, collision_actor
+
+    pairwise_agents, pairwise_actor = build(False)
+    batched_agents, batched_actor = build(True)
+    moved_before = [agent.position.copy() for agent in batched_agents.values()]
+    pairwise_actor.detect_collisions_and_modify_states()
+    batched_actor.detect_collisions_and_modify_states()
+    for agent_id, agent in pairwise_agents.items():
+        np.testing.assert_allclose(agent.position, batched_agents[agent_id].position)
+        np.testing.assert_allclose(agent.velocity, batched_agents[agent_id].velocity)
+    assert any(
+        not np.array_equal(before, agent.position)
+        for before, agent in zip(moved_before, batched_agents.values())
+    )
+
+
+def test_dense_cluster_collisions_match_all_pairs(monkeypatch):
+    # Several agents overlap each other, so some are pushed back many times and
+    # into agents that were too far away to be collision candidates.
+    def build(seed, batched):
+        np.random.seed(seed)
+        agents = {
+            f'agent{i}': ParticleAgent(
+                id=f'agent{i}', max_acceleration=0, max_speed=1, size=0.1,
+                mass=np.random.uniform(0.5, 2), initial_velocity=np.random.uniform(-1, 1, 2)
+            ) for i in range(20)
+        }
+        position_state = ContinuousPositionState(region=10, agents=agents)
+        velocity_state = VelocityState(agents=agents, friction=0.0)
+        position_state.reset()
+        velocity_state.reset()
+        for i, agent in enumerate(agents.values()):
+            spread = 0.05 if i < 8 else 1.5
+            agent.position = np.array([5., 5.]) + np.random.uniform(-spread, spread, 2)
+        collision_actor = ContinuousCollisionActor(
+            position_state=position_state, velocity_state=velocity_state, agents=agents,
+            batched=batched
+        )
+        return agents, collision_actor
+
+    for seed in [3, 4, 6]:
+        all_pairs_agents, all_pairs_actor = build(seed, False)
+        with monkeypatch.context() as patch:
+            patch.delattr(ContinuousPositionState, 'collision_candidates')
+            all_pairs_actor.detect_collisions_and_modify_states()
+
+        for batched in [False, True]:
+            agents, collision_actor = build(seed, batched)
+            collision_actor.detect_collisions_and_modify_states()
+            for agent_id, agent in all_pairs_agents.items():
+                np.testing.assert_allclose(agent.position, agents[agent_id].position)
+                np.testing.assert_allclose(agent.velocity, agents[agent_id].velocity)
+
+
+def test_repeated_push_back_collisions_match_all_pairs(monkeypatch):
+    # The heavy agent is pushed back by each light agent in turn, ending up much
+    # farther from where it started than its speed.
+    def build(batched):
+        agents = {
+            'heavy': ParticleAgent(
+                id='heavy', max_acceleration=0, max_speed=1, size=0.1, mass=1000,
+                initial_velocity=np.array([1., 0.]), initial_position=np.array([10., 10.])
+            )
+        }
+        for i in range(8):
+            agents[f'light{i}'] = ParticleAgent(
+                id=f'light{i}', max_acceleration=0, max_speed=1, size=0.1, mass=0.001,
+                initial_velocity=np.zeros(2), initial_position=np.array([10.02 - 0.9 * i, 10.])
+            )
+        position_state = ContinuousPositionState(region=20, agents=agents)
+        velocity_state = VelocityState(agents=agents, friction=0.0)
+        position_state.reset()
+        velocity_state.reset()
+        collision_actor = ContinuousCollisionActor(
+            position_state=position_state, velocity_state=velocity_state, agents=agents,
+            batched=batched
+        )
+        return agents, collision_actor
+
+    all_pairs_agents, all_pairs_actor = build(False)
+    with monkeypatch.context() as patch:
+        patch.delattr(ContinuousPositionState, 'collision_candidates')
+        all_pairs_actor.detect_collisions_and_modify_states()
+    assert all_pairs_agents['heavy'].position[0] < 4
+
+    for batched in [False, True]:
+        agents, collision_actor = build(batched)
+        collision_actor.detect_collisions_and_modify_states()
+        for agent_id, agent in all_pairs_agents.items():
+            np.testing.assert_allclose(agent.position, agents[agent_id].position)
+            np.testing.assert_allclose(agent.velocity, agents[agent_id].velocity)
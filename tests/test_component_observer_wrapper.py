@@ -6,7 +6,7 @@ from abmarl.sim.components.state import GridPositionState, LifeState, SpeedAngle
 from abmarl.sim.components.observer import HealthObserver, LifeObserver, PositionObserver, \
     RelativePositionObserver, SpeedObserver, AngleObserver, VelocityObserver, TeamObserver
 from abmarl.sim.components.wrappers.observer_wrapper import \
-    PositionRestrictedObservationWrapper, TeamBasedCommunicationWrapper
+    PositionRestrictedObservationWrapper, TeamBasedCommunicationWrapper, obs_filter_step
 from abmarl.sim.components.actor import BroadcastActor
 
 from abmarl.sim.components.agent import AgentObservingAgent, VelocityObservingAgent, \
@@ -371,3 +371,146 @@ def test_broadcast_communication_observer_wrapper():
     np.testing.assert_array_equal(obs['position']['agent2'], np.array([-1, -1]))
     np.testing.assert_array_equal(obs['position']['agent3'], np.array([-1, -1]))
     np.testing.assert_array_equal(obs['position']['agent4'], np.array([-1, -1]))
+
+
+def test_broadcast_communication_observer_wrapper_with_position_state():
+    np.random.seed(24)
+    agents = {
+        f'agent{i}': CommunicatingAgent(
+            id=f'agent{i}', team=i % 3 + 1, broadcast_range=i % 4, agent_view=i % 5
+        ) for i in range(12)
+    }
+    position_state = GridPositionState(region=6, agents=agents)
+    broadcast_state = BroadcastState(agents=agents)
+    position_observer = PositionObserver(position_state=position_state, agents=agents)
+    team_observer = TeamObserver(number_of_teams=3, agents=agents)
+    partial_observer = PositionRestrictedObservationWrapper(
+        [position_observer, team_observer], agents=agents
+    )
+    comms_observer = TeamBasedCommunicationWrapper([partial_observer], agents=agents)
+    fast_partial_observer = PositionRestrictedObservationWrapper(
+        [position_observer, team_observer], agents=agents, position_state=position_state
+    )
+    fast_comms_observer = TeamBasedCommunicationWrapper(
+        [fast_partial_observer], agents=agents, position_state=position_state
+    )
+    broadcast_actor = BroadcastActor(broadcast_state=broadcast_state, agents=agents)
+
+    position_state.reset()
+    broadcast_state.reset()
+    for agent in agents.values():
+        broadcast_actor.process_action(agent, {'broadcast': np.random.randint(2)})
+
+    for agent in agents.values():
+        obs = comms_observer.get_obs(agent)
+        fast_obs = fast_comms_observer.get_obs(agent)
+        assert obs['mask'] == fast_obs['mask']
+        assert obs['team'] == fast_obs['team']
+        for other in agents:
+            np.testing.assert_array_equal(obs['position'][other], fast_obs['position'][other])
+
+
+def test_broadcast_communication_observer_wrapper_batch():
+    np.random.seed(24)
+    agents = {
+        f'agent{i}': CommunicatingAgent(
+            id=f'agent{i}', team=i % 3 + 1, broadcast_range=i % 4, agent_view=i % 5
+        ) for i in range(12)
+    }
+    position_state = GridPositionState(region=6, agents=agents)
+    broadcast_state = BroadcastState(agents=agents)
+    position_observer = PositionObserver(position_state=position_state, agents=agents)
+    team_observer = TeamObserver(number_of_teams=3, agents=agents)
+    partial_observer = PositionRestrictedObservationWrapper(
+        [position_observer, team_observer], agents=agents, position_state=position_state
+    )
+    comms_observer = TeamBasedCommunicationWrapper(
+        [partial_observer], agents=agents, position_state=position_state
+    )
+    broadcast_actor = BroadcastActor(broadcast_state=broadcast_state, agents=agents)
+
+    position_state.reset()
+    broadcast_state.reset()
+    comms_observer.reset()
+    for agent in agents.values():
+        broadcast_actor.process_action(agent, {'broadcast': np.random.randint(2)})
+
+    observed = []
+    get_obs = partial_observer.get_obs
+    partial_observer.get_obs = lambda agent, **kwargs: observed.append(agent.id) or \
+        get_obs(agent, **kwargs)
+    batch_obs = comms_observer.get_obs_batch(agents.values())
+    assert sorted(observed) == sorted(agents)
+
+    # get_obs reuses the observations cached in this step
+    for agent in agents.values():
+        comms_observer.get_obs(agent)
+    assert sorted(observed) == sorted(agents)
+
+    # The cache is cleared when the simulation steps
+    for agent in agents.values():
+        position_state.set_position(agent, np.array([5, 5]) - agent.position)
+    comms_observer.step()
+    observed.clear()
+    batch_obs = comms_observer.get_obs_batch(agents.values())
+    assert sorted(observed) == sorted(agents)
+
+    partial_observer.get_obs = get_obs
+    uncached_observer = TeamBasedCommunicationWrapper(
+        [partial_observer], agents=agents, position_state=position_state
+    )
+    for agent in agents.values():
+        obs = uncached_observer.get_obs(agent)
+        assert obs['mask'] == batch_obs[agent.id]['mask']
+        assert obs['team'] == batch_obs[agent.id]['team']
+        for other in agents:
+            np.testing.assert_array_equal(
+                obs['position'][other], batch_obs[agent.id]['position'][other]
+            )
+
+
+def test_position_restricted_observer_wrapper_vectorized():
+    def linear_drop_off(distance, view):
+        return 1. - 1. / (view+1) * distance
+
+    for position_state_given in [False, True]:
+        agents = {
+            f'agent{i}': AllObservingAgent(id=f'agent{i}', team=i % 2 + 1, agent_view=i % 4)
+            for i in range(10)
+        }
+        agents['agent10'] = NonViewAgent(id='agent10', team=1)
+        np.random.seed(24)
+        position_state = GridPositionState(agents=agents, region=6)
+        position_observer = PositionObserver(position_state=position_state, agents=agents)
+        team_observer = TeamObserver(number_of_teams=2, agents=agents)
+        life_observer = LifeObserver(agents=agents)
+        position_state.reset()
+        LifeState(agents=agents).reset()
+        kwargs = {'position_state': position_state} if position_state_given else {}
+
+        for obs_filter in [obs_filter_step, linear_drop_off]:
+            observer = PositionRestrictedObservationWrapper(
+                [position_observer, team_observer, life_observer], obs_filter=obs_filter,
+                agents=agents, **kwargs
+            )
+            vectorized_observer = PositionRestrictedObservationWrapper(
+                [position_observer, team_observer, life_observer], obs_filter=obs_filter,
+                agents=agents, vectorized=True, **kwargs
+            )
+            np.random.seed(7)
+            expected = {agent.id: observer.get_obs(agent) for agent in agents.values()}
+            np.random.seed(7)
+            single = {agent.id: vectorized_observer.get_obs(agent) for agent in agents.values()}
+            np.random.seed(7)
+            batch = vectorized_observer.get_obs_batch(agents.values())
+            for agent_id in agents:
+                for obs in [single[agent_id], batch[agent_id]]:
+                    assert obs['mask'] == expected[agent_id]['mask']
+                    assert obs['team'] == expected[agent_id]['team']
+                    for other in agents:
+                        np.testing.assert_array_equal(
+                            obs['position'][other], expected[agent_id]['position'][other]
+                        )
+                        np.testing.assert_array_equal(
+                            obs['life'][other], expected[agent_id]['life'][other]
+                        )
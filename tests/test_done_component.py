@@ -102,3 +102,74 @@ def test_too_close_done_with_continuous():
     assert done.get_done(agents['agent4'])
     assert not done.get_done(agents['agent5'])
     assert done.get_all_done()
+
+
+def test_done_batch():
+    from abmarl.sim.components.state import AgentStateTable
+    for use_table in [False, True]:
+        agents = {
+            f'agent{i}': Agent(id=f'agent{i}', initial_position=np.array([0.2 + i, 2.0]))
+            for i in range(4)
+        }
+        if use_table:
+            AgentStateTable(agents=agents)
+        state = ContinuousPositionState(region=4, agents=agents)
+        life = LifeState(agents=agents)
+        state.reset()
+        life.reset()
+        agents['agent2'].is_alive = False
+
+        some_agents = [agents['agent3'], agents['agent2'], agents['agent0']]
+        for done in [
+            DeadDone(agents=agents),
+            TooCloseDone(position=state, agents=agents, collision_distance=0.25)
+        ]:
+            assert done.get_done_batch(some_agents) == {
+                agent.id: done.get_done(agent) for agent in some_agents
+            }
+        assert DeadDone(agents=agents).get_done_batch(some_agents) == {
+            'agent3': False, 'agent2': True, 'agent0': False
+        }
+
+
+def test_component_done_mixin_respects_overridden_get_done():
+    from abmarl.sim import AgentBasedSimulation
+    from abmarl.sim.components.simulation import ComponentDoneMixin
+
+    class Sim(ComponentDoneMixin, AgentBasedSimulation):
+        def __init__(self, agents):
+            self.agents = agents
+            self.done = DeadDone(agents=agents)
+            self.life = LifeState(agents=agents)
+
+        def reset(self, **kwargs):
+            self.life.reset()
+
+        def step(self, action, **kwargs):
+            pass
+
+        def render(self, **kwargs):
+            pass
+
+        def get_obs(self, agent_id, **kwargs):
+            pass
+
+        def get_reward(self, agent_id, **kwargs):
+            pass
+
+        def get_info(self, agent_id, **kwargs):
+            pass
+
+    class NeverDoneSim(Sim):
+        def get_done(self, agent_id, **kwargs):
+            return False
+
+    agents = {f'agent{i}': Agent(id=f'agent{i}') for i in range(3)}
+    sim = Sim(agents)
+    sim.reset()
+    agents['agent1'].is_alive = False
+    assert sim.get_done_batch(['agent1', 'agent2']) == {'agent1': True, 'agent2': False}
+    assert not sim.get_all_done()
+    assert NeverDoneSim(agents).get_done_batch(['agent1', 'agent2']) == {
+        'agent1': False, 'agent2': False
+    }
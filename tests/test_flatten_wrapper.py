@@ -3,7 +3,8 @@ import numpy as np
 
 from abmarl.sim import Agent
 from abmarl.sim.wrappers import FlattenWrapper
-from abmarl.sim.wrappers.flatten_wrapper import flatdim, flatten, unflatten, flatten_space
+from abmarl.sim.wrappers.flatten_wrapper import flatdim, flatten, unflatten, flatten_space, \
+    FlattenPlan
 from .helpers import MultiAgentSim
 
 # --- Test flatten helper commands --- #
@@ -233,6 +234,23 @@ class MultiAgentContinuousGymSpaceSim(MultiAgentSim):
         return self.action[agent_id]
 
 
+def test_flatten_plan():
+    np.random.seed(24)
+    for space in [box, box2, discrete, multi_binary, multi_discrete, d, t, combo]:
+        space.seed(24)
+        plan = FlattenPlan(space)
+        assert plan.size == flatdim(space)
+        samples = [space.sample() for _ in range(5)]
+        for sample in samples:
+            expected = flatten(space, sample)
+            flattened = plan.flatten(sample)
+            assert flattened.dtype == expected.dtype
+            np.testing.assert_array_equal(flattened, expected)
+            out = np.zeros(flatdim(space), dtype=plan.dtype)
+            assert plan.flatten(sample, out=out) is out
+            np.testing.assert_array_equal(out, expected)
+
+
 def test_flatten_wrapper():
     sim = MultiAgentContinuousGymSpaceSim()
     wrapped_sim = FlattenWrapper(sim)
@@ -22,8 +22,73 @@ class Policy:
         return action
 
 
+class CountedPolicy(Policy):
+    pickles = 0
+
+    def __getstate__(self):
+        CountedPolicy.pickles += 1
+        return self.__dict__
+
+
 def test_generate_episode():
     states, actions, rewards = generate_episode(Sim(), Policy())
     assert states == [0, 1, -2, 4, -8, 16, -32, 64]
     assert actions == [1, -2, 4, -8, 16, -32, 64, -128]
     assert rewards == [1, -2, 4, -8, 16, -32, 64, -128]
+
+
+def test_episode_generator():
+    import numpy as np
+    from abmarl.algs import EpisodeGenerator
+
+    with EpisodeGenerator(Sim(), num_workers=0) as generator:
+        states, actions, rewards, lengths = generator.generate(Policy(), 2)
+    np.testing.assert_array_equal(lengths, [8, 8])
+    np.testing.assert_array_equal(states, [0, 1, -2, 4, -8, 16, -32, 64] * 2)
+    np.testing.assert_array_equal(actions, [1, -2, 4, -8, 16, -32, 64, -128] * 2)
+    assert rewards.dtype == float
+
+
+def test_episode_generator_workers_match_serial():
+    import numpy as np
+    from abmarl.algs import EpisodeGenerator
+    from abmarl.external import GymWrapper
+    from abmarl.managers import AllStepManager
+    from abmarl.pols import EpsilonSoftPolicy
+    from abmarl.sim.corridor import MultiCorridor as Corridor
+    from abmarl.sim.wrappers import RavelDiscreteWrapper
+
+    sim = GymWrapper(AllStepManager(RavelDiscreteWrapper(Corridor(num_agents=1))))
+    np.random.seed(24)
+    policy = EpsilonSoftPolicy(
+        np.random.normal(0, 1, size=(sim.observation_space.n, sim.action_space.n)), epsilon=0.5
+    )
+    with EpisodeGenerator(sim, horizon=10, num_workers=0) as generator:
+        serial = generator.generate(policy, 6, seed=7)
+    with EpisodeGenerator(sim, horizon=10, num_workers=2) as generator:
+        parallel = generator.generate(policy, 6, seed=7)
+    assert len(serial[3]) == 6
+    for serial_array, parallel_array in zip(serial, parallel):
+        np.testing.assert_array_equal(serial_array, parallel_array)
+
+
+def test_episode_generator_preserves_global_random_state():
+    import numpy as np
+    from abmarl.algs import EpisodeGenerator
+
+    np.random.seed(3)
+    expected = np.random.uniform(size=3)
+    np.random.seed(3)
+    with EpisodeGenerator(Sim(), num_workers=0) as generator:
+        generator.generate(Policy(), 2, seed=7)
+    np.testing.assert_array_equal(np.random.uniform(size=3), expected)
+
+
+def test_episode_generator_sends_the_policy_once_per_worker():
+    from abmarl.algs import EpisodeGenerator
+
+    CountedPolicy.pickles = 0
+    with EpisodeGenerator(Sim(), num_workers=2) as generator:
+        states, actions, rewards, lengths = generator.generate(CountedPolicy(), 6, seed=7)
+    assert CountedPolicy.pickles == 2
+    assert len(lengths) == 6
@@ -73,3 +73,50 @@ def test_harvest_and_regrow():
     for _ in range(25):
         sim.regrow()
     assert (sim.resources <= sim.max_value).all()
+
+
+def test_regrowth_matches_full_grid():
+    def full_grid_regrow(resources, sim):
+        resources[resources >= sim.min_value] += sim.revive_rate
+        resources[resources >= sim.max_value] = sim.max_value
+
+    np.random.seed(24)
+    sim = GridResources.build({'region': 12, 'revive_rate': 0.07})
+    sim.reset()
+    expected = sim.resources.copy()
+    for step in range(30):
+        for _ in range(5):
+            location = tuple(np.random.randint(12, size=2))
+            amount = np.random.uniform(0, 0.5)
+            sim.harvest(location, amount)
+            expected[location] = max(0., expected[location] - amount)
+        sim.regrow()
+        full_grid_regrow(expected, sim)
+        np.testing.assert_array_equal(sim.resources, expected)
+        if step == 10:
+            # Direct changes are found after invalidating or rebinding the resources
+            sim.resources[0, :] = 0.5
+            expected[0, :] = 0.5
+            sim.invalidate_resources()
+        elif step == 20:
+            sim.resources = np.full((12, 12), 0.5)
+            expected = sim.resources.copy()
+    assert len(sim._regrowth.active) < (expected >= sim.min_value).sum()
+
+
+def test_fast_forward():
+    np.random.seed(24)
+    sim = GridResources.build({'region': 8, 'revive_rate': 0.03})
+    sim.reset()
+    sim.harvest((2, 3), 0.2)
+    expected = sim.resources.copy()
+    sim.fast_forward(12)
+    regrowing = expected >= sim.min_value
+    expected[regrowing] = np.minimum(expected[regrowing] + 12 * 0.03, sim.max_value)
+    np.testing.assert_allclose(sim.resources, expected)
+
+    # Enough steps fill every regrowing cell, and the others stay the same
+    sim.fast_forward(40)
+    assert (sim.resources[regrowing] == sim.max_value).all()
+    np.testing.assert_array_equal(sim.resources[~regrowing], expected[~regrowing])
+    assert len(sim._regrowth.active) == 0
@@ -59,3 +59,29 @@ def test_off_policy():
         if done:
             break
     assert done
+
+
+def test_first_visit_update():
+    import numpy as np
+    from abmarl.algs.monte_carlo import _first_visit_update
+
+    q_table = np.full((3, 2), 7.)
+    visit_table = np.zeros((3, 2), dtype=int)
+    states, actions, rewards = [0, 1, 0, 2], [1, 0, 1, 1], [1, 2, 3, 4]
+    _first_visit_update(q_table, visit_table, states, actions, rewards, gamma=0.5)
+    # Returns are 3.25, 4.5, 5, 4. (0, 1) is first visited at step 0.
+    np.testing.assert_array_equal(visit_table, [[0, 1], [1, 0], [0, 1]])
+    np.testing.assert_allclose(q_table, [[7, 3.25], [4.5, 7], [7, 4]])
+
+    _first_visit_update(q_table, visit_table, [0], [1], [1.5], gamma=0.5)
+    assert visit_table[0, 1] == 2
+    assert q_table[0, 1] == 2.375
+
+
+def test_epsilon_soft_batched_episodes():
+    sim = AllStepManager(RavelDiscreteWrapper(Corridor(num_agents=1)))
+    sim, q_table, policy = epsilon_soft(
+        sim, iteration=50, horizon=20, episodes_per_batch=10, num_workers=2
+    )
+    assert q_table.shape == (sim.observation_space.n, sim.action_space.n)
+    assert isinstance(policy, EpsilonSoftPolicy)
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from abmarl.sim.corridor import MultiCorridor as Corridor
+from abmarl.managers import AllStepManager, ParallelSimulationPool
+
+
+def build_sim():
+    np.random.seed(24)
+    return AllStepManager(Corridor())
+
+
+def test_matches_all_step_manager():
+    sim = build_sim()
+    expected_obs = sim.reset()
+    actions = {agent_id: Corridor.Actions.RIGHT for agent_id in expected_obs}
+    expected = sim.step(actions)
+
+    with ParallelSimulationPool([build_sim, build_sim]) as pool:
+        assert pool.num_sims == 2
+        assert pool.obs_buffers['agent0'].shape == (2, 3)
+        obs = pool.reset()
+        assert len(obs) == 2
+        for sim_obs in obs:
+            for agent_id in expected_obs:
+                for key in expected_obs[agent_id]:
+                    np.testing.assert_array_equal(
+                        sim_obs[agent_id][key], expected_obs[agent_id][key]
+                    )
+
+        obs, rewards, dones, infos = pool.step([actions, actions])
+        for k in range(2):
+            assert obs[k].keys() == expected[0].keys()
+            for agent_id in obs[k]:
+                for key in obs[k][agent_id]:
+                    np.testing.assert_array_equal(
+                        obs[k][agent_id][key], expected[0][agent_id][key]
+                    )
+            assert rewards[k] == expected[1]
+            assert dones[k] == expected[2]
+            assert infos[k] == expected[3]
+
+        with pytest.raises(AssertionError):
+            pool.step([actions])
+        with pytest.raises(AssertionError):
+            pool.step([actions, actions]) # agent0 is done
+
+
+def test_flat_obs():
+    with ParallelSimulationPool([build_sim], flat_obs=True) as pool:
+        obs = pool.reset()
+        np.testing.assert_array_equal(obs[0]['agent0'], pool.obs_buffers['agent0'][0])
+        assert obs[0]['agent0'].shape == (3,)
+
+
+def test_without_shared_memory(monkeypatch):
+    # Python 3.7 has no shared memory, so the observations go through the pipes.
+    from abmarl.managers import parallel_simulation_pool
+    monkeypatch.setattr(parallel_simulation_pool, 'shared_memory', None)
+    monkeypatch.setattr(parallel_simulation_pool, 'resource_tracker', None)
+
+    sim = build_sim()
+    expected_obs = sim.reset()
+    actions = {agent_id: Corridor.Actions.RIGHT for agent_id in expected_obs}
+    expected = sim.step(actions)
+    with ParallelSimulationPool([build_sim, build_sim]) as pool:
+        assert pool.obs_buffers['agent0'].shape == (2, 3)
+        pool.reset()
+        obs, rewards, _, _ = pool.step([actions, actions])
+        for k in range(2):
+            for agent_id in obs[k]:
+                for key in obs[k][agent_id]:
+                    np.testing.assert_array_equal(
+                        obs[k][agent_id][key], expected[0][agent_id][key]
+                    )
+                np.testing.assert_array_equal(
+                    pool.obs_buffers[agent_id][k],
+                    parallel_simulation_pool.flatten(
+                        pool.spaces[agent_id], expected[0][agent_id]
+                    )
+                )
+            assert rewards[k] == expected[1]
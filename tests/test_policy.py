@@ -120,3 +120,50 @@ def test_random_first_action_policy_probability():
     policy.act(2)
     prob = policy.probability(0, 2)
     assert prob == (1 if 2 == np.argmax(policy.q_table[4]) else 0)
+
+
+def test_greedy_policy_batch():
+    np.random.seed(24)
+    table = np.random.normal(0, 1, size=(6,3))
+    policy = GreedyPolicy(table)
+    states = np.array([0, 3, 3, 5])
+    np.testing.assert_array_equal(policy.act_batch(states), np.argmax(table[states], axis=1))
+    np.testing.assert_array_equal(
+        policy.probability_batch(states, [0, 1, 2, 0]),
+        [policy.probability(state, action) for state, action in zip(states, [0, 1, 2, 0])]
+    )
+
+    # In-place updates to the q_table are seen by the next batch
+    table[3] = [0, 0, 10]
+    table[5] = [10, 0, 0]
+    np.testing.assert_array_equal(policy.act_batch(states), [np.argmax(table[0]), 2, 2, 0])
+    np.testing.assert_array_equal(policy.probability_batch([3, 5], [2, 2]), [1, 0])
+
+    policy.q_table = np.zeros((6, 3))
+    np.testing.assert_array_equal(policy.act_batch(states), np.zeros(4))
+
+
+def test_epsilon_soft_policy_batch():
+    np.random.seed(24)
+    table = np.random.normal(0, 1, size=(6,3))
+    policy = EpsilonSoftPolicy(table, epsilon=0.)
+    states = np.arange(6)
+    np.testing.assert_array_equal(policy.act_batch(states), np.argmax(table, axis=1))
+    policy = EpsilonSoftPolicy(table, epsilon=0.5)
+    actions = np.array([0, 1, 2, 0, 1, 2])
+    np.testing.assert_allclose(
+        policy.probability_batch(states, actions),
+        [policy.probability(state, action) for state, action in zip(states, actions)]
+    )
+    assert set(policy.act_batch(np.zeros(100, dtype=int))) == {0, 1, 2}
+
+
+def test_random_first_action_policy_batch():
+    np.random.seed(24)
+    table = np.random.normal(0, 1, size=(6,3))
+    policy = RandomFirstActionPolicy(table)
+    policy.reset()
+    states = np.arange(6)
+    np.testing.assert_array_equal(policy.probability_batch(states, states % 3), np.full(6, 1/3))
+    policy.act_batch(states)
+    np.testing.assert_array_equal(policy.act_batch(states), np.argmax(table, axis=1))
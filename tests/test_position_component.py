@@ -1,3 +1,5 @@
+import copy
+
 import numpy as np
 
 from abmarl.sim.components.state import GridPositionState, LifeState
@@ -271,3 +273,180 @@ def test_relative_position_observer():
     assert observer.get_obs(agents['agent3'])['relative_position']['agent2'][1] == -2
     assert observer.get_obs(agents['agent3'])['relative_position']['agent4'][0] == 0
     assert observer.get_obs(agents['agent3'])['relative_position']['agent4'][1] == 0
+
+
+def test_position_state_distance_matrix():
+    agents = {
+        'agent0': ComponentAgent(id='agent0', initial_position=np.array([0, 0])),
+        'agent1': ComponentAgent(id='agent1', initial_position=np.array([3, 4])),
+        'agent2': ComponentAgent(id='agent2', initial_position=np.array([0, 2])),
+    }
+    state = GridPositionState(agents=agents, region=5)
+    state.reset()
+
+    np.testing.assert_array_equal(state.distance_matrix(), np.array([
+        [0., 5., 2.],
+        [5., 0., np.sqrt(13)],
+        [2., np.sqrt(13), 0.],
+    ]))
+    np.testing.assert_array_equal(state.distance_matrix(np.inf), np.array([
+        [0., 4., 2.],
+        [4., 0., 3.],
+        [2., 3., 0.],
+    ]))
+    assert state.distance(agents['agent0'], agents['agent1'], 1) == 7
+    assert state.distance_matrix(np.inf) is state.distance_matrix(np.inf)
+
+    # Changing a position invalidates the cache
+    state.modify_position(agents['agent2'], np.array([3, 0]))
+    assert state.distance(agents['agent1'], agents['agent2'], np.inf) == 2
+    assert state.distance(agents['agent0'], agents['agent2'], np.inf) == 3
+
+    # Moving out of the region does not change the position
+    cached = state.distance_matrix(np.inf)
+    state.modify_position(agents['agent2'], np.array([3, 0]))
+    assert state.distance_matrix(np.inf) is cached
+
+
+def test_grid_position_state_neighbors():
+    agents = {
+        'agent0': ComponentAgent(id='agent0', initial_position=np.array([2, 2])),
+        'agent1': ComponentAgent(id='agent1', initial_position=np.array([0, 0])),
+        'agent2': ComponentAgent(id='agent2', initial_position=np.array([2, 3])),
+        'agent3': ComponentAgent(id='agent3', initial_position=np.array([4, 4])),
+        'agent4': ComponentAgent(id='agent4', initial_position=np.array([2, 2])),
+    }
+    state = GridPositionState(agents=agents, region=5)
+    state.reset()
+
+    def neighbor_ids(agent_id, radius, norm=np.inf):
+        return [agent.id for agent in state.neighbors(agents[agent_id], radius, norm)]
+
+    assert neighbor_ids('agent0', 0) == ['agent4']
+    assert neighbor_ids('agent0', 1) == ['agent2', 'agent4']
+    assert neighbor_ids('agent0', 2) == ['agent1', 'agent2', 'agent3', 'agent4']
+    assert neighbor_ids('agent0', 2, 1) == ['agent2', 'agent4']
+    assert neighbor_ids('agent1', 3) == ['agent0', 'agent2', 'agent4']
+    assert neighbor_ids('agent3', 1) == []
+
+    # The index follows the agents as they move
+    state.modify_position(agents['agent3'], np.array([-1, -1]))
+    state.modify_position(agents['agent4'], np.array([2, 2]))
+    assert neighbor_ids('agent3', 0) == []
+    assert neighbor_ids('agent3', 1) == ['agent0', 'agent2', 'agent4']
+    assert neighbor_ids('agent0', 1) == ['agent2', 'agent3']
+
+    # Moving out of the region does not change the index
+    state.modify_position(agents['agent4'], np.array([1, 0]))
+    assert neighbor_ids('agent3', 1) == ['agent0', 'agent2', 'agent4']
+
+
+def test_grid_observers_follow_moves_and_deaths():
+    from abmarl.sim.components.state import AgentStateTable
+
+    def expected_team_obs(agent, agents, region, number_of_teams):
+        view = agent.agent_view
+        signal = np.zeros((2 * view + 1, 2 * view + 1, number_of_teams))
+        for r in range(2 * view + 1):
+            for c in range(2 * view + 1):
+                row, col = agent.position[0] + r - view, agent.position[1] + c - view
+                if not (0 <= row < region and 0 <= col < region):
+                    signal[r, c] = -1
+        for other in agents.values():
+            if other is agent or not other.is_alive: continue
+            r_diff, c_diff = other.position - agent.position + view
+            if 0 <= r_diff <= 2 * view and 0 <= c_diff <= 2 * view:
+                signal[r_diff, c_diff, other.team] += 1
+        return signal
+
+    for use_table in [False, True]:
+        np.random.seed(24)
+        agents = {
+            f'agent{i}': PositionTeamTestAgent(
+                id=f'agent{i}', team=i % 3 + 1, agent_view=i % 4
+            ) for i in range(30)
+        }
+        if use_table:
+            AgentStateTable(agents=agents, position_dtype=int)
+        state = GridPositionState(agents=agents, region=6)
+        life = LifeState(agents=agents)
+        observer = GridPositionBasedObserver(position_state=state, agents=agents)
+        team_observer = GridPositionTeamBasedObserver(
+            position_state=state, number_of_teams=3, agents=agents
+        )
+        state.reset()
+        life.reset()
+
+        for _ in range(3):
+            for agent in agents.values():
+                expected = expected_team_obs(agent, agents, 6, 4)
+                np.testing.assert_array_equal(
+                    team_observer.get_obs(agent)['position'], expected
+                )
+                np.testing.assert_array_equal(
+                    observer.get_obs(agent)['position'],
+                    np.where(expected.sum(axis=2) > 0, 1, expected[:, :, 0])
+                )
+            for agent in agents.values():
+                state.modify_position(agent, np.random.randint(-1, 2, 2))
+            life.set_health(agents[f'agent{np.random.randint(30)}'], -1)
+
+
+def test_occupancy_is_cached_until_its_agents_change():
+    agents = {
+        f'agent{i}': PositionTeamTestAgent(
+            id=f'agent{i}', team=1, agent_view=1, initial_position=np.array([i, i])
+        ) for i in range(3)
+    }
+    state = GridPositionState(agents=agents, region=4)
+    state.reset()
+    raster = state.occupancy(1)
+    assert state.occupancy(1) is raster
+    assert raster[2, 2] == 1
+
+    agents['agent1'].is_alive = False
+    raster = state.occupancy(1)
+    assert raster[2, 2] == 0
+    assert state.occupancy(1) is raster
+
+    state.set_position(agents['agent0'], np.array([3, 0]))
+    assert state.occupancy(1)[4, 1] == 1
+
+    agents['agent2'].team = 2
+    raster = state.occupancy(1, number_of_teams=3)
+    assert raster[3, 3, 2] == 1
+
+    agents['agent0'].position = np.array([0, 3])
+    assert state.occupancy(1)[1, 4] == 1
+
+
+def test_occupancy_only_tracks_its_own_agents():
+    def make_state():
+        agents = {
+            f'agent{i}': PositionTeamTestAgent(
+                id=f'agent{i}', agent_view=1, initial_position=np.array([i, i])
+            ) for i in range(3)
+        }
+        state = GridPositionState(agents=agents, region=4)
+        state.reset()
+        return state
+
+    state, other_state = make_state(), make_state()
+    raster = state.occupancy()
+    other_state.agents['agent1'].is_alive = False
+    assert state.occupancy() is raster
+
+    copied_state = copy.deepcopy(state)
+    copied_state.agents['agent1'].is_alive = False
+    assert state.occupancy() is raster
+    assert state.occupancy()[1, 1] == 1
+    assert copied_state.occupancy()[1, 1] == 0
+    copied_agent = copy.deepcopy(state.agents['agent2'])
+    copied_agent.is_alive = False
+    assert state.occupancy() is raster
+
+    state.agents = other_state.agents
+    assert state.occupancy()[1, 1] == 0
+    raster = state.occupancy()
+    other_state.agents['agent0'].is_alive = False
+    assert state.occupancy()[0, 0] == 0
@@ -1143,3 +1143,110 @@ def test_with_resources():
     ]))
     assert sim.get_reward('prey0') == sim.reward_map['prey'][sim.ActionStatus.GOOD_HARVEST]
     assert sim.get_reward('prey1') == sim.reward_map['prey'][sim.ActionStatus.BAD_HARVEST]
+
+
+def test_vectorized_step_matches_sequential():
+    import copy
+
+    def sequential_step(sim, joint_actions):
+        # The step before it was vectorized, built from the single-agent functions.
+        sim.step_count += 1
+        for agent_id in joint_actions:
+            sim.rewards[agent_id] = 0
+        for predator_id, action in joint_actions.items():
+            predator = sim.agents[predator_id]
+            if type(predator) == Prey: continue
+            if action['attack'] == 1:
+                action_status = sim._process_attack_action(predator)
+            else:
+                action_status = sim._process_move_action(predator, action['move'])
+            sim.rewards[predator_id] = sim.reward_map['predator'][action_status]
+        for prey_id, action in joint_actions.items():
+            prey = sim.agents[prey_id]
+            if type(prey) == Predator or prey_id in sim.cemetery: continue
+            if sim.resources is None:
+                action_status = sim._process_move_action(prey, action)
+            elif action['harvest'] == 1:
+                action_status = sim._process_harvest_action(prey)
+            else:
+                action_status = sim._process_move_action(prey, action['move'])
+            sim.rewards[prey_id] = sim.reward_map['prey'][action_status]
+        if sim.resources is not None:
+            sim.resources.regrow()
+
+    for observation_mode in PredatorPreySimulation.ObservationMode:
+        agents = [
+            Predator(id=f'predator{i}', view=2, move=2, attack=i % 3) for i in range(6)
+        ] + [
+            Prey(id=f'prey{i}', view=2, move=1, harvest_amount=0.2) for i in range(15)
+        ]
+        sim = PredatorPreySimulation.build({
+            'agents': agents, 'region': 6, 'observation_mode': observation_mode
+        })
+        reference = copy.deepcopy(sim)
+        if not hasattr(reference, 'resources'):
+            reference.resources = None
+
+        np.random.seed(24)
+        sim.reset()
+        np.random.seed(24)
+        reference.reset()
+        for _ in range(20):
+            joint_actions = {
+                agent.id: agent.action_space.sample() for agent in sim.agents.values()
+                if agent.id not in sim.cemetery
+            }
+            np.random.seed(7)
+            sim.step(joint_actions)
+            np.random.seed(7)
+            sequential_step(reference, joint_actions)
+            assert sim.cemetery == reference.cemetery
+            assert sim.rewards == reference.rewards
+            if reference.resources is not None:
+                np.testing.assert_array_equal(
+                    sim.resources.resources, reference.resources.resources
+                )
+            for agent_id in sim.agents:
+                np.testing.assert_array_equal(
+                    sim.agents[agent_id].position, reference.agents[agent_id].position
+                )
+        assert sim.cemetery
+
+
+def test_grid_observations_match_cell_by_cell():
+    def observe_other_agents(sim, my_id):
+        # The agents channel before it was rasterized, resolved cell by cell.
+        my_agent = sim.agents[my_id]
+        signal = -np.ones((my_agent.view*2+1, my_agent.view*2+1))
+        for r in range(-my_agent.view, my_agent.view + 1):
+            for c in range(-my_agent.view, my_agent.view + 1):
+                if 0 <= my_agent.position[0] + r < sim.region and \
+                        0 <= my_agent.position[1] + c < sim.region:
+                    signal[r + my_agent.view, c + my_agent.view] = 0
+        for other_id, other_agent in sim.agents.items():
+            if other_id == my_id or other_id in sim.cemetery: continue
+            r_diff = other_agent.position[0] - my_agent.position[0] + my_agent.view
+            c_diff = other_agent.position[1] - my_agent.position[1] + my_agent.view
+            if 0 <= r_diff <= 2*my_agent.view and 0 <= c_diff <= 2*my_agent.view:
+                if signal[r_diff, c_diff] == 0 or type(my_agent) != type(other_agent):
+                    signal[r_diff, c_diff] = other_agent.value
+        return signal
+
+    np.random.seed(24)
+    agents = [
+        Predator(id=f'predator{i}', view=i + 1, move=1, attack=1) for i in range(4)
+    ] + [
+        Prey(id=f'prey{i}', view=i % 3 + 1, move=1) for i in range(16)
+    ]
+    sim = PredatorPreySimulation.build({'agents': agents, 'region': 5})
+    sim.reset()
+    for _ in range(10):
+        for agent_id in sim.agents:
+            np.testing.assert_array_equal(
+                sim.get_obs(agent_id)['agents'], observe_other_agents(sim, agent_id)
+            )
+        sim.step({
+            agent.id: agent.action_space.sample() for agent in sim.agents.values()
+            if agent.id not in sim.cemetery
+        })
+    assert sim.cemetery
@@ -1,6 +1,7 @@
 import numpy as np
 
-from abmarl.sim.predator_prey import PredatorPreySimulation, Predator, Prey
+from abmarl.sim.predator_prey import PredatorPreySimulation, PredatorPreySimDistanceObs, \
+    Predator, Prey
 from abmarl.sim.wrappers import CommunicationHandshakeWrapper
 
 
@@ -651,3 +652,171 @@ def test_communication():
     assert sim.get_done('prey1')
 
     assert sim.get_all_done()
+
+
+def test_fused_observations_are_cached_per_step():
+    np.random.seed(24)
+    agents = [
+        Predator(id='predator0', view=2, attack=1),
+        Predator(id='predator1', view=8, attack=0),
+        Prey(id='prey1', view=4),
+        Prey(id='prey2', view=5)
+    ]
+    sim = PredatorPreySimulation.build(
+        {'agents': agents, 'observation_mode': PredatorPreySimulation.ObservationMode.DISTANCE}
+    )
+    sim.reset()
+    computed = []
+    observe = sim._observe
+    sim._observe = lambda my_id: computed.append(my_id) or observe(my_id)
+
+    fusion_matrix = {agent_id: True for agent_id in sim.agents}
+    obs = {agent_id: sim.get_obs(agent_id, fusion_matrix=fusion_matrix) for agent_id in sim.agents}
+    # Each agent only builds its own observation. The senders' observations are
+    # fused from the distances, which are computed once.
+    assert computed == list(sim.agents)
+    assert len(sim._obs_cache) == 4
+    distances = sim._distance_cache
+    assert distances is not None
+
+    # Fusing does not modify the cached observations
+    cached_obs = {agent_id: sim.get_obs(agent_id) for agent_id in sim.agents}
+    sim.invalidate_observations()
+    for agent_id in sim.agents:
+        for other_id, value in sim.get_obs(agent_id).items():
+            np.testing.assert_array_equal(value, cached_obs[agent_id][other_id])
+        for other_id, value in sim.get_obs(agent_id, fusion_matrix=fusion_matrix).items():
+            np.testing.assert_array_equal(value, obs[agent_id][other_id])
+
+    sim.get_obs('prey1', fusion_matrix=fusion_matrix)
+    assert sim._distance_cache is not distances
+
+    sim.step({'predator1': {'move': np.array([1, 1]), 'attack': 0}})
+    assert sim._obs_cache == {}
+    assert sim._distance_cache is None
+    predator1 = sim.agents['predator1']
+    prey1 = sim.agents['prey1']
+    np.testing.assert_array_equal(
+        sim.get_obs('predator1')['prey1'],
+        [*(prey1.position - predator1.position), prey1.value]
+    )
+
+
+def test_multi_binary_communication():
+    def build(multi_binary):
+        agents = [
+            Predator(id='predator0', view=2, attack=1),
+            Predator(id='predator1', view=3, attack=1),
+            Prey(id='prey1', view=4),
+            Prey(id='prey2', view=2),
+            Prey(id='prey3', view=1),
+        ]
+        sim = PredatorPreySimulation.build({
+            'agents': agents, 'region': 6,
+            'observation_mode': PredatorPreySimulation.ObservationMode.DISTANCE
+        })
+        return CommunicationHandshakeWrapper(sim, multi_binary=multi_binary)
+
+    sim = build(False)
+    array_sim = build(True)
+    assert array_sim.agents['prey1'].action_space['send'].n == 5
+    assert array_sim.agents['prey1'].observation_space['message_buffer'].n == 5
+
+    np.random.seed(24)
+    sim.reset()
+    np.random.seed(24)
+    array_sim.reset()
+    for _ in range(6):
+        action = {
+            agent_id: sim.agents[agent_id].action_space.sample() for agent_id in sim.agents
+            if agent_id not in sim.sim.cemetery
+        }
+        array_action = {
+            agent_id: {
+                'action': agent_action['action'],
+                'send': np.array([agent_action['send'].get(other, 0) for other in sim.agents]),
+                'receive': np.array([
+                    agent_action['receive'].get(other, 0) for other in sim.agents
+                ]),
+            } for agent_id, agent_action in action.items()
+        }
+        np.random.seed(7)
+        sim.step(action)
+        np.random.seed(7)
+        array_sim.step(array_action)
+
+        message_buffer, received_message = array_sim.handshake_dicts()
+        assert message_buffer == {
+            agent_id: {other: bool(value) for other, value in buffer.items()}
+            for agent_id, buffer in sim.message_buffer.items()
+        }
+        assert received_message == sim.received_message
+        for agent_id in sim.agents:
+            obs = sim.get_obs(agent_id)
+            array_obs = array_sim.get_obs(agent_id)
+            np.testing.assert_array_equal(
+                array_obs['message_buffer'],
+                [obs['message_buffer'].get(other, 0) for other in sim.agents]
+            )
+            for other, value in obs['obs'].items():
+                np.testing.assert_array_equal(array_obs['obs'][other], value)
+
+
+def test_observe_all_matches_get_obs():
+    np.random.seed(24)
+    agents = [
+        Predator(id=f'predator{i}', view=i % 3 + 1, attack=1) for i in range(3)
+    ] + [
+        Prey(id=f'prey{i}', view=i % 4 + 1) for i in range(8)
+    ]
+    sim = PredatorPreySimulation.build({
+        'agents': agents, 'region': 6,
+        'observation_mode': PredatorPreySimulation.ObservationMode.DISTANCE
+    })
+    sim.reset()
+    agent_ids = list(sim.agents)
+    for _ in range(8):
+        fusion = np.random.randint(2, size=(len(agent_ids), len(agent_ids))).astype(bool)
+        for all_obs, fusion_matrices in (
+            (sim.observe_all(), [{}] * len(agent_ids)),
+            (sim.observe_all(fusion), [dict(zip(agent_ids, row)) for row in fusion]),
+        ):
+            for i, agent_id in enumerate(agent_ids):
+                obs = sim.get_obs(agent_id, fusion_matrix=fusion_matrices[i])
+                assert list(obs) == [other_id for other_id in agent_ids if other_id != agent_id]
+                for j, other_id in enumerate(agent_ids):
+                    if other_id != agent_id:
+                        np.testing.assert_array_equal(obs[other_id], all_obs[i, j])
+                np.testing.assert_array_equal(all_obs[i, i], [0, 0, 0])
+        batch_obs = sim.get_obs_batch(agent_ids)
+        for agent_id in agent_ids:
+            obs = sim.get_obs(agent_id)
+            assert list(batch_obs[agent_id]) == list(obs)
+            for other_id, value in obs.items():
+                np.testing.assert_array_equal(batch_obs[agent_id][other_id], value)
+        sim.step({
+            agent.id: agent.action_space.sample() for agent in sim.agents.values()
+            if agent.id not in sim.cemetery
+        })
+    assert sim.cemetery
+
+
+def test_get_obs_batch_uses_overridden_get_obs():
+    class CountingSim(PredatorPreySimDistanceObs):
+        def get_obs(self, my_id, **kwargs):
+            self.observed.append(my_id)
+            return super().get_obs(my_id, **kwargs)
+
+    agents = [Predator(id='predator0', view=2, attack=1), Prey(id='prey0', view=2)]
+    built_sim = PredatorPreySimulation.build({
+        'agents': agents, 'region': 4,
+        'observation_mode': PredatorPreySimulation.ObservationMode.DISTANCE
+    })
+    sim = CountingSim({
+        'agents': built_sim.agents, 'region': built_sim.region,
+        'max_steps': built_sim.max_steps, 'rewards': built_sim.reward_map
+    })
+    sim.observed = []
+    sim.reset()
+    sim.get_obs_batch(['predator0', 'prey0'])
+    assert sim.observed == ['predator0', 'prey0']
@@ -1,4 +1,4 @@
-from abmarl.sim.wrappers.ravel_discrete_wrapper import ravel, unravel
+from abmarl.sim.wrappers.ravel_discrete_wrapper import ravel, unravel, RavelPlan
 from abmarl.sim.wrappers import RavelDiscreteWrapper
 from abmarl.sim import Agent
 
@@ -49,6 +49,39 @@ def test_ravel():
     assert unravelled_point['f'] == point['f']
 
 
+def test_ravel_plan():
+    my_space = Dict({
+        'a': MultiDiscrete([5, 3]),
+        'b': MultiBinary(4),
+        'c': Box(np.array([[-2, 6, 3],[0, 0, 1]]), np.array([[2, 12, 5],[2, 4, 2]]), dtype=np.int),
+        'd': Tuple((Discrete(3), Box(1, 3, (2,), np.int))),
+        'f': Discrete(6),
+    })
+    my_space.seed(24)
+    plan = RavelPlan(my_space)
+    assert plan.n == np.prod([5, 3, 2, 2, 2, 2, 5, 7, 3, 3, 5, 2, 3, 3, 3, 6])
+    points = [my_space.sample() for _ in range(10)]
+    indices = plan.ravel_many(points)
+    for point, index in zip(points, indices):
+        assert plan.ravel(point) == ravel(my_space, point) == index
+        expected = unravel(my_space, index)
+        unravelled = plan.unravel(index)
+        for key in ['a', 'b', 'c', 'f']:
+            np.testing.assert_array_equal(unravelled[key], expected[key])
+        assert unravelled['d'][0] == expected['d'][0]
+        np.testing.assert_array_equal(unravelled['d'][1], expected['d'][1])
+    values = plan.unravel_values(indices)
+    assert values.shape == (10, 16)
+    np.testing.assert_array_equal(plan.ravel_values(values), indices)
+    for point, unravelled in zip(points, plan.unravel_many(indices)):
+        np.testing.assert_array_equal(unravelled['c'], point['c'])
+
+    discrete = RavelPlan(Discrete(4))
+    assert discrete.ravel(3) == 3
+    assert discrete.unravel(3) == 3
+    np.testing.assert_array_equal(discrete.unravel_values([1, 2]), [[1], [2]])
+
+
 # Observations that we don't support
 class FloatObservation(FillInHelper):
     def __init__(self):
@@ -209,3 +209,42 @@ def test_wrap_observation_action_reward():
     assert sim.get_info('agent0') == {'Action from agent0': 'Wrap Action: 0'}
     assert sim.get_info('agent1') == {'Action from agent1': 'Wrap Action: 1'}
     assert sim.get_info('agent2') == {'Action from agent2': 'Wrap Action: 2'}
+
+
+def test_batch_getters():
+    from abmarl.sim.wrappers import Wrapper
+    from abmarl.managers import AllStepManager
+
+    class BatchSim(MultiAgentSim):
+        def __init__(self):
+            super().__init__(3)
+            self.batch_calls = []
+
+        def get_obs_batch(self, agent_ids, **kwargs):
+            self.batch_calls.append(list(agent_ids))
+            return super().get_obs_batch(agent_ids, **kwargs)
+
+    class PrefixWrapper(Wrapper):
+        def get_obs(self, agent_id, **kwargs):
+            return "Prefix: " + self.sim.get_obs(agent_id, **kwargs)
+
+    sim = BatchSim()
+    wrapped_sim = ObservationRewardWrapper(Wrapper(sim))
+    manager = AllStepManager(wrapped_sim)
+    obs = manager.reset()
+    assert sim.batch_calls == [['agent0', 'agent1', 'agent2']]
+    assert obs == {
+        agent_id: wrapped_sim.get_obs(agent_id) for agent_id in ['agent0', 'agent1', 'agent2']
+    }
+    _, rewards, _, _ = manager.step({'agent0': 0, 'agent1': 1, 'agent2': 0})
+    assert len(sim.batch_calls) == 2
+    assert rewards['agent1'] == 'Wrap Reward: Reward from agent1'
+
+    # A wrapper that overrides a getter gets the output of each agent through it
+    sim = BatchSim()
+    wrapped_sim = PrefixWrapper(sim)
+    assert wrapped_sim.get_obs_batch(['agent0', 'agent2']) == {
+        'agent0': 'Prefix: Obs from agent0',
+        'agent2': 'Prefix: Obs from agent2',
+    }
+    assert sim.batch_calls == []
@@ -0,0 +1,130 @@
+from argparse import Namespace
+import os
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+from abmarl import stage
+from abmarl.sim.corridor import MultiCorridor as Corridor
+from abmarl.managers import AllStepManager
+
+
+EXPERIMENT = """
+from abmarl.sim.corridor import MultiCorridor
+from abmarl.managers import AllStepManager
+
+params = {
+    'experiment': {'sim_creator': lambda config: AllStepManager(MultiCorridor(**config))},
+    'ray_tune': {'config': {'env_config': {}}},
+}
+"""
+
+NO_RENDER_STATE_EXPERIMENT = """
+from abmarl.sim import AgentBasedSimulation
+from abmarl.sim.corridor import MultiCorridor
+from abmarl.managers import AllStepManager
+
+class NoRenderStateCorridor(MultiCorridor):
+    get_render_state = AgentBasedSimulation.get_render_state
+    set_render_state = AgentBasedSimulation.set_render_state
+
+params = {
+    'experiment': {'sim_creator': lambda config: AllStepManager(NoRenderStateCorridor())},
+    'ray_tune': {'config': {'env_config': {}}},
+}
+"""
+
+ANALYSIS = """
+def run(sim, trainer):
+    for _ in range(2):
+        obs = sim.reset()
+        done = {}
+        for _ in range(3):
+            action = {agent_id: 2 for agent_id in obs if not done.get(agent_id, False)}
+            obs, _, done, _ = sim.step(action)
+"""
+
+
+@pytest.fixture(autouse=True)
+def agg_backend():
+    plt.switch_backend('Agg')
+
+
+def record_analysis(tmpdir, monkeypatch):
+    """
+    Run an analysis with --record-trajectories. The trainer is not started, and
+    the positions of the agents are collected at every reset and step.
+    """
+    tmpdir.join('trained').join('experiment.py').write(EXPERIMENT, ensure=True)
+    tmpdir.join('analysis.py').write(ANALYSIS)
+    np.random.seed(24)
+    sim = AllStepManager(Corridor())
+    monkeypatch.setattr(stage, '_start', lambda *args, **kwargs: (sim, None))
+    monkeypatch.setattr(stage, '_finish', lambda: None)
+
+    positions = []
+    for name in ['reset', 'step']:
+        def record(*args, function=getattr(sim, name), **kwargs):
+            output = function(*args, **kwargs)
+            positions.append([agent.position for agent in sim.agents.values()])
+            return output
+        monkeypatch.setattr(sim, name, record)
+
+    stage.run_analysis(
+        str(tmpdir.join('trained')), str(tmpdir.join('analysis.py')),
+        Namespace(checkpoint=None, seed=None, record_trajectories=True)
+    )
+    # Replay must not start the trainer
+    monkeypatch.setattr(stage, '_start', None)
+    return positions
+
+
+def test_replay_from_analysis_recording(tmpdir, monkeypatch):
+    positions = record_analysis(tmpdir, monkeypatch)
+    assert len(positions) == 8
+
+    rendered = []
+    monkeypatch.setattr(Corridor, 'render', lambda self, fig=None, **kwargs: rendered.append(
+        [agent.position for agent in self.agents.values()]
+    ))
+    parameters = Namespace(episodes=3, frame_delay=1, record=False, from_recording=True)
+    stage.run_visualize(str(tmpdir.join('trained')), parameters)
+    assert rendered == positions
+
+
+def test_replay_headless(tmpdir, monkeypatch):
+    record_analysis(tmpdir, monkeypatch)
+    parameters = Namespace(
+        episodes=1, frame_delay=1, record=False, from_recording=True, headless=True
+    )
+    stage.run_visualize(str(tmpdir.join('trained')), parameters)
+    assert sorted(os.listdir(tmpdir.join('trained', 'Episode_0'))) == [
+        'frame_{:04d}.png'.format(i) for i in range(4)
+    ]
+
+
+def test_replay_without_recording(tmpdir, capsys):
+    tmpdir.join('experiment.py').write(EXPERIMENT)
+    parameters = Namespace(episodes=1, frame_delay=1, record=False, from_recording=True)
+    stage.run_visualize(str(tmpdir), parameters)
+    assert 'No recording' in capsys.readouterr().out
+
+
+def test_refuse_sims_without_render_state(tmpdir, monkeypatch):
+    tmpdir.join('trained').join('experiment.py').write(NO_RENDER_STATE_EXPERIMENT, ensure=True)
+    tmpdir.join('analysis.py').write(ANALYSIS)
+    sim = stage._build_sim(stage._load_experiment(str(tmpdir.join('trained'))))
+    monkeypatch.setattr(stage, '_start', lambda *args, **kwargs: (sim, None))
+    monkeypatch.setattr(stage, '_finish', lambda: None)
+
+    with pytest.raises(TypeError):
+        stage.run_analysis(
+            str(tmpdir.join('trained')), str(tmpdir.join('analysis.py')),
+            Namespace(checkpoint=None, seed=None, record_trajectories=True)
+        )
+    assert not tmpdir.join('trained', 'trajectories').exists()
+
+    parameters = Namespace(episodes=1, frame_delay=1, record=False, from_recording=True)
+    with pytest.raises(TypeError):
+        stage.run_visualize(str(tmpdir.join('trained')), parameters)
@@ -0,0 +1,73 @@
+import numpy as np
+
+from abmarl.sim.components.agent import ComponentAgent, VelocityAgent, GridMovementAgent
+from abmarl.sim.components.state import AgentStateTable, GridPositionState, LifeState, \
+    VelocityState, bound_state_table
+from abmarl.sim.components.actor import GridMovementActor
+
+
+class MovingAgent(GridMovementAgent): pass
+
+
+def test_state_table_binds_agents():
+    agents = {
+        'agent0': ComponentAgent(id='agent0', team=1, initial_position=np.array([1, 2])),
+        'agent1': ComponentAgent(id='agent1', team=2, initial_health=0.5),
+        'agent2': VelocityAgent(id='agent2', max_speed=1, initial_velocity=np.array([0.5, 0])),
+    }
+    table = AgentStateTable(agents=agents, position_dtype=int)
+    assert bound_state_table(agents) is table
+    assert table.ids == ['agent0', 'agent1', 'agent2']
+    np.testing.assert_array_equal(table.team, np.array([1, 2, 0]))
+    np.testing.assert_array_equal(table.is_alive, np.array([True, True, True]))
+    assert agents['agent0'].position is None
+    assert agents['agent0'].team == 1
+
+    GridPositionState(agents=agents, region=5).reset()
+    LifeState(agents=agents).reset()
+    VelocityState(agents=agents).reset()
+    np.testing.assert_array_equal(agents['agent0'].position, np.array([1, 2]))
+    np.testing.assert_array_equal(table.position[0], np.array([1, 2]))
+    assert table.health[1] == 0.5
+    np.testing.assert_array_equal(table.velocity[2], np.array([0.5, 0]))
+
+    # Agent attributes are views onto the table
+    agents['agent0'].position[1] = 3
+    np.testing.assert_array_equal(table.position[0], np.array([1, 3]))
+    table.health[:] = 0.25
+    assert agents['agent2'].health == 0.25
+    agents['agent1'].is_alive = False
+    np.testing.assert_array_equal(table.is_alive, np.array([True, False, True]))
+    agents['agent1'].team = 3
+    assert table.team[1] == 3
+    np.testing.assert_array_equal(table.indices(agents.values()), np.array([0, 1, 2]))
+
+
+def test_state_table_with_movement():
+    agents = {
+        'agent0': MovingAgent(id='agent0', move_range=1, initial_position=np.array([0, 0])),
+        'agent1': MovingAgent(id='agent1', move_range=1, initial_position=np.array([2, 2])),
+    }
+    AgentStateTable(agents=agents, position_dtype=int)
+    state = GridPositionState(agents=agents, region=3)
+    actor = GridMovementActor(position_state=state, agents=agents)
+    state.reset()
+
+    np.testing.assert_array_equal(
+        actor.process_action(agents['agent0'], {'move': np.array([1, 1])}), np.array([1, 1])
+    )
+    np.testing.assert_array_equal(
+        actor.process_action(agents['agent1'], {'move': np.array([1, 0])}), np.array([0, 0])
+    )
+    np.testing.assert_array_equal(agents['agent0'].position, np.array([1, 1]))
+    np.testing.assert_array_equal(agents['agent1'].position, np.array([2, 2]))
+
+
+def test_unbound_agents():
+    agents = {
+        'agent0': ComponentAgent(id='agent0'),
+        'agent1': ComponentAgent(id='agent1'),
+    }
+    assert bound_state_table(agents) is None
+    agents['agent0'].health = 0.3
+    assert agents['agent0'].__dict__['health'] == 0.3
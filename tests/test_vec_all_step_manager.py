@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from abmarl.sim.corridor import MultiCorridor as Corridor
+from abmarl.managers import AllStepManager, VecAllStepManager
+
+
+def test_init():
+    sims = [Corridor(), Corridor()]
+    vec_sim = VecAllStepManager(sims)
+    assert vec_sim.sims == sims
+    assert vec_sim.agents == sims[0].agents
+    assert vec_sim.num_sims == 2
+    with pytest.raises(AssertionError):
+        VecAllStepManager([])
+    with pytest.raises(AssertionError):
+        VecAllStepManager([Corridor(), Corridor(num_agents=3)])
+
+
+def test_matches_all_step_manager():
+    np.random.seed(24)
+    vec_sim = VecAllStepManager([Corridor(), Corridor()])
+    obs = vec_sim.reset()
+    np.random.seed(24)
+    sims = [AllStepManager(Corridor()), AllStepManager(Corridor())]
+    single_obs = [sim.reset() for sim in sims]
+    for agent_id in obs:
+        for k in range(2):
+            for key in single_obs[k][agent_id]:
+                np.testing.assert_array_equal(obs[agent_id][key][k], single_obs[k][agent_id][key])
+
+    actions = {
+        agent_id: np.array([Corridor.Actions.RIGHT, Corridor.Actions.LEFT]) for agent_id in obs
+    }
+    obs, rewards, dones, infos = vec_sim.step(actions)
+    for k, sim in enumerate(sims):
+        single_obs, single_rewards, single_dones, _ = sim.step({
+            agent_id: action[k] for agent_id, action in actions.items()
+        })
+        for agent_id in single_obs:
+            for key in single_obs[agent_id]:
+                np.testing.assert_array_equal(obs[agent_id][key][k], single_obs[agent_id][key])
+            assert rewards[agent_id][k] == single_rewards[agent_id]
+            assert dones[agent_id][k] == single_dones[agent_id]
+        assert dones['__all__'][k] == single_dones['__all__']
+    assert len(infos['agent0']) == 2
+
+
+def test_auto_reset():
+    np.random.seed(24)
+    vec_sim = VecAllStepManager([Corridor(num_agents=1), Corridor(num_agents=1)])
+    vec_sim.reset()
+    vec_sim.sims[0].corridor[:] = None
+    vec_sim.sims[0].corridor[8] = vec_sim.sims[0].agents['agent0']
+    vec_sim.sims[0].agents['agent0'].position = 8
+    vec_sim.sims[1].corridor[:] = None
+    vec_sim.sims[1].corridor[0] = vec_sim.sims[1].agents['agent0']
+    vec_sim.sims[1].agents['agent0'].position = 0
+
+    obs, rewards, dones, infos = vec_sim.step(
+        {'agent0': np.array([Corridor.Actions.RIGHT, Corridor.Actions.LEFT])}
+    )
+    np.testing.assert_array_equal(dones['__all__'], np.array([True, False]))
+    np.testing.assert_array_equal(dones['agent0'], np.array([True, False]))
+    assert rewards['agent0'][0] == 100
+    assert infos['agent0'][0]['terminal_obs']['position'] == [9]
+    assert 'terminal_obs' not in infos['agent0'][1]
+    assert obs['agent0']['position'][0] != [9]
+    assert vec_sim.managers[0].done_agents == set()
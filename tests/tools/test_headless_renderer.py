@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+
+from abmarl.sim.corridor import MultiCorridor as Corridor
+from abmarl.sim.predator_prey import PredatorPreySimulation, Predator, Prey
+from abmarl.tools.headless_renderer import HeadlessRenderer
+
+
+def test_persistent_artists():
+    np.random.seed(24)
+    sim = Corridor()
+    sim.reset()
+    renderer = HeadlessRenderer(sim)
+    first = renderer.to_array()
+    artists = renderer.artists
+    np.testing.assert_array_equal(
+        artists['agents'].get_offsets(),
+        [[agent.position, 0] for agent in sim.agents.values()]
+    )
+    sim.step({agent_id: Corridor.Actions.RIGHT for agent_id in sim.agents})
+    second = renderer.to_array()
+    assert renderer.artists is artists
+    assert first.shape == second.shape
+    assert first.shape[-1] == 3
+    assert (first != second).any()
+
+
+def test_predator_prey_grid_obs():
+    np.random.seed(24)
+    sim = PredatorPreySimulation.build({
+        'agents': [
+            Predator(id='predator0', view=1, attack=1),
+            Prey(id='prey0', view=1),
+            Prey(id='prey1', view=1),
+        ],
+        'observation_mode': PredatorPreySimulation.ObservationMode.GRID,
+        'region': 4,
+    })
+    sim.reset()
+    renderer = HeadlessRenderer(sim)
+    renderer.render()
+    np.testing.assert_array_equal(
+        renderer.artists['resources'].get_array(), np.flipud(sim.resources.resources)
+    )
+    assert renderer.artists['prey'].get_offsets().shape == (2, 2)
+    assert renderer.artists['predators'].get_offsets().shape == (1, 2)
+
+
+def test_fallback_to_render(tmpdir):
+    class RenderOnly:
+        def __init__(self):
+            self.calls = 0
+
+        def render(self, fig=None, **kwargs):
+            self.calls += 1
+            fig.clear()
+            fig.gca().plot([0, self.calls])
+
+    sim = RenderOnly()
+    renderer = HeadlessRenderer(sim)
+    renderer.render()
+    path = os.path.join(str(tmpdir), 'frame.png')
+    renderer.save_image(path)
+    assert sim.calls == 2
+    assert renderer.artists is None
+    assert os.path.exists(path)
@@ -0,0 +1,172 @@
+from copy import deepcopy
+
+import numpy as np
+import pytest
+
+from abmarl.sim import AgentBasedSimulation
+from abmarl.sim.components.agent import ComponentAgent
+from abmarl.sim.components.simulation import ComponentRenderStateMixin
+from abmarl.sim.components.state import GridPositionState, GridResourceState, LifeState
+from abmarl.sim.corridor import MultiCorridor as Corridor
+from abmarl.sim.predator_prey import PredatorPreySimulation, Predator, Prey
+from abmarl.managers import AllStepManager
+from abmarl.tools.trajectory_buffer import TrajectoryBuffer, TrajectoryRecorder
+
+
+def fill(buffer):
+    for episode in range(3):
+        for step in range(4):
+            buffer.add(
+                'agent0', {'position': np.array([episode, step]), 'left': (step, True)},
+                step % 2, float(step), step == 3
+            )
+            if step < 2:
+                buffer.add('agent1', np.array([1.5 * step]), np.array([step, step]), 1., False)
+        buffer.end_episode()
+
+
+def check(buffer):
+    assert buffer.num_episodes == 3
+    episode = buffer.read_episode(1)
+    np.testing.assert_array_equal(episode['agent0']['step'], [0, 1, 2, 3])
+    np.testing.assert_array_equal(
+        episode['agent0']['observation.position'], [[1, 0], [1, 1], [1, 2], [1, 3]]
+    )
+    np.testing.assert_array_equal(episode['agent0']['observation.left.0'], [0, 1, 2, 3])
+    np.testing.assert_array_equal(episode['agent0']['action'], [0, 1, 0, 1])
+    np.testing.assert_array_equal(episode['agent0']['reward'], [0., 1., 2., 3.])
+    np.testing.assert_array_equal(episode['agent0']['done'], [False, False, False, True])
+    np.testing.assert_array_equal(episode['agent1']['observation'], [[0.], [1.5]])
+    np.testing.assert_array_equal(episode['agent1']['action'], [[0, 0], [1, 1]])
+
+
+def test_in_memory_buffer():
+    buffer = TrajectoryBuffer(capacity=2)
+    fill(buffer)
+    check(buffer)
+    assert buffer.num_shards == 0
+
+
+def test_spilled_buffer(tmpdir):
+    directory = str(tmpdir.join('trajectories'))
+    buffer = TrajectoryBuffer(directory, shard_size=5, capacity=2)
+    fill(buffer)
+    assert buffer.num_shards == 3
+    check(buffer)
+    check(TrajectoryBuffer.load(directory))
+    episode = TrajectoryBuffer.load(directory).read_episode(2)
+    assert isinstance(episode['agent0']['reward'], np.memmap)
+
+
+def test_recorder(tmpdir):
+    np.random.seed(24)
+    buffer = TrajectoryBuffer(str(tmpdir))
+    sim = TrajectoryRecorder(AllStepManager(Corridor(num_agents=2)), buffer)
+    obs = sim.reset()
+    first_obs = obs['agent0']
+    obs, _, done, _ = sim.step({'agent0': Corridor.Actions.STAY, 'agent1': Corridor.Actions.LEFT})
+    sim.step({'agent0': Corridor.Actions.RIGHT, 'agent1': Corridor.Actions.LEFT})
+    buffer.flush()
+    episode = TrajectoryBuffer.load(str(tmpdir)).read_episode(0)
+    np.testing.assert_array_equal(episode['agent0']['action'], [1, 2])
+    np.testing.assert_array_equal(
+        episode['agent0']['observation.position'],
+        [first_obs['position'], obs['agent0']['position']]
+    )
+    assert len(episode['agent1']['step']) == 2
+
+
+def test_mixed_int_and_float_values():
+    buffer = TrajectoryBuffer(capacity=1)
+    buffer.add('agent0', np.array([0, 1]), 0, 0, False)
+    buffer.add('agent0', np.array([0.5, 1]), 1, -0.75, False)
+    buffer.add('agent0', np.array([2, 3]), 2, 10, True)
+    buffer.end_episode()
+    episode = buffer.read_episode(0)
+    np.testing.assert_array_equal(episode['agent0']['reward'], [0., -0.75, 10.])
+    np.testing.assert_array_equal(episode['agent0']['observation'], [[0, 1], [0.5, 1], [2, 3]])
+    assert episode['agent0']['reward'].dtype == float
+    assert episode['agent0']['action'].dtype.kind == 'i'
+
+
+def replay(sim, step):
+    """
+    Record the render state of the simulation at reset and after stepping, then
+    restore each frame and collect the state again.
+    """
+    buffer = TrajectoryBuffer(capacity=1)
+    states = []
+    sim.reset()
+    for _ in range(3):
+        states.append(deepcopy(sim.get_render_state()))
+        buffer.add_frame(sim.get_render_state())
+        step()
+    buffer.end_episode()
+
+    replayed = []
+    for frame in buffer.read_frames(0):
+        sim.set_render_state(frame)
+        replayed.append(sim.get_render_state())
+    return states, replayed
+
+
+def test_predator_prey_render_state():
+    np.random.seed(24)
+    sim = PredatorPreySimulation.build({
+        'agents': [Predator(id='predator0', attack=1), Prey(id='prey0'), Prey(id='prey1')],
+        'region': 3, 'observation_mode': PredatorPreySimulation.ObservationMode.GRID,
+    })
+    for agent in sim.agents.values():
+        agent.action_space.seed(24)
+    states, replayed = replay(sim, lambda: sim.step({
+        agent.id: agent.action_space.sample() for agent in sim.agents.values()
+        if agent.id not in sim.cemetery
+    }))
+    assert any(not all(state['is_alive'].values()) for state in states)
+    for state, replayed_state in zip(states, replayed):
+        assert replayed_state['is_alive'] == state['is_alive']
+        np.testing.assert_array_equal(replayed_state['resources'], state['resources'])
+        for agent_id, position in state['position'].items():
+            np.testing.assert_array_equal(replayed_state['position'][agent_id], position)
+
+
+def test_component_render_state():
+    class ComponentSim(ComponentRenderStateMixin):
+        def __init__(self, **kwargs):
+            self.agents = kwargs['agents']
+            self.position_state = GridPositionState(**kwargs)
+            self.life_state = LifeState(**kwargs)
+            self.resource_state = GridResourceState(**kwargs)
+
+        def reset(self):
+            self.position_state.reset()
+            self.life_state.reset()
+            self.resource_state.reset()
+
+    np.random.seed(24)
+    agents = {f'agent{i}': ComponentAgent(id=f'agent{i}', initial_health=1.) for i in range(3)}
+    sim = ComponentSim(agents=agents, region=4)
+
+    def step():
+        agent = agents[f'agent{np.random.randint(3)}']
+        sim.life_state.modify_health(agent, -0.5)
+        sim.position_state.modify_position(agent, np.array([1, 0]))
+        sim.resource_state.modify_resources(tuple(agent.position), -0.1)
+
+    states, replayed = replay(sim, step)
+    for state, replayed_state in zip(states, replayed):
+        assert replayed_state['is_alive'] == state['is_alive']
+        np.testing.assert_array_equal(replayed_state['resources'], state['resources'])
+        for agent_id, position in state['position'].items():
+            np.testing.assert_array_equal(replayed_state['position'][agent_id], position)
+
+
+def test_recording_frames_requires_render_state():
+    class NoRenderStateCorridor(Corridor):
+        get_render_state = AgentBasedSimulation.get_render_state
+        set_render_state = AgentBasedSimulation.set_render_state
+
+    sim = AllStepManager(NoRenderStateCorridor())
+    TrajectoryRecorder(sim, TrajectoryBuffer())
+    with pytest.raises(TypeError):
+        TrajectoryRecorder(sim, TrajectoryBuffer(), record_frames=True)